@@ -54,11 +54,34 @@ def create_app(config_name=None):
     app.register_blueprint(chat_bp)
     app.register_blueprint(admin_bp, url_prefix='/admin')
     
+    # Chat over SocketIO (the page falls back to /chat/send without it)
+    from app.routes.chat_socket import ChatNamespace
+    socketio.on_namespace(ChatNamespace('/chat'))
+    
     
     # Create database tables
     with app.app_context():
+        from sqlalchemy import inspect
+        new_synonym_table = not inspect(db.engine).has_table('department_synonyms')
         db.create_all()
         
+        # create_all skips tables that already exist, so indexes added to a model later are created here
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                try:
+                    index.create(db.engine, checkfirst=True)
+                except Exception as e:
+                    print(f"Warning: Could not create index {index.name}: {e}")
+        
+        # Built-in department synonyms go in once; after that the table is admin-owned
+        if new_synonym_table:
+            try:
+                from app.chatbot.department_index import DepartmentIndex
+                DepartmentIndex.seed_defaults()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Warning: Could not seed department synonyms: {e}")
+        
         # Initialize chatbot engine with app context
         try:
             from app.chatbot.engine import chatbot_engine
@@ -66,6 +89,13 @@ def create_app(config_name=None):
         except Exception as e:
             print(f"Warning: Could not initialize chatbot engine: {e}")
         
+        # Queue uploads whose text has not been extracted yet (runs in the background)
+        try:
+            from app.services.extraction import extraction_service
+            extraction_service.scan(app)
+        except Exception as e:
+            print(f"Warning: Could not start text extraction: {e}")
+        
         # Initialize Gemini AI service
         try:
             from app.services.gemini_service import gemini_service
@@ -0,0 +1,53 @@
+"""
+EduBot Continuations
+Short-lived "show more" tokens that let a paged answer pick up where it left off
+"""
+
+import re
+import secrets
+from typing import Dict, Optional, Tuple
+from app.services.cache import TTLCache
+
+# "more", "show more", "next", "more courses", "more 3fj9Qa"
+MORE_PATTERN = re.compile(r'^(?:show |see |load )?(?:more|next)(?: (?:please|courses|results))?(?: ([A-Za-z0-9_-]{6,}))?[.!]?$', re.IGNORECASE)
+
+class ContinuationStore:
+    """Maps a token to the state needed to render the next page of an answer"""
+
+    def __init__(self, maxsize: int = 10000, ttl: int = 900):
+        self._pages = TTLCache(maxsize=maxsize, ttl=ttl)  # token -> (user_id, kind, state)
+        self._latest = TTLCache(maxsize=maxsize, ttl=ttl)  # user_id -> token
+
+    def save(self, user_id: int, kind: str, state: Dict) -> str:
+        """Store the next-page state and return its token"""
+        token = secrets.token_urlsafe(6)
+        self._pages.set(token, (user_id, kind, state))
+        if user_id:
+            self._latest.set(user_id, token)
+        return token
+
+    def take(self, user_id: int, token: str = None) -> Optional[Tuple[str, Dict]]:
+        """Claim a continuation (the user's latest if no token is given).
+        Returns (kind, state) or None."""
+        token = token or self._latest.get(user_id)
+        if not token:
+            return None
+
+        entry = self._pages.get(token)
+        if not entry or entry[0] != user_id:
+            return None
+
+        self._pages.pop(token)
+        if self._latest.get(user_id) == token:
+            self._latest.pop(user_id)
+        return entry[1], entry[2]
+
+    @staticmethod
+    def parse(user_message: str) -> Tuple[bool, Optional[str]]:
+        """Return (asks for more, explicit token or None)"""
+        match = MORE_PATTERN.match(user_message.strip())
+        return (True, match.group(1)) if match else (False, None)
+
+
+# Global continuation store instance
+continuations = ContinuationStore()
@@ -0,0 +1,106 @@
+"""
+EduBot Course Catalogue
+Parses course questions into department / semester / year / code filters and
+pages through matching courses with a keyset over the catalogue index
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+from app import db
+from app.models.course import Course
+from app.chatbot.department_index import course_department_index
+
+ORDINALS = {'first': 1, 'second': 2, 'third': 3, 'fourth': 4, 'final': 4}
+
+SEMESTER_PATTERN = re.compile(r'\b(?:sem(?:ester)?\s*(\d{1,2})|(\d{1,2})(?:st|nd|rd|th)?\s+sem(?:ester)?)\b')
+YEAR_PATTERN = re.compile(r'\b(?:year\s*(\d)|(\d)(?:st|nd|rd|th)?\s+year|(first|second|third|fourth|final)\s+year)\b')
+CODE_PATTERN = re.compile(r'\b([a-z]{2,4})[\s-]?(\d{3,4}[a-z]?)\b')
+
+class CourseCatalogue:
+    """Filtered, paged course listings"""
+
+    def __init__(self, page_size: int = 5):
+        self.page_size = page_size
+
+    @staticmethod
+    def parse(user_message: str) -> Dict:
+        """Pull course filters out of a message ("CS semester 3", "2nd year maths", "CS301")"""
+        message_lower = user_message.lower()
+        filters = {}
+
+        # "cs301", "CS 301" and "cs-301" all try the stored spellings against the unique code index
+        variants = {
+            f"{letters}{separator}{digits}".upper()
+            for letters, digits in CODE_PATTERN.findall(message_lower)
+            for separator in ('', ' ', '-')
+        }
+        if variants:
+            existing = [row[0] for row in db.session.query(Course.course_code)
+                                                  .filter(Course.course_code.in_(variants)).all()]
+            if existing:
+                filters['codes'] = existing
+                return filters
+
+        match = SEMESTER_PATTERN.search(message_lower)
+        if match:
+            filters['semester'] = int(match.group(1) or match.group(2))
+
+        match = YEAR_PATTERN.search(message_lower)
+        if match:
+            filters['year'] = int(match.group(1) or match.group(2) or ORDINALS[match.group(3)])
+
+        # Keep the numbers we just used from being read as department phrases
+        department_text = YEAR_PATTERN.sub(' ', SEMESTER_PATTERN.sub(' ', message_lower))
+        resolved = course_department_index.resolve(department_text)
+        if resolved:
+            filters['departments'] = sorted(resolved[1])
+
+        return filters
+
+    @staticmethod
+    def describe(filters: Dict) -> str:
+        parts = []
+        if filters.get('codes'):
+            parts.append(', '.join(filters['codes']))
+        if filters.get('departments'):
+            parts.append(' & '.join(filters['departments']))
+        if filters.get('year'):
+            parts.append(f"year {filters['year']}")
+        if filters.get('semester'):
+            parts.append(f"semester {filters['semester']}")
+        return ', '.join(parts)
+
+    @staticmethod
+    def _query(filters: Dict):
+        query = Course.query.filter(Course.is_active == True)
+        if filters.get('codes'):
+            query = query.filter(Course.course_code.in_(filters['codes']))
+        if filters.get('departments'):
+            query = query.filter(Course.department.in_(filters['departments']))
+        if filters.get('semester'):
+            query = query.filter(Course.semester == filters['semester'])
+        if filters.get('year'):
+            query = query.filter(Course.year == filters['year'])
+        return query
+
+    def count(self, filters: Dict) -> int:
+        return self._query(filters).order_by(None).count()
+
+    def page(self, filters: Dict, after: Optional[Tuple] = None) -> Tuple[List[Course], Optional[Tuple]]:
+        """One page in (department, semester, course_code) order, starting after the given key.
+        Returns (courses, key to continue from or None on the last page)."""
+        query = self._query(filters)
+        if after:
+            query = query.filter(db.tuple_(Course.department, Course.semester, Course.course_code) > tuple(after))
+        rows = query.order_by(Course.department, Course.semester, Course.course_code)\
+                    .limit(self.page_size + 1).all()
+
+        courses = rows[:self.page_size]
+        if len(rows) <= self.page_size:
+            return courses, None
+        last = courses[-1]
+        return courses, (last.department, last.semester, last.course_code)
+
+
+# Global course catalogue instance
+course_catalogue = CourseCatalogue()
@@ -0,0 +1,147 @@
+"""
+EduBot Department Index
+Compiles department names and admin-editable synonyms into one normalized
+phrase lookup, so department questions cost a dictionary hit and one query
+"""
+
+import re
+import threading
+import time
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from app import db
+from app.models.faculty import Faculty
+from app.models.course import Course
+from app.models.department_synonym import DepartmentSynonym
+from app.services.cache import watch_models
+
+# Seeded into department_synonyms once, when the table is created; admins edit them from then on
+DEFAULT_SYNONYMS = [
+    ('computer science', 'computer science'),
+    ('computer', 'computer science'),
+    ('cs', 'computer science'),
+    ('cse', 'computer science'),
+    ('information technology', 'information technology'),
+    ('it', 'information technology'),
+    ('mathematics', 'mathematics'),
+    ('math', 'mathematics'),
+    ('maths', 'mathematics'),
+    ('physics', 'physics'),
+    ('chemistry', 'chemistry'),
+    ('biology', 'biology'),
+    ('english', 'english'),
+    ('english', 'literature'),
+    ('literature', 'english'),
+    ('literature', 'literature'),
+    ('history', 'history'),
+    ('economics', 'economics'),
+    ('business', 'business'),
+    ('business', 'management'),
+    ('management', 'management'),
+    ('management', 'business'),
+    ('engineering', 'engineering')
+]
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse punctuation/whitespace so phrases compare token by token"""
+    return ' '.join(re.findall(r'[a-z0-9&]+', text.lower()))
+
+class DepartmentIndex:
+    """Maps any known phrase to the set of canonical ``model.department`` values"""
+
+    def __init__(self, model=Faculty, refresh_interval: int = 300):
+        self.model = model  # Faculty or Course - both have department and is_active
+        self.refresh_interval = refresh_interval  # Picks up changes made by other workers
+        self._lookup: Dict[str, FrozenSet[str]] = {}
+        self._max_words = 1
+        self._stale = True
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Mark the index as stale; it is rebuilt on next use"""
+        self._stale = True
+
+    def _ensure_fresh(self):
+        if self._stale or time.time() - self._built_at > self.refresh_interval:
+            self.rebuild()
+
+    @staticmethod
+    def seed_defaults():
+        """Insert the built-in synonyms (called by create_app when it creates the table)"""
+        for phrase, department in DEFAULT_SYNONYMS:
+            db.session.add(DepartmentSynonym(phrase=phrase, department=department))
+        db.session.commit()
+
+    def rebuild(self):
+        """Compile department names and synonyms into the phrase lookup"""
+        departments = [
+            row[0] for row in db.session.query(self.model.department)
+                                        .filter(self.model.is_active == True)
+                                        .distinct().all()
+            if row[0]
+        ]
+        synonyms = db.session.query(DepartmentSynonym.phrase, DepartmentSynonym.department).all()
+
+        lookup: Dict[str, set] = {}
+
+        def add(phrase: str, targets):
+            phrase = normalize(phrase)
+            if phrase and targets:
+                lookup.setdefault(phrase, set()).update(targets)
+
+        for department in departments:
+            add(department, [department])
+            add(f"{department} department", [department])
+            add(f"department of {department}", [department])
+
+        # A synonym points at every department whose name contains its target
+        # (the same rule the old ilike('%term%') queries used), resolved once here
+        for phrase, target in synonyms:
+            target = target.lower()
+            add(phrase, [department for department in departments if target in department.lower()])
+
+        with self._lock:
+            self._lookup = {phrase: frozenset(targets) for phrase, targets in lookup.items()}
+            self._max_words = max((len(phrase.split()) for phrase in self._lookup), default=1)
+            self._stale = False
+            self._built_at = time.time()
+
+    def resolve(self, message: str) -> Optional[Tuple[str, FrozenSet[str]]]:
+        """Find the first (longest) known phrase in the message.
+        Returns (matched phrase, departments) or None."""
+        self._ensure_fresh()
+        words = normalize(message).split()
+
+        with self._lock:
+            for start in range(len(words)):
+                for length in range(min(self._max_words, len(words) - start), 0, -1):
+                    phrase = ' '.join(words[start:start + length])
+                    departments = self._lookup.get(phrase)
+                    if departments:
+                        return phrase, departments
+        return None
+
+    def faculty_for(self, message: str) -> Optional[Tuple[str, List[Faculty]]]:
+        """Resolve the message to departments and load their faculty with one IN query.
+        Returns (display name, faculty list) or None."""
+        match = self.resolve(message)
+        if not match:
+            return None
+
+        _, departments = match
+        faculty_list = Faculty.query.filter(
+            Faculty.department.in_(departments),
+            Faculty.is_active == True
+        ).order_by(Faculty.department, Faculty.id).all()
+
+        if not faculty_list:
+            return None
+        return ' & '.join(sorted(departments)), faculty_list
+
+
+# Global department index instances
+department_index = DepartmentIndex()
+watch_models(department_index.invalidate, Faculty, DepartmentSynonym)
+
+course_department_index = DepartmentIndex(Course)
+watch_models(course_department_index.invalidate, Course, DepartmentSynonym)
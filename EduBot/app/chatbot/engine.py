@@ -5,14 +5,15 @@ Orchestrates intent recognition, response generation, and conversation flow
 
 import time
 from typing import Dict, Tuple
-from flask import request
+from flask import request, current_app
 from flask_login import current_user
 from app import db
 from app.models.chat_log import ChatLog
 from app.models.quick_action import QuickAction
-from app.models.quiz_session import QuizSession
 from app.chatbot.intents import intent_recognizer
 from app.chatbot.handlers import response_handler
+from app.chatbot.continuations import continuations
+from app.chatbot.quick_action_index import quick_action_index
 from app.services.gemini_service import gemini_service
 
 class ChatbotEngine:
@@ -82,6 +83,27 @@ class ChatbotEngine:
                     'success': True
                 }
             
+            # Then "more" for a paged answer the user was just shown
+            continuation = self._check_continuation(user_message, user_id)
+            if continuation:
+                intent_name, continuation_response = continuation
+                response_time = int((time.time() - start_time) * 1000)
+                
+                if user_id:
+                    self._log_conversation(
+                        user_id, session_id, user_message, continuation_response,
+                        intent_name, 0.95, response_time
+                    )
+                
+                return {
+                    'response': continuation_response,
+                    'intent': intent_name,
+                    'confidence': 0.95,
+                    'response_time_ms': response_time,
+                    'matched_pattern': 'continuation',
+                    'success': True
+                }
+            
             # SECOND: Check for Quick Actions before intent recognition
             quick_action_response = self._check_quick_actions(user_message)
             if quick_action_response:
@@ -140,7 +162,9 @@ class ChatbotEngine:
                 )
             
             if should_use_gemini:
-                gemini_response = self._try_gemini_response(user_message, user_context)
+                # The AI call gets whatever is left of the request's time budget
+                deadline = start_time + current_app.config.get('LLM_REQUEST_BUDGET', 8)
+                gemini_response = self._try_gemini_response(user_message, user_context, deadline)
                 if gemini_response:
                     final_response = "This answer is provided by AI: " + gemini_response
                     intent_name = 'gemini_ai'
@@ -263,33 +287,40 @@ class ChatbotEngine:
             if message_clean not in ['A', 'B', 'C', 'D'] or not user_id:
                 return None
             
-            # Find the most recent active quiz session for this user
-            active_session = QuizSession.query.filter_by(
-                user_id=user_id,
-                is_active=True,
-                user_answer=None
-            ).order_by(QuizSession.created_at.desc()).first()
-            
-            if active_session:
-                # Handle the quiz answer using the response handler
-                return self.response_handler._handle_quiz_answer(active_session, message_clean)
+            # Grade against the cached active quiz (None if there isn't one)
+            return self.response_handler._handle_quiz_answer(user_id, message_clean)
             
+        except Exception as e:
+            print(f"Error checking quiz answer: {e}")
             return None
+    
+    def _check_continuation(self, user_message: str, user_id: int = None) -> Tuple[str, str]:
+        """If the user asked for "more", render the next page of their last paged answer"""
+        try:
+            asks_for_more, token = continuations.parse(user_message)
+            if not asks_for_more or not user_id:
+                return None
+            
+            pending = continuations.take(user_id, token)
+            if not pending:
+                return None
+            
+            kind, state = pending
+            response = self.response_handler.handle_continuation(kind, state, user_id)
+            return (kind, response) if response else None
             
         except Exception as e:
-            print(f"Error checking quiz answer: {e}")
+            print(f"Error checking continuation: {e}")
             return None
     
     def _check_quick_actions(self, user_message: str) -> str:
         """Check if user message matches any Quick Actions and return response"""
         try:
-            # Search for matching Quick Action responses
-            matching_actions = QuickAction.search_for_answer(user_message, limit=1)
+            # Look the message up in the in-memory index (no query unless something matches)
+            quick_action = quick_action_index.best(user_message)
             
-            if matching_actions:
-                # Get the best match (highest priority)
-                quick_action = matching_actions[0]
-                quick_action.increment_usage()  # Track usage
+            if quick_action:
+                QuickAction.increment_usage_by_id(quick_action.id)  # Track usage
                 return quick_action.response
             
             return None
@@ -298,14 +329,14 @@ class ChatbotEngine:
             print(f"Error checking Quick Actions: {e}")
             return None
     
-    def _try_gemini_response(self, user_message: str, user_context: Dict = None) -> str:
-        """Try to get a response from Gemini AI"""
+    def _try_gemini_response(self, user_message: str, user_context: Dict = None, deadline: float = None) -> str:
+        """Try to get a response from Gemini AI before the deadline (None means use the template)"""
         try:
             if not gemini_service.is_available():
                 return None
                 
             # Generate response using Gemini
-            gemini_response = gemini_service.generate_response(user_message, user_context)
+            gemini_response = gemini_service.generate_response(user_message, user_context, deadline=deadline)
             
             if gemini_response:
                 return gemini_response
@@ -0,0 +1,241 @@
+"""
+EduBot Events Digest
+Precomputes the upcoming-events answers (overall, by type and by week) and
+keeps a sorted date index so date-range questions are answered from memory
+"""
+
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from app.models.event import Event
+from app.services.cache import watch_models
+from app.chatbot.fragments import fragment_cache
+
+EventEntry = namedtuple('EventEntry', [
+    'id', 'title', 'description', 'event_type', 'start_date', 'end_date',
+    'start_time', 'location', 'is_holiday'
+])
+
+TYPE_KEYWORDS = {
+    'holiday': r'\b(holidays?|vacations?|breaks?|days? off)\b',
+    'exam': r'\b(exams?|examinations?|tests?|finals|midterms?)\b',
+    'sports': r'\b(sports?|games|tournaments?|matches)\b',
+    'cultural': r'\b(cultural|fests?|festivals?|celebrations?)\b',
+    'academic': r'\b(academic|seminars?|workshops?|lectures?)\b'
+}
+
+TYPE_TITLES = {
+    'holiday': 'Holidays',
+    'exam': 'Exams',
+    'sports': 'Sports Events',
+    'cultural': 'Cultural Events',
+    'academic': 'Academic Events',
+    'other': 'Other Events'
+}
+
+MONTHS = ['january', 'february', 'march', 'april', 'may', 'june', 'july',
+          'august', 'september', 'october', 'november', 'december']
+
+# "may" is only treated as a month after a preposition ("holidays in may")
+MONTH_PATTERN = re.compile(
+    r'\b(?:(january|february|march|april|june|july|august|september|october|november|december)'
+    r'|(?:in|during|for|of)\s+(may))\b'
+)
+
+class EventsDigest:
+    """Serves event answers from an in-memory digest rebuilt on Event writes and at midnight"""
+
+    def __init__(self, limit: int = 20, refresh_interval: int = 600):
+        self.limit = limit  # Max events listed in one answer
+        self.refresh_interval = refresh_interval  # Picks up changes made by other workers
+        self._entries: List[EventEntry] = []
+        self._start_dates: List[date] = []
+        self._digest = ''
+        self._by_type: Dict[str, str] = {}
+        self._by_week = ''
+        self._built_for: Optional[date] = None
+        self._built_at = 0.0
+        self._stale = True
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Mark the digest as stale; it is rebuilt on next use"""
+        self._stale = True
+
+    def _ensure_fresh(self):
+        today = datetime.now().date()
+        if (self._stale or self._built_for != today or
+                time.time() - self._built_at > self.refresh_interval):
+            self.rebuild(today)
+
+    def rebuild(self, today: date = None):
+        """Load upcoming events once and render every precomputed section"""
+        today = today or datetime.now().date()
+
+        events = Event.query.filter(
+            Event.start_date >= today,
+            Event.is_active == True
+        ).order_by(Event.start_date, Event.start_time).all()
+
+        entries = [
+            EventEntry(
+                event.id, event.title, event.description, event.event_type,
+                event.start_date, event.end_date, event.start_time,
+                event.location, bool(event.is_holiday)
+            )
+            for event in events
+        ]
+
+        by_type = {}
+        for event_type in TYPE_TITLES:
+            typed = [entry for entry in entries if self._is_type(entry, event_type)]
+            by_type[event_type] = self._render(typed, f"📅 **Upcoming {TYPE_TITLES[event_type]}:**\n\n",
+                                               f"📅 No upcoming {TYPE_TITLES[event_type].lower()} scheduled. Stay tuned for updates!")
+
+        with self._lock:
+            self._entries = entries
+            self._start_dates = [entry.start_date for entry in entries]
+            self._digest = self._render(entries, "📅 **Upcoming Events & Holidays:**\n\n",
+                                        "📅 No upcoming events scheduled. Stay tuned for updates!")
+            self._by_type = by_type
+            self._by_week = self._render_by_week(entries)
+            self._built_for = today
+            self._built_at = time.time()
+            self._stale = False
+
+    @staticmethod
+    def _is_type(entry: EventEntry, event_type: str) -> bool:
+        if event_type == 'holiday':
+            return entry.event_type == 'holiday' or entry.is_holiday
+        return entry.event_type == event_type
+
+    def _render(self, entries: List[EventEntry], header: str, empty_message: str) -> str:
+        if not entries:
+            return empty_message
+
+        parts = [header]
+        parts.extend(fragment_cache.event_item(entry) for entry in entries[:self.limit])
+
+        if len(entries) > self.limit:
+            parts.append(f"…and {len(entries) - self.limit} more.\n\n")
+
+        parts.append("🔔 Mark your calendars and don't miss out!")
+        return ''.join(parts)
+
+    def _render_by_week(self, entries: List[EventEntry]) -> str:
+        if not entries:
+            return "📅 No upcoming events scheduled. Stay tuned for updates!"
+
+        parts = ["📅 **Upcoming Events by Week:**\n\n"]
+        current_week = None
+        for entry in entries[:self.limit]:
+            week_start = entry.start_date - timedelta(days=entry.start_date.weekday())
+            if week_start != current_week:
+                current_week = week_start
+                parts.append(f"🗓️ **Week of {week_start.strftime('%B %d')}**\n")
+            parts.append(fragment_cache.event_item(entry))
+
+        parts.append("🔔 Mark your calendars and don't miss out!")
+        return ''.join(parts)
+
+    @staticmethod
+    def parse_range(message: str, today: date) -> Optional[Tuple[date, date, str]]:
+        """Parse a natural-language date range into (start, end, label), inclusive"""
+        week_start = today - timedelta(days=today.weekday())
+
+        if re.search(r'\btoday\b', message):
+            return today, today, 'today'
+        if re.search(r'\btomorrow\b', message):
+            tomorrow = today + timedelta(days=1)
+            return tomorrow, tomorrow, 'tomorrow'
+        if re.search(r'\bthis weekend\b', message):
+            saturday = week_start + timedelta(days=5)
+            return max(saturday, today), week_start + timedelta(days=6), 'this weekend'
+        if re.search(r'\bthis week\b', message):
+            return today, week_start + timedelta(days=6), 'this week'
+        if re.search(r'\bnext week\b', message):
+            next_week = week_start + timedelta(days=7)
+            return next_week, next_week + timedelta(days=6), 'next week'
+
+        match = re.search(r'\bnext (\d{1,3}) days\b', message)
+        if match:
+            days = int(match.group(1))
+            return today, today + timedelta(days=max(days - 1, 0)), f'the next {days} days'
+
+        if re.search(r'\bthis month\b', message):
+            month_end = EventsDigest._month_end(today.year, today.month)
+            return today, month_end, 'this month'
+        if re.search(r'\bnext month\b', message):
+            year, month = (today.year + 1, 1) if today.month == 12 else (today.year, today.month + 1)
+            return date(year, month, 1), EventsDigest._month_end(year, month), 'next month'
+
+        match = MONTH_PATTERN.search(message)
+        if match:
+            month = MONTHS.index(match.group(1) or match.group(2)) + 1
+            year = today.year if month >= today.month else today.year + 1
+            start = date(year, month, 1)
+            return max(start, today), EventsDigest._month_end(year, month), start.strftime('%B %Y')
+
+        return None
+
+    @staticmethod
+    def _month_end(year: int, month: int) -> date:
+        if month == 12:
+            return date(year, 12, 31)
+        return date(year, month + 1, 1) - timedelta(days=1)
+
+    @staticmethod
+    def parse_type(message: str) -> Optional[str]:
+        for event_type, pattern in TYPE_KEYWORDS.items():
+            if re.search(pattern, message):
+                return event_type
+        return None
+
+    def in_range(self, start: date, end: date, event_type: str = None) -> List[EventEntry]:
+        """Events starting within [start, end], found by bisecting the date index"""
+        self._ensure_fresh()
+        with self._lock:
+            low = bisect_left(self._start_dates, start)
+            high = bisect_right(self._start_dates, end)
+            entries = self._entries[low:high]
+
+        if event_type:
+            entries = [entry for entry in entries if self._is_type(entry, event_type)]
+        return entries
+
+    def answer(self, user_message: str) -> str:
+        """Answer an events question from the precomputed digest"""
+        self._ensure_fresh()
+        message = user_message.lower()
+        event_type = self.parse_type(message)
+        date_range = self.parse_range(message, self._built_for)
+
+        if date_range:
+            start, end, label = date_range
+            entries = self.in_range(start, end, event_type)
+            what = TYPE_TITLES[event_type] if event_type else 'Events'
+            return self._render(entries, f"📅 **{what} {self._range_phrase(label)}:**\n\n",
+                                f"📅 No {what.lower()} scheduled {self._range_phrase(label)}.")
+
+        if event_type:
+            return self._by_type[event_type]
+
+        if re.search(r'\b(by week|weekly|calendar|schedule)\b', message):
+            return self._by_week
+
+        return self._digest
+
+    @staticmethod
+    def _range_phrase(label: str) -> str:
+        if label in ('today', 'tomorrow') or label.startswith(('this ', 'next ')):
+            return label
+        return f"in {label}"
+
+
+# Global events digest instance
+events_digest = EventsDigest()
+watch_models(events_digest.invalidate, Event)
@@ -0,0 +1,232 @@
+"""
+EduBot Response Fragments
+Precompiled response templates and a per-entity cache of rendered fragments,
+so list answers are assembled with a single join
+"""
+
+import threading
+from string import Formatter
+from typing import Dict, Set, Tuple
+from app.models.user import User
+from app.models.faculty import Faculty
+from app.models.event import Event
+from app.models.course import Course
+from app.models.note import Note
+from app.services.cache import TTLCache, watch_rows
+
+class ResponseTemplate:
+    """A response layout compiled once into segments.
+    A segment is skipped when any field it references is None; pass None for optional fields that are blank."""
+
+    def __init__(self, *segments: str):
+        self._segments = [
+            (segment, tuple(field for _, field, _, _ in Formatter().parse(segment) if field))
+            for segment in segments
+        ]
+
+    def render(self, values: Dict) -> str:
+        return ''.join(
+            segment.format_map(values)
+            for segment, fields in self._segments
+            if all(values.get(field) is not None for field in fields)
+        )
+
+
+FACULTY_CARD = ResponseTemplate(
+    "👨‍🏫 **{name}**\n\n",
+    "🏢 **Department:** {department}\n",
+    "🎓 **Designation:** {designation}\n",
+    "🔬 **Specialization:** {specialization}\n",
+    "📍 **Office:** {office_location}\n",
+    "🕒 **Office Hours:** {office_hours}\n",
+    "📧 **Email:** {email}\n",
+    "📞 **Phone:** {phone}\n",
+    "\n📝 **About:** {bio}\n"
+)
+
+FACULTY_LIST_ITEM = ResponseTemplate(
+    "   👨‍🏫 **{name}**",
+    " - {designation}",
+    "\n",
+    "      📍 Office: {office_location}\n",
+    "      📧 {email}\n"
+)
+
+FACULTY_DEPARTMENT_ITEM = ResponseTemplate(
+    "👨‍🏫 **{name}**",
+    " - {designation}",
+    "\n",
+    "   📍 Office: {office_location}\n",
+    "   📧 Email: {email}\n",
+    "   🔬 Specialization: {specialization}\n",
+    "\n"
+)
+
+FACULTY_SUMMARY_ITEM = ResponseTemplate(
+    "• **{name}**",
+    " - {designation}",
+    " ({department})",
+    "\n"
+)
+
+EVENT_ITEM = ResponseTemplate(
+    "{emoji} **{title}**\n",
+    "   📅 {start_date}",
+    " at {start_time}",
+    " - {end_date}",
+    "\n",
+    "   📍 {location}\n",
+    "   📝 {description}\n",
+    "\n"
+)
+
+COURSE_ITEM = ResponseTemplate(
+    "📖 **{course_name}** ({course_code})\n",
+    "   🎓 Credits: {credits}\n",
+    "   📅 Semester: {semester}, Year: {year}\n",
+    "   🏢 Department: {department}\n",
+    "   👨‍🏫 Instructor: {instructor}\n",
+    "   📝 {description}\n",
+    "\n"
+)
+
+NOTE_ITEM = ResponseTemplate(
+    "📄 **{title}**\n",
+    "   📖 Course: {course}\n",
+    "   📑 Chapter: {chapter}\n",
+    "   🏷️ Topic: {topic}\n",
+    "   ⬇️ [Download {file_label}]({url})\n",
+    "\n"
+)
+
+EVENT_EMOJIS = {
+    'academic': '📚',
+    'cultural': '🎭',
+    'sports': '⚽',
+    'holiday': '🎉',
+    'exam': '📝',
+    'other': '📌'
+}
+
+class FragmentCache:
+    """Caches one rendered fragment per (kind, entity) and evicts it when a row it was built from changes"""
+
+    def __init__(self, maxsize: int = 20000, ttl: int = 600):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)  # TTL picks up changes made by other workers
+        self._dependents: Dict[Tuple[str, int], Set[Tuple[str, int]]] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_render(self, key: Tuple[str, int], render, depends_on) -> str:
+        """Return the cached fragment or render it; ``depends_on()`` lists the (model, id) rows it is built from"""
+        fragment = self._cache.get(key)
+        if fragment is None:
+            fragment = render()
+            self._cache.set(key, fragment)
+            with self._lock:
+                for row_key in depends_on():
+                    if row_key[1] is not None:
+                        self._dependents.setdefault(row_key, set()).add(key)
+        return fragment
+
+    def evict_row(self, row):
+        """Drop every fragment rendered from this row"""
+        with self._lock:
+            keys = self._dependents.pop((type(row).__name__, row.id), ())
+        for key in keys:
+            self._cache.pop(key)
+
+    def clear(self):
+        self._cache.clear()
+        with self._lock:
+            self._dependents.clear()
+
+    @staticmethod
+    def _faculty_values(faculty: Faculty) -> Dict:
+        return {
+            'name': faculty.name,
+            'email': faculty.email or None,
+            'phone': faculty.phone or None,
+            'department': faculty.department,
+            'designation': faculty.designation,
+            'specialization': faculty.specialization or None,
+            'office_location': faculty.office_location or None,
+            'office_hours': faculty.office_hours or None,
+            'bio': faculty.bio or None
+        }
+
+    def _faculty_fragment(self, kind: str, template: ResponseTemplate, faculty: Faculty) -> str:
+        return self._get_or_render(
+            (kind, faculty.id),
+            lambda: template.render(self._faculty_values(faculty)),
+            lambda: [('Faculty', faculty.id), ('User', faculty.user_id)]
+        )
+
+    def faculty_card(self, faculty: Faculty) -> str:
+        return self._faculty_fragment('faculty_card', FACULTY_CARD, faculty)
+
+    def faculty_list_item(self, faculty: Faculty) -> str:
+        return self._faculty_fragment('faculty_list_item', FACULTY_LIST_ITEM, faculty)
+
+    def faculty_department_item(self, faculty: Faculty) -> str:
+        return self._faculty_fragment('faculty_department_item', FACULTY_DEPARTMENT_ITEM, faculty)
+
+    def faculty_summary_item(self, faculty: Faculty) -> str:
+        return self._faculty_fragment('faculty_summary_item', FACULTY_SUMMARY_ITEM, faculty)
+
+    def event_item(self, event) -> str:
+        """Render an Event row or an events-digest entry"""
+        def render():
+            return EVENT_ITEM.render({
+                'emoji': EVENT_EMOJIS.get(event.event_type, '📌'),
+                'title': event.title,
+                'start_date': event.start_date.strftime('%B %d, %Y'),
+                'start_time': event.start_time.strftime('%I:%M %p') if event.start_time else None,
+                'end_date': event.end_date.strftime('%B %d, %Y')
+                            if event.end_date and event.end_date != event.start_date else None,
+                'location': event.location or None,
+                'description': event.description or None
+            })
+
+        return self._get_or_render(('event', event.id), render, lambda: [('Event', event.id)])
+
+    def course_item(self, course: Course) -> str:
+        def render():
+            return COURSE_ITEM.render({
+                'course_name': course.course_name,
+                'course_code': course.course_code,
+                'credits': course.credits,
+                'semester': course.semester,
+                'year': course.year,
+                'department': course.department,
+                'instructor': course.faculty.name if course.faculty else None,
+                'description': course.description or None
+            })
+
+        def depends_on():
+            return [('Course', course.id),
+                    ('Faculty', course.faculty_id),
+                    ('User', course.faculty.user_id if course.faculty else None)]
+
+        return self._get_or_render(('course', course.id), render, depends_on)
+
+    def note_item(self, note: Note) -> str:
+        """Render a note with its download link (needs a request or app context for url_for)"""
+        def render():
+            from flask import url_for
+            course = note.course
+            return NOTE_ITEM.render({
+                'title': note.title,
+                'course': f"{course.course_name} ({course.course_code})" if course else None,
+                'chapter': note.chapter or None,
+                'topic': note.topic or None,
+                'file_label': note.original_name or note.file_name,
+                'url': url_for('static', filename=note.file_path) if note.file_path else None
+            })
+
+        return self._get_or_render(('note', note.id), render,
+                                   lambda: [('Note', note.id), ('Course', note.course_id)])
+
+
+# Global fragment cache instance
+fragment_cache = FragmentCache()
+watch_rows(fragment_cache.evict_row, User, Faculty, Event, Course, Note)
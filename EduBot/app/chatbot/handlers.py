@@ -3,18 +3,38 @@ EduBot Response Handlers
 Handles specific responses for different intents with database queries
 """
 
+import re
 import random
-from datetime import datetime, timedelta
-from typing import Dict, Any
+from datetime import datetime
+from typing import Dict, Optional
 from flask_login import current_user
 from app import db
-from app.models.user import User
 from app.models.faculty import Faculty
-from app.models.quote import Quiz
-from app.models.quiz_session import QuizSession
-from app.models.event import Event
+from app.models.user import User
 from app.models.attendance import Attendance
-from app.models.course import Course
+from app.chatbot.quiz_index import quiz_index
+from app.chatbot.quiz_state import active_quizzes
+from app.chatbot.events_digest import events_digest
+from app.chatbot.fragments import fragment_cache
+from app.chatbot.department_index import department_index
+from app.chatbot.course_catalogue import course_catalogue
+from app.chatbot.continuations import continuations
+from app.services.search_index import faculty_search, note_search
+from app.services.text_terms import search_terms
+
+# Questions that ask for faculty by subject rather than by name or department
+FACULTY_TOPIC_PATTERNS = [
+    r'\bwho (?:teaches|teach|knows about|specializes in|specialises in|works on|researches)\s+(.+)',
+    r'\b(?:professors?|teachers?|faculty|lecturers?|instructors?)\s+(?:for|teaching|who teaches|specializing in|specialising in)\s+(.+)',
+    r'\b(?:experts?|specialists?)\s+(?:in|on|for)\s+(.+)'
+]
+
+# Words that ask for notes rather than describe what the notes are about
+NOTE_REQUEST_WORDS = {
+    'notes', 'note', 'study', 'material', 'materials', 'lecture', 'lectures', 'download',
+    'pdf', 'file', 'files', 'chapter', 'ch', 'unit', 'get', 'give', 'need', 'want',
+    'please', 'show', 'find', 'send', 'share', 'course', 'subject'
+}
 
 class ResponseHandler:
     """Handles generating intelligent responses for different intents"""
@@ -81,22 +101,18 @@ class ResponseHandler:
         try:
             message_lower = user_message.lower().strip()
             
-            # Get all faculty members first
-            faculty_members = Faculty.query.filter_by(is_active=True).all()
-            
-            if not faculty_members:
-                return "I don't have any faculty information available at the moment. Please contact the administration for faculty details."
-            
             # Check if user is asking for specific faculty member by name
-            for faculty in faculty_members:
-                if faculty.user and (
-                    faculty.user.first_name.lower() in message_lower or 
-                    faculty.user.last_name.lower() in message_lower
-                ):
-                    return self._format_faculty_info(faculty)
+            faculty = self._find_faculty_by_name(message_lower)
+            if faculty:
+                return self._format_faculty_info(faculty)
+            
+            # Topic questions ("who teaches machine learning") go to the full-text index
+            topic_response = self._check_faculty_topic_query(user_message)
+            if topic_response:
+                return topic_response
             
             # PRIORITY: Check department names with keywords and exact matches
-            department_response = self._check_department_query(message_lower, faculty_members)
+            department_response = self._check_department_query(message_lower)
             if department_response:
                 return department_response
             
@@ -111,6 +127,18 @@ class ResponseHandler:
             print(f"Error handling faculty query: {e}")
             return "I'm having trouble accessing faculty information right now. Please try again later."
     
+    def _find_faculty_by_name(self, message_lower: str) -> Optional[Faculty]:
+        """First active faculty member whose first or last name appears in the message.
+        The match runs in SQL, so only that one row is loaded."""
+        message = db.literal(message_lower)
+        return Faculty.query.join(User, Faculty.user_id == User.id).filter(
+            Faculty.is_active == True,
+            db.or_(
+                message.contains(db.func.lower(User.first_name)),
+                message.contains(db.func.lower(User.last_name))
+            )
+        ).order_by(Faculty.id).first()
+    
     def _show_faculty_list(self) -> str:
         """Show complete list of faculty members"""
         try:
@@ -119,8 +147,6 @@ class ResponseHandler:
             if not faculty_members:
                 return "I don't have any faculty information available at the moment. Please contact the administration for faculty details."
             
-            response = "👥 **Faculty Members List:**\n\n"
-            
             # Group by department
             departments = {}
             for faculty in faculty_members:
@@ -129,19 +155,15 @@ class ResponseHandler:
                     departments[dept] = []
                 departments[dept].append(faculty)
             
-            # Display by department
+            # Display by department, one cached fragment per faculty member
+            parts = ["👥 **Faculty Members List:**\n\n"]
             for dept_name, dept_faculty in departments.items():
-                response += f"📚 **{dept_name}:**\n"
-                for faculty in dept_faculty:
-                    response += f"   👨‍🏫 **{faculty.name}** - {faculty.designation}\n"
-                    if faculty.office_location:
-                        response += f"      📍 Office: {faculty.office_location}\n"
-                    if faculty.email:
-                        response += f"      📧 {faculty.email}\n"
-                response += "\n"
-            
-            response += "💡 **Need more details?** Just mention any faculty member's name and I'll provide their complete information!"
-            return response
+                parts.append(f"📚 **{dept_name}:**\n")
+                parts.extend(fragment_cache.faculty_list_item(faculty) for faculty in dept_faculty)
+                parts.append("\n")
+            
+            parts.append("💡 **Need more details?** Just mention any faculty member's name and I'll provide their complete information!")
+            return ''.join(parts)
             
         except Exception as e:
             print(f"Error showing faculty list: {e}")
@@ -149,37 +171,15 @@ class ResponseHandler:
     
     def _format_faculty_info(self, faculty: Faculty) -> str:
         """Format detailed faculty information"""
-        response = f"👨‍🏫 **{faculty.name}**\n\n"
-        response += f"🏢 **Department:** {faculty.department}\n"
-        response += f"🎓 **Designation:** {faculty.designation}\n"
-        
-        if faculty.specialization:
-            response += f"🔬 **Specialization:** {faculty.specialization}\n"
-        
-        if faculty.office_location:
-            response += f"📍 **Office:** {faculty.office_location}\n"
-        
-        if faculty.office_hours:
-            response += f"🕒 **Office Hours:** {faculty.office_hours}\n"
-        
-        if faculty.email:
-            response += f"📧 **Email:** {faculty.email}\n"
-        
-        if faculty.phone:
-            response += f"📞 **Phone:** {faculty.phone}\n"
-        
-        if faculty.bio:
-            response += f"\n📝 **About:** {faculty.bio}\n"
-        
-        return response
+        return fragment_cache.faculty_card(faculty)
     
     def _format_department_faculty(self, faculty_list, department):
         """Format faculty list for a department"""
-        response = f"👥 **Faculty in {department.title()} Department:**\n\n"
-        for faculty in faculty_list:
-            response += f"• **{faculty.name}** - {faculty.designation}\n"
-        response += f"\nWould you like detailed information about any of these faculty members?"
-        return response
+        return ''.join([
+            f"👥 **Faculty in {department.title()} Department:**\n\n",
+            *(f"• **{faculty.name}** - {faculty.designation}\n" for faculty in faculty_list),
+            "\nWould you like detailed information about any of these faculty members?"
+        ])
     
     def handle_attendance(self, user_message: str, template_response: str, user_context: Dict = None) -> str:
         """Handle attendance queries"""
@@ -226,53 +226,9 @@ class ResponseHandler:
             return "I'm having trouble accessing your attendance records right now. Please try again later."
     
     def handle_events(self, user_message: str, template_response: str, user_context: Dict = None) -> str:
-        """Handle events and calendar queries"""
+        """Handle events and calendar queries from the precomputed events digest"""
         try:
-            # Get ALL upcoming events (from today onwards)
-            today = datetime.now().date()
-            
-            upcoming_events = Event.query.filter(
-                Event.start_date >= today,
-                Event.is_active == True
-            ).order_by(Event.start_date).limit(20).all()
-            
-            if not upcoming_events:
-                return "📅 No upcoming events scheduled. Stay tuned for updates!"
-            
-            response = "📅 **Upcoming Events & Holidays:**\n\n"
-            
-            for event in upcoming_events:
-                # Event type emoji
-                type_emoji = {
-                    'academic': '📚',
-                    'cultural': '🎭',
-                    'sports': '⚽',
-                    'holiday': '🎉',
-                    'exam': '📝',
-                    'other': '📌'
-                }.get(event.event_type, '📌')
-                
-                response += f"{type_emoji} **{event.title}**\n"
-                response += f"   📅 {event.start_date.strftime('%B %d, %Y')}"
-                
-                if event.start_time:
-                    response += f" at {event.start_time.strftime('%I:%M %p')}"
-                
-                if event.end_date and event.end_date != event.start_date:
-                    response += f" - {event.end_date.strftime('%B %d, %Y')}"
-                
-                response += "\n"
-                
-                if event.location:
-                    response += f"   📍 {event.location}\n"
-                
-                if event.description:
-                    response += f"   📝 {event.description}\n"
-                
-                response += "\n"
-            
-            response += "🔔 Mark your calendars and don't miss out!"
-            return response
+            return events_digest.answer(user_message)
             
         except Exception as e:
             print(f"Error handling events query: {e}")
@@ -284,17 +240,9 @@ class ResponseHandler:
             # Check if user answered with A, B, C, or D
             message_clean = user_message.strip().upper()
             if message_clean in ['A', 'B', 'C', 'D'] and user_context and user_context.get('user_id'):
-                user_id = user_context['user_id']
-                
-                # Find the most recent active quiz session for this user
-                active_session = QuizSession.query.filter_by(
-                    user_id=user_id,
-                    is_active=True,
-                    user_answer=None
-                ).order_by(QuizSession.created_at.desc()).first()
-                
-                if active_session:
-                    return self._handle_quiz_answer(active_session, message_clean)
+                answer_response = self._handle_quiz_answer(user_context['user_id'], message_clean)
+                if answer_response:
+                    return answer_response
             
             # If not answering, start a new quiz
             return self._start_new_quiz(user_message, user_context)
@@ -331,38 +279,16 @@ class ResponseHandler:
             elif 'medium' in message_lower:
                 difficulty = 'medium'
             
-            # Get quiz questions
-            query = Quiz.query.filter_by(is_active=True)
-            if category:
-                query = query.filter_by(category=category)
-            if difficulty:
-                query = query.filter_by(difficulty=difficulty)
-            
-            quizzes = query.all()
-            
-            if not quizzes:
+            # Pick a question from the in-memory index, skipping ones this user has seen
+            user_id = user_context.get('user_id') if user_context else None
+            quiz = quiz_index.choose(category, difficulty, user_id)
+
+            if not quiz:
                 return "🧠 I don't have any quiz questions available right now. Check back later for brain teasers! 🤔"
             
-            quiz = random.choice(quizzes)
-            
             # Create quiz session if user is authenticated
-            if user_context and user_context.get('user_id'):
-                # Deactivate any previous active sessions for this user
-                QuizSession.query.filter_by(
-                    user_id=user_context['user_id'],
-                    is_active=True
-                ).update({'is_active': False})
-                db.session.commit()
-                
-                # Create new quiz session
-                quiz_session = QuizSession(
-                    user_id=user_context['user_id'],
-                    quiz_id=quiz.id,
-                    session_id='quiz-session',
-                    is_active=True
-                )
-                db.session.add(quiz_session)
-                db.session.commit()
+            if user_id:
+                active_quizzes.start(user_id, quiz)
             
             # Format response WITHOUT answer or explanation
             response = f"🧠 **Quiz Time!** 🎯\n\n"
@@ -391,33 +317,27 @@ class ResponseHandler:
             print(f"Error starting new quiz: {e}")
             return "🧠 I'm having trouble loading a quiz question right now. Please try again! 🤔"
     
-    def _handle_quiz_answer(self, quiz_session: QuizSession, user_answer: str) -> str:
-        """Handle user's quiz answer and provide feedback"""
+    def _handle_quiz_answer(self, user_id: int, user_answer: str) -> Optional[str]:
+        """Grade the user's answer to their active quiz and provide feedback.
+        Returns None if the user has no active quiz."""
         try:
-            quiz = quiz_session.quiz
-            is_correct = quiz.check_answer(user_answer)
-            
-            # Update quiz session
-            quiz_session.user_answer = user_answer
-            quiz_session.is_correct = is_correct
-            quiz_session.points_earned = quiz.points if is_correct else 0
-            quiz_session.answered_at = datetime.utcnow()
-            quiz_session.is_active = False
-            db.session.commit()
+            result = active_quizzes.grade(user_id, user_answer)
+            if not result:
+                return None
             
             # Build response
-            if is_correct:
+            if result['is_correct']:
                 response = "🎉 **Correct!** Well done! 🌟\n\n"
                 response += f"✅ Your answer: **{user_answer}**\n"
-                response += f"🏆 You earned **{quiz.points} points**!\n\n"
+                response += f"🏆 You earned **{result['points']} points**!\n\n"
             else:
                 response = "❌ **Incorrect!** Don't worry, keep learning! 📚\n\n"
                 response += f"❌ Your answer: **{user_answer}**\n"
-                response += f"✅ Correct answer: **{quiz.correct_answer}**\n\n"
+                response += f"✅ Correct answer: **{result['correct_answer']}**\n\n"
             
             # Add explanation if available
-            if quiz.explanation:
-                response += f"📚 **Explanation:** {quiz.explanation}\n\n"
+            if result['explanation']:
+                response += f"📚 **Explanation:** {result['explanation']}\n\n"
             
             # Encourage more quizzes
             response += "🧠 Want to try another quiz? Just ask me for another question!"
@@ -429,44 +349,108 @@ class ResponseHandler:
             return "🤔 Something went wrong processing your answer. Please try again!"
     
     def handle_courses(self, user_message: str, template_response: str, user_context: Dict = None) -> str:
-        """Handle course-related queries"""
+        """Handle course-related queries, filtered by department, semester, year or code"""
         try:
-            courses = Course.query.filter_by(is_active=True).limit(10).all()
+            filters = course_catalogue.parse(user_message)
+            total = course_catalogue.count(filters)
             
-            if not courses:
+            if not total:
+                if filters:
+                    return f"I couldn't find any courses for **{course_catalogue.describe(filters)}**.\n\n" + \
+                           "💡 Try a department, a semester (\"semester 3\"), a year (\"2nd year\") or a course code."
                 return "No course information is available at the moment. Please contact the administration for course details."
             
-            response = "📚 **Available Courses:**\n\n"
-            
-            for course in courses:
-                response += f"📖 **{course.course_name}** ({course.course_code})\n"
-                response += f"   🎓 Credits: {course.credits}\n"
-                response += f"   📅 Semester: {course.semester}, Year: {course.year}\n"
-                response += f"   🏢 Department: {course.department}\n"
-                
-                if course.faculty:
-                    response += f"   👨‍🏫 Instructor: {course.faculty.name}\n"
-                
-                if course.description:
-                    response += f"   📝 {course.description}\n"
-                
-                response += "\n"
-            
-            response += "Need more details about any specific course? Just ask!"
-            return response
+            user_id = user_context.get('user_id') if user_context else None
+            return self._format_course_page(filters, None, 0, total, user_id)
             
         except Exception as e:
             print(f"Error handling courses query: {e}")
             return "I'm having trouble accessing course information right now. Please try again later."
     
+    def _format_course_page(self, filters: Dict, after, shown: int, total: int, user_id: int = None) -> str:
+        """Render one page of courses and leave a continuation for the next"""
+        courses, next_key = course_catalogue.page(filters, after)
+        if not courses:
+            return "That's all the courses I have for that search! 📚"
+        
+        scope = course_catalogue.describe(filters)
+        first, last = shown + 1, shown + len(courses)
+        
+        parts = [f"📚 **Courses - {scope}** ({first}-{last} of {total}):\n\n" if scope
+                 else f"📚 **Available Courses** ({first}-{last} of {total}):\n\n"]
+        parts.extend(fragment_cache.course_item(course) for course in courses)
+        
+        if next_key and user_id:
+            continuations.save(user_id, 'courses', {
+                'filters': filters, 'after': next_key, 'shown': last, 'total': total
+            })
+            parts.append(f"➡️ Reply **more** to see the next {min(course_catalogue.page_size, total - last)} courses.")
+        elif next_key:
+            parts.append("💡 Narrow it down by department, semester, year or course code to see the rest!")
+        else:
+            parts.append("Need more details about any specific course? Just ask!")
+        return ''.join(parts)
+    
+    def handle_continuation(self, kind: str, state: Dict, user_id: int = None) -> Optional[str]:
+        """Render the next page of a paged answer ("more")"""
+        try:
+            if kind == 'courses':
+                return self._format_course_page(state['filters'], state['after'], state['shown'], state['total'], user_id)
+            return None
+            
+        except Exception as e:
+            print(f"Error continuing {kind} listing: {e}")
+            return None
+    
     def handle_notes(self, user_message: str, template_response: str, user_context: Dict = None) -> str:
-        """Handle study notes queries"""
-        return "📚 Study notes and materials will be available soon! In the meantime, make sure to:\n\n" + \
-               "✏️ Take good notes during lectures\n" + \
-               "📖 Review your textbooks regularly\n" + \
-               "👥 Form study groups with classmates\n" + \
-               "🤔 Ask questions when you don't understand\n\n" + \
-               "Keep checking back for uploaded notes and study materials!"
+        """Handle study notes queries with a ranked search, filtered by course and chapter"""
+        try:
+            message_lower = user_message.lower()
+            
+            # "chapter 3", "ch.3", "unit iv" - but not the "ch" in "chemistry" or the "unit" in "united"
+            chapter_match = re.search(r'\b(?:chapter|ch|unit)(?:\b\.?\s*|(?=\d))(\d+|[ivx]+)\b', message_lower)
+            chapter = chapter_match.group(1) if chapter_match else None
+            
+            courses = note_search.resolve_courses(user_message)
+            course_words = set()
+            for course in courses:
+                course_words.update(search_terms(f"{course.course_code} {course.course_name}"))
+                course_words.update(re.findall(r'[a-z]+|[0-9]+', course.course_code.lower()))
+            
+            # Whatever is left describes the material itself ("normalization", "sorting")
+            terms = [
+                term for term in search_terms(user_message)
+                if term not in NOTE_REQUEST_WORDS and term not in course_words and term != chapter
+            ]
+            
+            notes = note_search.find(
+                ' '.join(terms),
+                course_ids=[course.id for course in courses] or None,
+                chapter=chapter,
+                limit=5
+            )
+            
+            scope = ', '.join(course.course_code for course in courses)
+            if chapter:
+                scope = f"{scope} chapter {chapter}" if scope else f"chapter {chapter}"
+            if terms:
+                scope = f"{scope} - {' '.join(terms)}" if scope else ' '.join(terms)
+            
+            if not notes:
+                if scope:
+                    return f"📚 I couldn't find any notes for **{scope}**.\n\n" + \
+                           "💡 Try a course code (e.g. \"notes for CS101\"), a chapter, or a topic name."
+                return "📚 No study notes have been uploaded yet.\n\n" + \
+                       "Keep checking back for uploaded notes and study materials!"
+            
+            parts = [f"📚 **Notes for {scope}:**\n\n" if scope else "📚 **Latest study notes:**\n\n"]
+            parts.extend(fragment_cache.note_item(note) for note in notes)
+            parts.append("💡 Ask for a course code, chapter or topic to narrow the results!")
+            return ''.join(parts)
+            
+        except Exception as e:
+            print(f"Error in handle_notes: {e}")
+            return "I'm having trouble searching study notes right now. Please try again later."
     
     def handle_thanks(self, user_message: str, template_response: str, user_context: Dict = None) -> str:
         """Handle thank you messages"""
@@ -519,6 +503,11 @@ class ResponseHandler:
             faculty_response = self._check_for_faculty_name(user_message)
             if faculty_response:
                 return faculty_response
+            
+            # Then, check for "expert in X" style topic questions
+            topic_response = self._check_faculty_topic_query(user_message)
+            if topic_response:
+                return topic_response
                 
             # Then, check if the message contains a department name
             department_response = self._check_for_department_name(user_message)
@@ -586,11 +575,10 @@ class ResponseHandler:
             if len(best_matches) == 1:
                 return self._format_faculty_info(best_matches[0])
             elif len(best_matches) > 1:
-                response = "👨‍🏫 I found multiple faculty members matching your search:\n\n"
-                for faculty in best_matches:
-                    response += f"• **{faculty.name}** - {faculty.designation} ({faculty.department})\n"
-                response += "\n💡 Please be more specific with the full name for detailed information."
-                return response
+                parts = ["👨‍🏫 I found multiple faculty members matching your search:\n\n"]
+                parts.extend(fragment_cache.faculty_summary_item(faculty) for faculty in best_matches)
+                parts.append("\n💡 Please be more specific with the full name for detailed information.")
+                return ''.join(parts)
             
             return None
             
@@ -601,167 +589,74 @@ class ResponseHandler:
     def _check_for_department_name(self, user_message: str) -> str:
         """Check if the user message contains a department name"""
         try:
-            message_lower = user_message.lower().strip()
-            
-            # Get all departments from faculty members
-            faculty_members = Faculty.query.filter_by(is_active=True).all()
-            
-            if not faculty_members:
+            match = department_index.faculty_for(user_message)
+            if not match:
                 return None
             
-            # Extract unique departments
-            departments = list(set([f.department for f in faculty_members if f.department]))
-            
-            if not departments:
-                return None
-            
-            # Check for exact department matches
-            for dept in departments:
-                dept_lower = dept.lower()
-                
-                # Check various department name formats
-                if (
-                    message_lower == dept_lower or
-                    message_lower == f"{dept_lower} department" or
-                    message_lower == f"department of {dept_lower}" or
-                    message_lower in dept_lower or
-                    dept_lower in message_lower
-                ):
-                    # Get faculty in this department
-                    dept_faculty = Faculty.query.filter(
-                        Faculty.department.ilike(f'%{dept}%')
-                    ).filter_by(is_active=True).all()
-                    
-                    if dept_faculty:
-                        return self._format_department_faculty_list(dept_faculty, dept)
-            
-            # Check for partial matches with common department keywords
-            department_keywords = {
-                'computer': 'Computer Science',
-                'cs': 'Computer Science',
-                'it': 'Information Technology',
-                'math': 'Mathematics',
-                'mathematics': 'Mathematics',
-                'physics': 'Physics',
-                'chemistry': 'Chemistry',
-                'biology': 'Biology',
-                'english': 'English',
-                'literature': 'English Literature',
-                'history': 'History',
-                'economics': 'Economics',
-                'business': 'Business Administration',
-                'management': 'Management',
-                'engineering': 'Engineering'
-            }
-            
-            for keyword, dept_name in department_keywords.items():
-                if keyword in message_lower:
-                    # Look for faculty with department containing this keyword
-                    dept_faculty = Faculty.query.filter(
-                        Faculty.department.ilike(f'%{keyword}%')
-                    ).filter_by(is_active=True).all()
-                    
-                    # If no results with keyword, try the full department name
-                    if not dept_faculty:
-                        dept_faculty = Faculty.query.filter(
-                            Faculty.department.ilike(f'%{dept_name}%')
-                        ).filter_by(is_active=True).all()
-                    
-                    if dept_faculty:
-                        return self._format_department_faculty_list(dept_faculty, dept_name)
-            
-            return None
+            department_name, dept_faculty = match
+            return self._format_department_faculty_list(dept_faculty, department_name)
             
         except Exception as e:
             print(f"Error in _check_for_department_name: {e}")
             return None
     
-    def _check_department_query(self, message_lower: str, faculty_members) -> str:
+    def _check_department_query(self, message_lower: str) -> str:
         """Check if the message contains department-related queries and return appropriate response"""
         try:
-            # Common department keywords and their mappings
-            department_keywords = {
-                'computer science': ['computer science', 'cs', 'cse'],
-                'computer': ['computer science', 'computer'],
-                'cs': ['computer science', 'cs'],
-                'information technology': ['information technology', 'it'],
-                'it': ['information technology', 'it'],
-                'mathematics': ['mathematics', 'math', 'maths'],
-                'math': ['mathematics', 'math'],
-                'physics': ['physics'],
-                'chemistry': ['chemistry'],
-                'biology': ['biology'],
-                'english': ['english', 'literature'],
-                'literature': ['english', 'literature'],
-                'history': ['history'],
-                'economics': ['economics'],
-                'business': ['business', 'management'],
-                'management': ['management', 'business'],
-                'engineering': ['engineering']
-            }
-            
-            # First check for exact department names from database
-            departments = list(set([f.department for f in faculty_members if f.department]))
-            
-            for dept in departments:
-                dept_lower = dept.lower()
-                if (
-                    message_lower == dept_lower or
-                    message_lower == f"{dept_lower} department" or
-                    message_lower == f"department of {dept_lower}" or
-                    dept_lower in message_lower
-                ):
-                    dept_faculty = Faculty.query.filter(
-                        Faculty.department.ilike(f'%{dept}%')
-                    ).filter_by(is_active=True).all()
-                    
-                    if dept_faculty:
-                        return self._format_department_faculty_list(dept_faculty, dept)
-            
-            # Then check common keywords
-            for keyword, search_terms in department_keywords.items():
-                if any(term in message_lower for term in search_terms):
-                    # Search for faculty with department containing these terms
-                    dept_faculty = []
-                    for term in search_terms:
-                        faculty_results = Faculty.query.filter(
-                            Faculty.department.ilike(f'%{term}%')
-                        ).filter_by(is_active=True).all()
-                        dept_faculty.extend(faculty_results)
-                    
-                    # Remove duplicates
-                    dept_faculty = list(set(dept_faculty))
-                    
-                    if dept_faculty:
-                        dept_name = dept_faculty[0].department if dept_faculty else keyword.title()
-                        return self._format_department_faculty_list(dept_faculty, dept_name)
+            # Department names and synonyms are resolved from the compiled index,
+            # then the faculty are loaded with a single IN query
+            match = department_index.faculty_for(message_lower)
+            if not match:
+                return None
             
-            return None
+            department_name, dept_faculty = match
+            return self._format_department_faculty_list(dept_faculty, department_name)
             
         except Exception as e:
             print(f"Error in _check_department_query: {e}")
             return None
     
+    def _extract_faculty_topic(self, user_message: str) -> Optional[str]:
+        """Pull the subject out of questions like 'who teaches X' or 'professor for X'"""
+        message_lower = user_message.lower().strip()
+        for pattern in FACULTY_TOPIC_PATTERNS:
+            match = re.search(pattern, message_lower)
+            if match:
+                topic = match.group(1).strip(' ?.!')
+                if topic:
+                    return topic
+        return None
+    
+    def _check_faculty_topic_query(self, user_message: str) -> str:
+        """Answer "who teaches X" style questions with ranked full-text matches"""
+        try:
+            topic = self._extract_faculty_topic(user_message)
+            if not topic:
+                return None
+            
+            matches = faculty_search.find(topic, limit=5)
+            if not matches:
+                return None
+            
+            parts = [f"🔎 **Faculty for \"{topic}\":**\n\n"]
+            parts.extend(fragment_cache.faculty_department_item(faculty) for faculty in matches)
+            parts.append("💡 **Want more details?** Just mention any faculty member's name for complete information!")
+            return ''.join(parts)
+            
+        except Exception as e:
+            print(f"Error in _check_faculty_topic_query: {e}")
+            return None
+    
     def _format_department_faculty_list(self, faculty_list, department_name):
         """Format faculty list for a specific department"""
         try:
             if not faculty_list:
                 return f"I couldn't find any faculty members in the {department_name} department."
             
-            response = f"👥 **Faculty Members in {department_name} Department:**\n\n"
-            
-            for faculty in faculty_list:
-                response += f"👨‍🏫 **{faculty.name}** - {faculty.designation}\n"
-                if faculty.office_location:
-                    response += f"   📍 Office: {faculty.office_location}\n"
-                if faculty.email:
-                    response += f"   📧 Email: {faculty.email}\n"
-                if faculty.specialization:
-                    response += f"   🔬 Specialization: {faculty.specialization}\n"
-                response += "\n"
-            
-            response += f"💡 **Want more details?** Just mention any faculty member's name for complete information!"
-            return response
+            parts = [f"👥 **Faculty Members in {department_name} Department:**\n\n"]
+            parts.extend(fragment_cache.faculty_department_item(faculty) for faculty in faculty_list)
+            parts.append("💡 **Want more details?** Just mention any faculty member's name for complete information!")
+            return ''.join(parts)
             
         except Exception as e:
             print(f"Error formatting department faculty list: {e}")
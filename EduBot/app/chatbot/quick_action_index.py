@@ -0,0 +1,161 @@
+"""
+EduBot Quick Action Index
+BM25-ranked inverted index over quick-action questions and keywords, so the
+per-message FAQ check scores a few postings instead of scanning every row
+"""
+
+import math
+import re
+import threading
+import time
+from collections import Counter, namedtuple
+from typing import Dict, List, Tuple
+from app import db
+from app.models.quick_action import QuickAction, split_keywords
+from app.services.text_terms import STOP_WORDS
+
+# Filler that says nothing about which FAQ is meant
+QUESTION_WORDS = {
+    'how', 'when', 'where', 'why', 'will', 'should', 'could', 'would', 'get', 'it', 'be',
+    'want', 'need', 'know', 'tell', 'please', 'info', 'information', 'help', 'am', 'you'
+}
+
+QuickActionEntry = namedtuple('QuickActionEntry', [
+    'id', 'question', 'question_lower', 'response', 'category', 'keywords', 'priority', 'usage_count'
+])
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase content-word tokens with a light plural strip, so 'fees' and 'fee' share a posting"""
+    tokens = []
+    for token in re.findall(r'[a-z0-9]+', text.lower()):
+        if token in STOP_WORDS or token in QUESTION_WORDS:
+            continue
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+class QuickActionIndex:
+    """Snapshot of active quick actions with precomputed BM25 postings.
+
+    Each posting already holds the term's full BM25 contribution for that
+    quick action, so scoring a message is a sum over its terms' postings.
+    Keyword hits count ``keyword_weight`` times a question hit.
+    """
+
+    def __init__(self, refresh_interval: int = 300, k1: float = 1.2, b: float = 0.75,
+                 keyword_weight: float = 2.0, min_score: float = 1.0, min_coverage: float = 0.5,
+                 priority_boost: float = 0.05):
+        self.refresh_interval = refresh_interval  # Picks up changes made by other workers
+        self.k1 = k1
+        self.b = b
+        self.keyword_weight = keyword_weight
+        self.min_score = min_score  # Best match must score at least this...
+        self.min_coverage = min_coverage  # ...and explain this share of the message's term weight (by idf)
+        self.priority_boost = priority_boost  # Score multiplier per priority point
+        self._entries: List[QuickActionEntry] = []
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}  # term -> [(entry index, bm25 weight)]
+        self._idf: Dict[str, float] = {}
+        self._unseen_idf = 0.0  # Coverage weight of a term no quick action contains
+        self._boost: List[float] = []  # per entry priority multiplier
+        self._lock = threading.Lock()
+        self._stale = True
+        self._built_at = 0.0
+
+    def invalidate(self):
+        """Mark the index as stale; it is rebuilt on next use"""
+        self._stale = True
+
+    def rebuild(self):
+        """Reload active quick actions and rebuild the postings"""
+        rows = db.session.query(
+            QuickAction.id, QuickAction.question, QuickAction.response, QuickAction.category,
+            QuickAction.keywords, QuickAction.priority, QuickAction.usage_count
+        ).filter(QuickAction.is_active == True).order_by(
+            QuickAction.priority.desc(),
+            QuickAction.usage_count.desc()
+        ).all()
+
+        entries, frequencies, lengths = [], [], []
+        for qa_id, question, response, category, keywords, priority, usage_count in rows:
+            keywords_list = split_keywords(keywords)
+            entries.append(QuickActionEntry(
+                qa_id, question, question.lower(), response, category,
+                keywords_list, priority or 0, usage_count or 0
+            ))
+            question_terms = tokenize(question)
+            keyword_terms = tokenize(' '.join(keywords_list))
+            tf = Counter(question_terms)
+            for term in keyword_terms:
+                tf[term] += self.keyword_weight
+            frequencies.append(tf)
+            lengths.append(len(question_terms) + self.keyword_weight * len(keyword_terms))
+
+        count = len(entries)
+        average_length = (sum(lengths) / count) if count else 1.0
+        document_frequency = Counter(term for tf in frequencies for term in tf)
+        idf = {
+            term: math.log((count - df + 0.5) / (df + 0.5) + 1)
+            for term, df in document_frequency.items()
+        }
+
+        postings = {}
+        for index, (tf, length) in enumerate(zip(frequencies, lengths)):
+            norm = self.k1 * (1 - self.b + self.b * length / (average_length or 1.0))
+            for term, frequency in tf.items():
+                weight = idf[term] * frequency * (self.k1 + 1) / (frequency + norm)
+                postings.setdefault(term, []).append((index, weight))
+
+        with self._lock:
+            self._entries = entries
+            self._postings = postings
+            self._idf = idf
+            # Capped at the rarest real term, so one unknown word ('located', 'served') weighs no more than the word it qualifies
+            self._unseen_idf = max(idf.values(), default=0.0)
+            self._boost = [1 + self.priority_boost * entry.priority for entry in entries]
+            self._stale = False
+            self._built_at = time.time()
+
+    def _ensure_fresh(self):
+        if self._stale or time.time() - self._built_at > self.refresh_interval:
+            self.rebuild()
+
+    def score(self, query: str) -> List[Tuple[QuickActionEntry, float]]:
+        """Every quick action sharing a term with the query, best BM25 score (with priority boost) first"""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        self._ensure_fresh()
+        with self._lock:
+            scores: Dict[int, float] = {}
+            matched_idf: Dict[int, float] = {}
+            for term in terms:
+                for index, weight in self._postings.get(term, ()):
+                    scores[index] = scores.get(index, 0.0) + weight
+                    matched_idf[index] = matched_idf.get(index, 0.0) + self._idf[term]
+            if not scores:
+                return []
+
+            query_idf = sum(self._idf.get(term, self._unseen_idf) for term in terms)
+            ranked = [
+                (index, score * self._boost[index])
+                for index, score in scores.items()
+                if score >= self.min_score and matched_idf[index] >= self.min_coverage * query_idf
+            ]
+            # Ties go to the (priority, usage) order the entries were loaded in
+            ranked.sort(key=lambda item: (-item[1], item[0]))
+            return [(self._entries[index], score) for index, score in ranked]
+
+    def search(self, query: str, limit: int = 5) -> List[QuickActionEntry]:
+        """Quick actions relevant enough to answer the query, best first"""
+        return [entry for entry, _ in self.score(query)[:limit]]
+
+    def best(self, query: str):
+        """The single best matching quick action, or None"""
+        matches = self.search(query, limit=1)
+        return matches[0] if matches else None
+
+
+# Global quick action index instance
+quick_action_index = QuickActionIndex()
@@ -0,0 +1,134 @@
+"""
+EduBot Quiz Index
+Keeps active quiz ids bucketed by (category, difficulty) so a random
+question can be picked without loading the whole question bank
+"""
+
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from app import db
+from app.models.quote import Quiz
+from app.services.cache import TTLCache, watch_models
+
+class QuizIndex:
+    """In-memory index of active quiz ids with per-user no-repeat tracking"""
+
+    def __init__(self, refresh_interval: int = 300, seen_limit: int = 500, sample_attempts: int = 8,
+                 seen_users: int = 5000, seen_ttl: float = 86400):
+        self.refresh_interval = refresh_interval  # Picks up changes made by other workers
+        self.seen_limit = seen_limit  # Max quiz ids remembered per user
+        self.sample_attempts = sample_attempts
+        self._buckets: Dict[Tuple[str, str], List[int]] = {}
+        # user id -> seen quiz ids, for the most recent players; idle users are forgotten after seen_ttl
+        self._seen = TTLCache(maxsize=seen_users, ttl=seen_ttl)
+        self._lock = threading.Lock()
+        self._stale = True
+        self._built_at = 0.0
+
+    def invalidate(self):
+        """Mark the index as stale; it is rebuilt on next use"""
+        self._stale = True
+
+    def rebuild(self):
+        """Reload quiz ids from the database (ids only, no question text)"""
+        rows = db.session.query(Quiz.id, Quiz.category, Quiz.difficulty)\
+                         .filter(Quiz.is_active == True).all()
+
+        buckets = {}
+        for quiz_id, category, difficulty in rows:
+            buckets.setdefault((category, difficulty), []).append(quiz_id)
+
+        with self._lock:
+            self._buckets = buckets
+            self._stale = False
+            self._built_at = time.time()
+
+    def _ensure_fresh(self):
+        if self._stale or time.time() - self._built_at > self.refresh_interval:
+            self.rebuild()
+
+    def _matching_buckets(self, category: str = None, difficulty: str = None) -> List[List[int]]:
+        return [
+            ids for (bucket_category, bucket_difficulty), ids in self._buckets.items()
+            if ids
+            and (category is None or bucket_category == category)
+            and (difficulty is None or bucket_difficulty == difficulty)
+        ]
+
+    @staticmethod
+    def _pick(buckets: List[List[int]], total: int) -> int:
+        """Pick a uniformly random id across several buckets"""
+        position = random.randrange(total)
+        for ids in buckets:
+            if position < len(ids):
+                return ids[position]
+            position -= len(ids)
+        return buckets[-1][-1]
+
+    def sample_id(self, category: str = None, difficulty: str = None, user_id: int = None) -> Optional[int]:
+        """Pick a random quiz id, avoiding ids this user has already seen"""
+        self._ensure_fresh()
+
+        with self._lock:
+            buckets = self._matching_buckets(category, difficulty)
+            total = sum(len(ids) for ids in buckets)
+            if not total:
+                return None
+
+            seen = self._seen.get(user_id, set()) if user_id else None
+            if not seen:
+                quiz_id = self._pick(buckets, total)
+            else:
+                quiz_id = None
+                for _ in range(self.sample_attempts):
+                    candidate = self._pick(buckets, total)
+                    if candidate not in seen:
+                        quiz_id = candidate
+                        break
+
+                if quiz_id is None:
+                    # Most of this pool has been seen - look for what's left
+                    unseen = [i for ids in buckets for i in ids if i not in seen]
+                    if unseen:
+                        quiz_id = random.choice(unseen)
+                    else:
+                        # Everything seen: start this pool over
+                        for ids in buckets:
+                            seen.difference_update(ids)
+                        quiz_id = self._pick(buckets, total)
+
+            if seen is not None:
+                if len(seen) >= self.seen_limit:
+                    seen.clear()
+                seen.add(quiz_id)
+                self._seen.set(user_id, seen)
+
+            return quiz_id
+
+    def choose(self, category: str = None, difficulty: str = None, user_id: int = None) -> Optional[Quiz]:
+        """Pick a random active quiz and load just that row by primary key"""
+        for _ in range(2):
+            quiz_id = self.sample_id(category, difficulty, user_id)
+            if quiz_id is None:
+                return None
+
+            quiz = Quiz.query.get(quiz_id)
+            if quiz and quiz.is_active:
+                return quiz
+
+            # Row was removed or deactivated elsewhere - rebuild and retry once
+            self.invalidate()
+
+        return None
+
+    def forget_user(self, user_id: int):
+        """Drop the no-repeat history for a user"""
+        with self._lock:
+            self._seen.pop(user_id, None)
+
+
+# Global quiz index instance
+quiz_index = QuizIndex()
+watch_models(quiz_index.invalidate, Quiz)
@@ -0,0 +1,117 @@
+"""
+EduBot Active Quiz State
+Keeps each user's open quiz question in memory so A/B/C/D answers can be
+graded without looking the session up in the database
+"""
+
+from datetime import datetime
+from typing import Dict, Optional
+from app import db
+from app.models.quote import Quiz
+from app.models.quiz_session import QuizSession
+from app.services.cache import TTLCache
+
+class ActiveQuizCache:
+    """Bounded TTL cache of the active quiz per user, backed by quiz_sessions"""
+
+    def __init__(self, maxsize: int = 10000, ttl: int = 1800):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @staticmethod
+    def _state_for(session_id: int, quiz: Quiz) -> Dict:
+        """Everything needed to grade an answer, prefetched from the quiz row"""
+        return {
+            'session_id': session_id,
+            'quiz_id': quiz.id,
+            'correct_answer': quiz.correct_answer,
+            'points': quiz.points or 0,
+            'explanation': quiz.explanation
+        }
+
+    def start(self, user_id: int, quiz: Quiz, session_id: str = 'quiz-session') -> Dict:
+        """Close any open quiz for the user and open a new one in a single transaction"""
+        try:
+            QuizSession.query.filter_by(
+                user_id=user_id,
+                is_active=True
+            ).update({'is_active': False}, synchronize_session=False)
+
+            quiz_session = QuizSession(
+                user_id=user_id,
+                quiz_id=quiz.id,
+                session_id=session_id,
+                is_active=True
+            )
+            db.session.add(quiz_session)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            self._cache.pop(user_id)
+            raise
+
+        state = self._state_for(quiz_session.id, quiz)
+        self._cache.set(user_id, state)
+        return state
+
+    def get(self, user_id: int) -> Optional[Dict]:
+        """Return the user's active quiz, falling back to the database on a cache miss"""
+        state = self._cache.get(user_id)
+        if state:
+            return state
+
+        active_session = QuizSession.query.filter_by(
+            user_id=user_id,
+            is_active=True,
+            user_answer=None
+        ).order_by(QuizSession.created_at.desc()).first()
+
+        if not active_session or not active_session.quiz:
+            return None
+
+        state = self._state_for(active_session.id, active_session.quiz)
+        self._cache.set(user_id, state)
+        return state
+
+    def grade(self, user_id: int, user_answer: str) -> Optional[Dict]:
+        """Grade an answer against the active quiz and close it with one UPDATE"""
+        for _ in range(2):
+            state = self.get(user_id)
+            if not state:
+                return None
+
+            is_correct = user_answer.upper() == state['correct_answer']
+            points_earned = state['points'] if is_correct else 0
+
+            try:
+                updated = QuizSession.query.filter_by(
+                    id=state['session_id'],
+                    is_active=True,
+                    user_answer=None
+                ).update({
+                    'user_answer': user_answer,
+                    'is_correct': is_correct,
+                    'points_earned': points_earned,
+                    'answered_at': datetime.utcnow(),
+                    'is_active': False
+                }, synchronize_session=False)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                self._cache.pop(user_id)
+
+            if updated:
+                return dict(state, user_answer=user_answer, is_correct=is_correct, points_earned=points_earned)
+
+            # The cached session was closed elsewhere (e.g. by another worker) - retry from the database
+
+        return None
+
+    def discard(self, user_id: int):
+        """Forget the cached quiz for a user"""
+        self._cache.pop(user_id)
+
+
+# Global active quiz cache instance
+active_quizzes = ActiveQuizCache()
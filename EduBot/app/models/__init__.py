@@ -9,12 +9,17 @@ from .group import Group, GroupMember, GroupMessage
 from .quote import Quiz
 from .quiz_session import QuizSession
 from .chat_log import ChatLog
+from .chat_rollup import ChatHourlyRollup, ChatUserDailyRollup
 from .site_content import SiteContent
 from .intent import Intent
 from .quick_action import QuickAction
+from .department_synonym import DepartmentSynonym
+from .document import ExtractedDocument, DocumentChunk
 
 __all__ = [
     'User', 'Faculty', 'Course', 'Attendance', 'Event',
     'SyllabusFile', 'Note', 'Group', 'GroupMember', 'GroupMessage',
-    'Quiz', 'QuizSession', 'ChatLog', 'SiteContent', 'Intent', 'QuickAction'
+    'Quiz', 'QuizSession', 'ChatLog', 'ChatHourlyRollup', 'ChatUserDailyRollup',
+    'SiteContent', 'Intent', 'QuickAction',
+    'DepartmentSynonym', 'ExtractedDocument', 'DocumentChunk'
 ]
@@ -16,6 +16,11 @@ class ChatLog(db.Model):
     user_agent = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('idx_chat_logs_user_created', 'user_id', 'created_at', 'id'),  # Keyset history pages
+        db.Index('idx_chat_logs_created', 'created_at'),  # Date range scans (dashboard, exports, backfill)
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
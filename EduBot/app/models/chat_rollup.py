@@ -0,0 +1,46 @@
+from app import db
+
+class ChatHourlyRollup(db.Model):
+    """Chat log totals per hour and intent (maintained by app.services.chat_rollups)"""
+    __tablename__ = 'chat_rollups_hourly'
+    id = db.Column(db.Integer, primary_key=True)
+    hour = db.Column(db.DateTime, nullable=False)  # Start of the UTC hour
+    intent = db.Column(db.String(100), nullable=False, default='')  # '' for messages without an intent
+    messages = db.Column(db.Integer, nullable=False, default=0)
+    response_time_sum = db.Column(db.BigInteger, nullable=False, default=0)
+    response_time_count = db.Column(db.Integer, nullable=False, default=0)
+    confidence_sum = db.Column(db.Float, nullable=False, default=0.0)
+    confidence_count = db.Column(db.Integer, nullable=False, default=0)
+    user_sketch = db.Column(db.LargeBinary, nullable=True)  # HyperLogLog registers of user ids
+
+    __table_args__ = (db.UniqueConstraint('hour', 'intent', name='unique_rollup_hour_intent'),)
+
+    def to_dict(self):
+        return {
+            'hour': self.hour.isoformat() if self.hour else None,
+            'intent': self.intent or None,
+            'messages': self.messages,
+            'avg_response_time_ms': round(self.response_time_sum / self.response_time_count)
+                                    if self.response_time_count else None,
+            'avg_confidence': round(self.confidence_sum / self.confidence_count, 3)
+                              if self.confidence_count else None
+        }
+
+class ChatUserDailyRollup(db.Model):
+    """Messages per user per day, for the most active users table"""
+    __tablename__ = 'chat_rollups_user_daily'
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)  # No foreign key: totals outlive deleted users
+    messages = db.Column(db.Integer, nullable=False, default=0)
+    last_chat = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (db.UniqueConstraint('day', 'user_id', name='unique_rollup_day_user'),)
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat() if self.day else None,
+            'user_id': self.user_id,
+            'messages': self.messages,
+            'last_chat': self.last_chat.isoformat() if self.last_chat else None
+        }
@@ -23,6 +23,12 @@ class Course(db.Model):
     notes = db.relationship('Note', backref='course', lazy='dynamic', cascade='all, delete-orphan')
     groups = db.relationship('Group', backref='course', lazy='dynamic')
     
+    # Catalogue listings filter on these and page in (department, semester, course_code) order
+    __table_args__ = (
+        db.Index('idx_courses_catalogue', 'is_active', 'department', 'semester', 'course_code'),
+        db.Index('idx_courses_year_semester', 'year', 'semester'),
+    )
+    
     @property
     def name(self):
         """Return course name for consistency"""
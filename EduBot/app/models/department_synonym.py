@@ -0,0 +1,27 @@
+from datetime import datetime
+from app import db
+
+class DepartmentSynonym(db.Model):
+    __tablename__ = 'department_synonyms'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    phrase = db.Column(db.String(100), nullable=False)  # What students type, e.g. "cse"
+    department = db.Column(db.String(100), nullable=False)  # Matched against Faculty.department, e.g. "Computer Science"
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (db.UniqueConstraint('phrase', 'department', name='unique_department_synonym'),)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'phrase': self.phrase,
+            'department': self.department,
+            'created_by': self.created_by,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+    
+    def __repr__(self):
+        return f'<DepartmentSynonym {self.phrase} -> {self.department}>'
@@ -0,0 +1,45 @@
+from datetime import datetime
+from app import db
+
+class ExtractedDocument(db.Model):
+    __tablename__ = 'extracted_documents'
+    id = db.Column(db.Integer, primary_key=True)
+    source_type = db.Column(db.Enum('note', 'syllabus', name='document_source_type'), nullable=False)
+    source_id = db.Column(db.Integer, nullable=False)
+    course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), nullable=True)
+    title = db.Column(db.String(255), nullable=True)
+    file_path = db.Column(db.String(500), nullable=False)
+    content_hash = db.Column(db.String(64), nullable=True)
+    status = db.Column(db.Enum('done', 'failed', 'unsupported', name='document_status'), nullable=False, default='done')
+    error = db.Column(db.String(255), nullable=True)
+    char_count = db.Column(db.Integer, default=0)
+    chunk_count = db.Column(db.Integer, default=0)
+    extracted_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    chunks = db.relationship('DocumentChunk', backref='document', cascade='all, delete-orphan',
+                             order_by='DocumentChunk.position')
+
+    __table_args__ = (db.UniqueConstraint('source_type', 'source_id', name='unique_document_source'),)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'source_type': self.source_type,
+            'source_id': self.source_id,
+            'course_id': self.course_id,
+            'title': self.title,
+            'file_path': self.file_path,
+            'content_hash': self.content_hash,
+            'status': self.status,
+            'error': self.error,
+            'char_count': self.char_count,
+            'chunk_count': self.chunk_count,
+            'extracted_at': self.extracted_at.isoformat() if self.extracted_at else None
+        }
+
+class DocumentChunk(db.Model):
+    __tablename__ = 'document_chunks'
+    id = db.Column(db.Integer, primary_key=True)
+    document_id = db.Column(db.Integer, db.ForeignKey('extracted_documents.id'), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False)
+    text = db.Column(db.Text, nullable=False)
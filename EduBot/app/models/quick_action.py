@@ -1,6 +1,12 @@
 from datetime import datetime
 from app import db
 
+def split_keywords(keywords):
+    """Comma-separated keywords as a lowercase list"""
+    if not keywords:
+        return []
+    return [k.strip().lower() for k in keywords.split(',') if k.strip()]
+
 class QuickAction(db.Model):
     __tablename__ = 'quick_actions'
     
@@ -27,15 +33,17 @@ class QuickAction(db.Model):
     
     def increment_usage(self):
         """Increment usage count when this Q&A is used"""
-        self.usage_count += 1
-        self.updated_at = datetime.utcnow()
-        db.session.commit()
+        QuickAction.increment_usage_by_id(self.id)
+    
+    @staticmethod
+    def increment_usage_by_id(qa_id):
+        """Count a use without touching the database; counts are flushed in batches"""
+        from app.services.usage_counter import quick_action_usage
+        quick_action_usage.add(qa_id)
     
     def get_keywords_list(self):
         """Get keywords as a list"""
-        if not self.keywords:
-            return []
-        return [k.strip().lower() for k in self.keywords.split(',') if k.strip()]
+        return split_keywords(self.keywords)
     
     def set_keywords_from_list(self, keywords_list):
         """Set keywords from a list"""
@@ -45,19 +53,10 @@ class QuickAction(db.Model):
             self.keywords = None
     
     def matches_query(self, query):
-        """Check if this Q&A matches the user query"""
-        query_lower = query.lower().strip()
+        """Check if this Q&A matches the user query (by the same index the chatbot answers from)"""
+        from app.chatbot.quick_action_index import quick_action_index
         
-        # Check if query matches question
-        if query_lower in self.question.lower():
-            return True
-        
-        # Check if query matches any keywords
-        for keyword in self.get_keywords_list():
-            if keyword in query_lower or query_lower in keyword:
-                return True
-        
-        return False
+        return any(entry.id == self.id for entry, _ in quick_action_index.score(query))
     
     def to_dict(self):
         """Convert to dictionary for API responses"""
@@ -80,20 +79,15 @@ class QuickAction(db.Model):
     @staticmethod
     def search_for_answer(query, limit=5):
         """Search for matching Q&A pairs for a given query"""
-        # Get all active quick actions ordered by priority
-        quick_actions = QuickAction.query.filter_by(is_active=True).order_by(
-            QuickAction.priority.desc(),
-            QuickAction.usage_count.desc()
-        ).all()
+        from app.chatbot.quick_action_index import quick_action_index
         
-        matches = []
-        for qa in quick_actions:
-            if qa.matches_query(query):
-                matches.append(qa)
-                if len(matches) >= limit:
-                    break
+        # The in-memory index finds and orders the matches; only the winners are loaded
+        ids = [entry.id for entry in quick_action_index.search(query, limit)]
+        if not ids:
+            return []
         
-        return matches
+        rows = {qa.id: qa for qa in QuickAction.query.filter(QuickAction.id.in_(ids)).all()}
+        return [rows[qa_id] for qa_id in ids if qa_id in rows]
     
     @staticmethod
     def get_by_category(category):
@@ -105,7 +99,7 @@ class QuickAction(db.Model):
     
     @staticmethod
     def get_popular_questions(limit=10):
-        """Get most frequently used questions"""
+        """Get most frequently used questions (usage counts lag by up to one flush interval)"""
         return QuickAction.query.filter_by(is_active=True).order_by(
             QuickAction.usage_count.desc()
         ).limit(limit).all()
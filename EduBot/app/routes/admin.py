@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, Response, stream_with_context
 from flask_login import login_required, current_user
 from functools import wraps
 from werkzeug.utils import secure_filename
@@ -6,11 +6,18 @@ from app import db
 from app.models import User, Faculty, Course, Event, Attendance, ChatLog
 from app.models.note import Note
 from app.models.quick_action import QuickAction
+from app.chatbot.quick_action_index import quick_action_index
+from app.models.department_synonym import DepartmentSynonym
+from app.services.answer_cache import answer_cache
+from app.services.llm_budget import llm_budget
+from app.services.chat_history import chat_history
+from app.services.chat_rollups import chat_rollups
+from app.services.bulk_io import SPECS as BULK_SPECS, FORMATS as BULK_FORMATS, import_records, export_records
 from werkzeug.security import generate_password_hash
 from datetime import datetime, date, time, timedelta
 from wtforms.validators import DataRequired, Length, EqualTo
-from sqlalchemy import func, desc, and_
-from collections import defaultdict
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 import re
 import os
 
@@ -34,22 +41,21 @@ def dashboard():
     # Get basic statistics for dashboard
     try:
         total_users = User.query.count()
-        total_conversations = ChatLog.query.count()
         
-        # Active users today
-        today = datetime.now().date()
-        active_today = db.session.query(ChatLog.user_id).filter(
-            func.date(ChatLog.created_at) == today
-        ).distinct().count()
-        
-        # Average response time
-        avg_response_time = db.session.query(
+        # Conversation count and average response time in one pass (AVG skips NULLs)
+        total_conversations, avg_response_time = db.session.query(
+            func.count(ChatLog.id),
             func.avg(ChatLog.response_time_ms)
-        ).filter(
-            ChatLog.response_time_ms.isnot(None)
-        ).scalar()
+        ).one()
         avg_response_time = round(avg_response_time) if avg_response_time else 0
         
+        # Active users today: a created_at range, so the index can be used
+        today = datetime.combine(datetime.now().date(), time.min)
+        active_today = db.session.query(func.count(func.distinct(ChatLog.user_id))).filter(
+            ChatLog.created_at >= today,
+            ChatLog.created_at < today + timedelta(days=1)
+        ).scalar()
+        
     except Exception as e:
         # Fallback values if there's an error
         total_users = 0
@@ -62,7 +68,8 @@ def dashboard():
                          total_users=total_users,
                          total_conversations=total_conversations,
                          active_today=active_today,
-                         avg_response_time=avg_response_time)
+                         avg_response_time=avg_response_time,
+                         llm_budget=llm_budget.remaining())
 
 @admin_bp.route('/users')
 @login_required
@@ -1433,6 +1440,7 @@ def add_quick_action():
     )
     db.session.add(quick_action)
     db.session.commit()
+    quick_action_index.invalidate()
     return jsonify(success=True, message='Quick Action added successfully'), 201
 
 
@@ -1450,6 +1458,7 @@ def edit_quick_action(qa_id):
     quick_action.is_active = data.get('is_active', quick_action.is_active)
     quick_action.priority = data.get('priority', quick_action.priority)
     db.session.commit()
+    quick_action_index.invalidate()
     return jsonify(success=True, message='Quick Action updated successfully')
 
 
@@ -1469,8 +1478,177 @@ def delete_quick_action(qa_id):
     quick_action = QuickAction.query.get_or_404(qa_id)
     db.session.delete(quick_action)
     db.session.commit()
+    quick_action_index.invalidate()
     return jsonify(success=True, message='Quick Action deleted successfully')
 
+
+@admin_bp.route('/bulk/<kind>/import', methods=['POST'])
+@login_required
+@admin_required
+def bulk_import(kind):
+    """Import quick actions, intents or quizzes from an uploaded CSV/JSONL file"""
+    if kind not in BULK_SPECS:
+        return jsonify(success=False, message=f'Unknown data type: {kind}'), 404
+    
+    uploaded_file = request.files.get('file')
+    if not uploaded_file or not uploaded_file.filename:
+        return jsonify(success=False, message='Please choose a file to import'), 400
+    
+    fmt = request.form.get('format') or uploaded_file.filename.rsplit('.', 1)[-1].lower()
+    if fmt not in BULK_FORMATS:
+        return jsonify(success=False, message='File must be .csv or .jsonl'), 400
+    
+    try:
+        result = import_records(kind, uploaded_file.stream, fmt, created_by=current_user.id)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify(success=False, message=f'Error importing {kind}: {str(e)}'), 400
+    
+    message = f"Imported {kind}: {result['inserted']} added, {result['updated']} updated, {result['failed']} failed"
+    return jsonify(success=True, message=message, **result)
+
+
+@admin_bp.route('/bulk/<kind>/export', methods=['GET'])
+@login_required
+@admin_required
+def bulk_export(kind):
+    """Download quick actions, intents or quizzes as CSV/JSONL"""
+    if kind not in BULK_SPECS:
+        return jsonify(success=False, message=f'Unknown data type: {kind}'), 404
+    
+    fmt = request.args.get('format', 'csv')
+    if fmt not in BULK_FORMATS:
+        return jsonify(success=False, message='Format must be csv or jsonl'), 400
+    
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    filename = f"{kind}_{datetime.now().strftime('%Y%m%d')}.{fmt}"
+    return Response(
+        stream_with_context(export_records(kind, fmt)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+@admin_bp.route('/chat_logs/export', methods=['GET'])
+@login_required
+@admin_required
+def export_chat_logs():
+    """Stream chat logs for a date range (?start=YYYY-MM-DD&end=YYYY-MM-DD, end inclusive) as CSV or JSONL"""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in BULK_FORMATS:
+        return jsonify(success=False, message='Format must be csv or jsonl'), 400
+    
+    try:
+        start = request.args.get('start')
+        end = request.args.get('end')
+        start = datetime.strptime(start, '%Y-%m-%d') if start else None
+        end = datetime.strptime(end, '%Y-%m-%d') + timedelta(days=1) if end else None
+    except ValueError:
+        return jsonify(success=False, message='Dates must be YYYY-MM-DD'), 400
+    user_id = request.args.get('user_id', type=int)
+    
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    filename = f"chat_logs_{datetime.now().strftime('%Y%m%d')}.{fmt}"
+    return Response(
+        stream_with_context(chat_history.export(fmt, user_id=user_id, start=start, end=end)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+@admin_bp.route('/llm_cache', methods=['GET'])
+@login_required
+@admin_required
+def llm_cache_stats():
+    """Hit-rate and size of the AI answer cache"""
+    return jsonify(success=True, stats=answer_cache.stats())
+
+
+@admin_bp.route('/llm_cache/purge', methods=['POST'])
+@login_required
+@admin_required
+def purge_llm_cache():
+    """Delete cached AI answers: all of them, expired ones, or those matching a question"""
+    data = request.get_json(silent=True) or {}
+    try:
+        deleted = answer_cache.purge(
+            question_contains=(data.get('question_contains') or '').strip() or None,
+            expired_only=bool(data.get('expired_only'))
+        )
+    except Exception as e:
+        return jsonify(success=False, message=f'Error purging AI answer cache: {str(e)}'), 500
+    return jsonify(success=True, message=f'Removed {deleted} cached answers', deleted=deleted)
+
+
+@admin_bp.route('/llm_budget', methods=['GET'])
+@login_required
+@admin_required
+def llm_budget_status():
+    """Remaining AI call and token budget per window"""
+    return jsonify(success=True, budget=llm_budget.remaining())
+
+
+@admin_bp.route('/department_synonyms', methods=['GET'])
+@login_required
+@admin_required
+def list_department_synonyms():
+    """List department synonyms used by the chatbot"""
+    synonyms = DepartmentSynonym.query.order_by(DepartmentSynonym.department, DepartmentSynonym.phrase).all()
+    return jsonify([synonym.to_dict() for synonym in synonyms])
+
+
+@admin_bp.route('/department_synonyms/add', methods=['POST'])
+@login_required
+@admin_required
+def add_department_synonym():
+    """Add a department synonym (the chatbot's department index rebuilds automatically)"""
+    data = request.json or {}
+    phrase = (data.get('phrase') or '').strip().lower()
+    department = (data.get('department') or '').strip()
+
+    if not phrase or not department:
+        return jsonify(success=False, message='Phrase and department are required'), 400
+
+    if DepartmentSynonym.query.filter_by(phrase=phrase, department=department).first():
+        return jsonify(success=False, message='This synonym already exists'), 400
+
+    synonym = DepartmentSynonym(phrase=phrase, department=department, created_by=current_user.id)
+    db.session.add(synonym)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()  # Added concurrently by another request
+        return jsonify(success=False, message='This synonym already exists'), 400
+    return jsonify(success=True, message='Department synonym added successfully', synonym=synonym.to_dict()), 201
+
+
+@admin_bp.route('/department_synonyms/edit/<int:synonym_id>', methods=['PUT'])
+@login_required
+@admin_required
+def edit_department_synonym(synonym_id):
+    """Edit a department synonym"""
+    synonym = DepartmentSynonym.query.get_or_404(synonym_id)
+    data = request.json or {}
+    synonym.phrase = (data.get('phrase') or synonym.phrase).strip().lower()
+    synonym.department = (data.get('department') or synonym.department).strip()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify(success=False, message='This synonym already exists'), 400
+    return jsonify(success=True, message='Department synonym updated successfully')
+
+
+@admin_bp.route('/department_synonyms/delete/<int:synonym_id>', methods=['DELETE'])
+@login_required
+@admin_required
+def delete_department_synonym(synonym_id):
+    """Delete a department synonym"""
+    synonym = DepartmentSynonym.query.get_or_404(synonym_id)
+    db.session.delete(synonym)
+    db.session.commit()
+    return jsonify(success=True, message='Department synonym deleted successfully')
+
 @admin_bp.route('/users/<int:user_id>/view-password')
 @login_required
 @admin_required
@@ -1496,139 +1674,63 @@ def chat_analytics():
     start_date = request.args.get('start_date', '')
     end_date = request.args.get('end_date', '')
     
-    # Base query
-    query = ChatLog.query
-    
-    # Apply date filters if provided
+    # Dates are whole days: [start_date, end_date + 1 day)
+    start, end = None, None
     if start_date:
         try:
-            start_date_obj = datetime.strptime(start_date, '%Y-%m-%d')
-            query = query.filter(ChatLog.created_at >= start_date_obj)
+            start = datetime.strptime(start_date, '%Y-%m-%d')
         except ValueError:
             start_date = ''
     
     if end_date:
         try:
-            end_date_obj = datetime.strptime(end_date, '%Y-%m-%d')
-            # Add 23:59:59 to include the entire end date
-            end_date_obj = end_date_obj.replace(hour=23, minute=59, second=59)
-            query = query.filter(ChatLog.created_at <= end_date_obj)
+            end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
         except ValueError:
             end_date = ''
     
-    # Basic statistics
-    total_conversations = query.count()
+    # Everything below comes from the rollup tables, never from chat_logs
+    chat_rollups.flush()
+    summary = chat_rollups.summary(start, end)
     
     # Conversations by day (last 30 days or filtered range)
-    conversations_by_day = db.session.query(
-        func.date(ChatLog.created_at).label('date'),
-        func.count(ChatLog.id).label('count')
-    ).filter(ChatLog.created_at >= (datetime.now() - timedelta(days=30)))
-    
-    if start_date and end_date:
-        conversations_by_day = conversations_by_day.filter(
-            ChatLog.created_at >= datetime.strptime(start_date, '%Y-%m-%d')
-        ).filter(
-            ChatLog.created_at <= datetime.strptime(end_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59)
-        )
-    
-    conversations_by_day = conversations_by_day.group_by(func.date(ChatLog.created_at)).order_by('date').all()
-    
-    # Most common intents
-    top_intents = db.session.query(
-        ChatLog.intent,
-        func.count(ChatLog.id).label('count')
-    ).filter(ChatLog.intent.isnot(None))
-    
-    if start_date:
-        top_intents = top_intents.filter(ChatLog.created_at >= datetime.strptime(start_date, '%Y-%m-%d'))
-    if end_date:
-        top_intents = top_intents.filter(ChatLog.created_at <= datetime.strptime(end_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59))
-    
-    top_intents = top_intents.group_by(ChatLog.intent).order_by(desc('count')).limit(10).all()
-    
-    # Active users (users who have chatted)
-    active_users = db.session.query(
-        ChatLog.user_id,
-        func.count(ChatLog.id).label('message_count'),
-        func.max(ChatLog.created_at).label('last_chat')
-    )
-    
-    if start_date:
-        active_users = active_users.filter(ChatLog.created_at >= datetime.strptime(start_date, '%Y-%m-%d'))
-    if end_date:
-        active_users = active_users.filter(ChatLog.created_at <= datetime.strptime(end_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59))
-    
-    active_users = active_users.group_by(ChatLog.user_id).order_by(desc('message_count')).limit(10).all()
-    
-    # Average response time
-    avg_response_time = db.session.query(
-        func.avg(ChatLog.response_time_ms).label('avg_time')
-    )
-    
-    if start_date:
-        avg_response_time = avg_response_time.filter(ChatLog.created_at >= datetime.strptime(start_date, '%Y-%m-%d'))
-    if end_date:
-        avg_response_time = avg_response_time.filter(ChatLog.created_at <= datetime.strptime(end_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59))
-    
-    avg_response_time = avg_response_time.filter(ChatLog.response_time_ms.isnot(None)).scalar()
-    
-    # Average confidence score
-    avg_confidence = db.session.query(
-        func.avg(ChatLog.confidence_score).label('avg_confidence')
-    )
-    
-    if start_date:
-        avg_confidence = avg_confidence.filter(ChatLog.created_at >= datetime.strptime(start_date, '%Y-%m-%d'))
-    if end_date:
-        avg_confidence = avg_confidence.filter(ChatLog.created_at <= datetime.strptime(end_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59))
-    
-    avg_confidence = avg_confidence.filter(ChatLog.confidence_score.isnot(None)).scalar()
-    
-    # Hourly distribution (24 hours)
-    hourly_distribution = db.session.query(
-        func.extract('hour', ChatLog.created_at).label('hour'),
-        func.count(ChatLog.id).label('count')
-    )
-    
-    if start_date:
-        hourly_distribution = hourly_distribution.filter(ChatLog.created_at >= datetime.strptime(start_date, '%Y-%m-%d'))
-    if end_date:
-        hourly_distribution = hourly_distribution.filter(ChatLog.created_at <= datetime.strptime(end_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59))
-    
-    hourly_distribution = hourly_distribution.group_by(func.extract('hour', ChatLog.created_at)).order_by('hour').all()
+    since = (datetime.now() - timedelta(days=30)).date()
+    conversations_by_day = [(day, count) for day, count in summary['by_day'] if day >= since]
     
     # Get user details for active users
+    users = {user.id: user for user in User.query.filter(
+        User.id.in_([user_id for user_id, _, _ in summary['top_users']])
+    )}
     active_users_with_details = []
-    for user_stat in active_users:
-        user = User.query.get(user_stat.user_id)
-        if user:
+    for user_id, message_count, last_chat in summary['top_users']:
+        if user_id in users:
             active_users_with_details.append({
-                'user': user,
-                'message_count': user_stat.message_count,
-                'last_chat': user_stat.last_chat
+                'user': users[user_id],
+                'message_count': message_count,
+                'last_chat': last_chat
             })
     
     # Prepare data for charts
     chart_data = {
         'daily_conversations': {
-            'labels': [str(item.date) for item in conversations_by_day],
-            'data': [item.count for item in conversations_by_day]
+            'labels': [str(day) for day, _ in conversations_by_day],
+            'data': [count for _, count in conversations_by_day]
         },
         'top_intents': {
-            'labels': [item.intent or 'Unknown' for item in top_intents],
-            'data': [item.count for item in top_intents]
+            'labels': [intent for intent, _ in summary['top_intents']],
+            'data': [count for _, count in summary['top_intents']]
         },
         'hourly_distribution': {
-            'labels': [f'{int(item.hour):02d}:00' for item in hourly_distribution],
-            'data': [item.count for item in hourly_distribution]
+            'labels': [f'{hour:02d}:00' for hour, _ in summary['by_hour']],
+            'data': [count for _, count in summary['by_hour']]
         }
     }
     
+    avg_response_time = summary['avg_response_time_ms']
+    avg_confidence = summary['avg_confidence']
     return render_template('admin/chat_analytics.html',
                          user=current_user,
-                         total_conversations=total_conversations,
-                         active_users_count=len(active_users),
+                         total_conversations=summary['total_messages'],
+                         active_users_count=summary['active_users'],
                          avg_response_time=round(avg_response_time) if avg_response_time else 0,
                          avg_confidence=round(avg_confidence * 100, 2) if avg_confidence else 0,
                          active_users=active_users_with_details,
@@ -1,8 +1,8 @@
-from flask import Blueprint, render_template, request, jsonify, session
+from flask import Blueprint, render_template, request, jsonify, session, Response, stream_with_context
 from flask_login import login_required, current_user
-from app import db, limiter
-from app.models.chat_log import ChatLog
+from app import limiter
 from app.chatbot.engine import chatbot_engine
+from app.services.chat_history import chat_history as history_pages
 import time
 import uuid
 
@@ -57,26 +57,46 @@ def send_message():
 @chat_bp.route('/history')
 @login_required
 def chat_history():
-    """Get user's chat history"""
+    """Get user's chat history, newest first (pass next_cursor back as ?cursor= for older messages)"""
     try:
         limit = request.args.get('limit', 20, type=int)
-        offset = request.args.get('offset', 0, type=int)
+        cursor = request.args.get('cursor')
         
-        chats = ChatLog.query.filter_by(user_id=current_user.id)\
-                           .order_by(ChatLog.created_at.desc())\
-                           .limit(limit)\
-                           .offset(offset)\
-                           .all()
+        try:
+            chats, next_cursor = history_pages.page(current_user.id, limit, cursor)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
         
-        return jsonify({
+        response = {
             'chats': [chat.to_dict() for chat in chats],
-            'total': current_user.chat_logs.count()
-        })
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
+        if request.args.get('include_total', 'true').lower() != 'false':
+            response['total'] = history_pages.approximate_total(current_user.id)  # Cached, may lag a little
+        return jsonify(response)
         
     except Exception as e:
         print(f"Chat history error: {e}")
         return jsonify({'error': 'Failed to load chat history'}), 500
 
+@chat_bp.route('/history/export')
+@login_required
+@limiter.limit("5 per minute")
+def export_chat_history():
+    """Download the user's whole chat history as CSV or JSONL (?format=csv|jsonl)"""
+    fmt = request.args.get('format', 'jsonl')
+    if fmt not in ('csv', 'jsonl'):
+        return jsonify({'error': 'Format must be csv or jsonl'}), 400
+    
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    filename = f"chat_history_{time.strftime('%Y%m%d')}.{fmt}"
+    return Response(
+        stream_with_context(history_pages.export(fmt, user_id=current_user.id)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
 @chat_bp.route('/stats')
 @login_required
 def chat_stats():
@@ -0,0 +1,106 @@
+"""
+EduBot Chat Socket
+SocketIO namespace for chat: the user is looked up once when the socket
+connects, and each message then goes straight to the chatbot engine
+"""
+
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict
+from urllib.parse import urlparse
+from flask import current_app, g, request, session
+from flask_login import current_user
+from flask_socketio import Namespace, emit
+from app import db
+
+class ChatConnection:
+    """Per-socket state: the signed-in user and a sliding window of recent message times"""
+
+    def __init__(self, user, session_id: str):
+        self.user = user
+        self.session_id = session_id
+        self.sent = deque()
+
+    def allow(self, limit: int, window: float) -> bool:
+        now = time.monotonic()
+        while self.sent and now - self.sent[0] >= window:
+            self.sent.popleft()
+        if len(self.sent) >= limit:
+            return False
+        self.sent.append(now)
+        return True
+
+class ChatNamespace(Namespace):
+    """Handles 'message' events and replies with 'response' (or 'chat_error')"""
+
+    def __init__(self, namespace: str = '/chat'):
+        super().__init__(namespace)
+        self._connections: Dict[str, ChatConnection] = {}
+        self._lock = threading.Lock()
+
+    def on_connect(self, auth=None):
+        # Sessions are cookie based, so only accept sockets opened from our own pages
+        origin = request.headers.get('Origin')
+        if origin and urlparse(origin).netloc != request.host:
+            return False
+        if not current_user.is_authenticated:
+            return False
+
+        # Keep a detached copy of the user so later messages skip the user_loader query
+        user = current_user._get_current_object()
+        db.session.expunge(user)
+
+        if 'chat_session_id' not in session:
+            session['chat_session_id'] = str(uuid.uuid4())
+        with self._lock:
+            self._connections[request.sid] = ChatConnection(user, session['chat_session_id'])
+
+    def on_disconnect(self):
+        with self._lock:
+            self._connections.pop(request.sid, None)
+
+    def on_message(self, data):
+        from app.chatbot.engine import chatbot_engine
+
+        connection = self._connections.get(request.sid)
+        if connection is None:
+            return
+        data = data if isinstance(data, dict) else {'message': data}
+        message_id = data.get('id')
+        user_message = str(data.get('message') or '').strip()
+
+        if not user_message:
+            emit('chat_error', {'id': message_id, 'error': 'Message cannot be empty'})
+            return
+        limit = current_app.config.get('SOCKET_CHAT_RATE_LIMIT', 30)
+        window = current_app.config.get('SOCKET_CHAT_RATE_WINDOW', 60)
+        if not connection.allow(limit, window):
+            emit('chat_error', {'id': message_id, 'error': 'You are sending messages too quickly. Please wait a moment.'})
+            return
+
+        try:
+            # flask_login reads the user from g, so the engine sees the user we loaded at connect
+            g._login_user = connection.user
+            result = chatbot_engine.process_message(
+                user_message=user_message,
+                user_id=connection.user.id,
+                session_id=connection.session_id
+            )
+        except Exception as e:
+            print(f"Chat socket error: {e}")
+            emit('chat_error', {'id': message_id, 'error': 'Something went wrong. Please try again.'})
+            return
+
+        if result['success']:
+            emit('response', {
+                'id': message_id,
+                'response': result['response'],
+                'intent': result['intent'],
+                'confidence': result['confidence'],
+                'response_time': result['response_time_ms'],
+                'timestamp': time.time()
+            })
+        else:
+            emit('chat_error', {'id': message_id, 'error': result['response']})
@@ -0,0 +1,198 @@
+"""
+LLM Answer Cache
+Persists AI fallback answers in a local SQLite file keyed on the normalized
+question plus model and prompt version, with TTL and size-based eviction
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Messages that lean on the previous turn; their answer depends on history, not just the text
+FOLLOW_UP_PATTERN = re.compile(
+    r'^(and|but|also|so|then|what about|how about|explain|tell me more|more|again|continue)\b'
+    r'|\b(it|that|this|those|these|above|previous|same)\b'
+)
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return ' '.join(re.findall(r'[a-z0-9]+', question.lower()))
+
+class AnswerCache:
+    """SQLite-backed cache of generated answers"""
+
+    def __init__(self, path: str = None, ttl: int = 7 * 24 * 3600, max_entries: int = 5000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._connection = None
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def configure(self, path: str, ttl: int = None, max_entries: int = None):
+        """Point the cache at a file (called once the app config is known)"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+            self.path = path
+            if ttl is not None:
+                self.ttl = ttl
+            if max_entries is not None:
+                self.max_entries = max_entries
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            connection = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS answer_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    question TEXT NOT NULL,
+                    answer TEXT NOT NULL,
+                    model TEXT,
+                    prompt_version TEXT,
+                    created_at REAL NOT NULL,
+                    last_hit_at REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            connection.execute('CREATE INDEX IF NOT EXISTS idx_answer_cache_last_hit ON answer_cache (last_hit_at)')
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    @staticmethod
+    def cacheable(question: str) -> bool:
+        """Only standalone questions are shared between users"""
+        normalized = normalize_question(question)
+        return len(normalized.split()) >= 3 and not FOLLOW_UP_PATTERN.search(normalized)
+
+    @staticmethod
+    def make_key(question: str, model: str, prompt_version: str) -> str:
+        raw = f"{model}|{prompt_version}|{normalize_question(question)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, question: str, model: str, prompt_version: str) -> Optional[str]:
+        """Cached answer for the question, or None"""
+        if not self.path:
+            return None
+        key = self.make_key(question, model, prompt_version)
+        now = time.time()
+        try:
+            with self._lock:
+                connection = self._connect()
+                row = connection.execute(
+                    'SELECT answer, created_at FROM answer_cache WHERE cache_key = ?', (key,)
+                ).fetchone()
+                if row and now - row[1] <= self.ttl:
+                    connection.execute(
+                        'UPDATE answer_cache SET hits = hits + 1, last_hit_at = ? WHERE cache_key = ?', (now, key)
+                    )
+                    connection.commit()
+                    self.hits += 1
+                    return row[0]
+                if row:
+                    connection.execute('DELETE FROM answer_cache WHERE cache_key = ?', (key,))
+                    connection.commit()
+                self.misses += 1
+        except sqlite3.Error as e:
+            logger.error(f"Error reading answer cache: {e}")
+        return None
+
+    def set(self, question: str, answer: str, model: str, prompt_version: str):
+        """Store an answer, evicting the least recently used entries when over size"""
+        if not self.path or not answer:
+            return
+        key = self.make_key(question, model, prompt_version)
+        now = time.time()
+        try:
+            with self._lock:
+                connection = self._connect()
+                connection.execute(
+                    'INSERT OR REPLACE INTO answer_cache '
+                    '(cache_key, question, answer, model, prompt_version, created_at, last_hit_at, hits) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, 0)',
+                    (key, normalize_question(question), answer, model, prompt_version, now, now)
+                )
+                self.stores += 1
+                self._writes_since_evict += 1
+                # Eviction scans the table, so only run it every few writes
+                if self._writes_since_evict >= max(1, self.max_entries // 100):
+                    self._writes_since_evict = 0
+                    self._evict(connection, now)
+                connection.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error writing answer cache: {e}")
+
+    def _evict(self, connection: sqlite3.Connection, now: float):
+        expired = connection.execute('DELETE FROM answer_cache WHERE created_at < ?', (now - self.ttl,)).rowcount
+        overflow = connection.execute(
+            'DELETE FROM answer_cache WHERE cache_key IN ('
+            '  SELECT cache_key FROM answer_cache ORDER BY last_hit_at DESC LIMIT -1 OFFSET ?'
+            ')', (self.max_entries,)
+        ).rowcount
+        self.evictions += expired + overflow
+
+    def purge(self, question_contains: str = None, expired_only: bool = False) -> int:
+        """Delete cached answers (all, expired, or those whose question contains some text)"""
+        if not self.path:
+            return 0
+        with self._lock:
+            connection = self._connect()
+            if expired_only:
+                deleted = connection.execute(
+                    'DELETE FROM answer_cache WHERE created_at < ?', (time.time() - self.ttl,)
+                ).rowcount
+            elif question_contains:
+                deleted = connection.execute(
+                    'DELETE FROM answer_cache WHERE question LIKE ?', (f"%{normalize_question(question_contains)}%",)
+                ).rowcount
+            else:
+                deleted = connection.execute('DELETE FROM answer_cache').rowcount
+            connection.commit()
+        return deleted
+
+    def stats(self) -> Dict:
+        """Hit-rate counters for this process plus totals stored in the cache file"""
+        lookups = self.hits + self.misses
+        stats = {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'entries': 0,
+            'lifetime_hits': 0,
+            'ttl_seconds': self.ttl,
+            'max_entries': self.max_entries
+        }
+        if not self.path:
+            return stats
+        try:
+            with self._lock:
+                entries, lifetime_hits = self._connect().execute(
+                    'SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM answer_cache'
+                ).fetchone()
+            stats.update(entries=entries, lifetime_hits=lifetime_hits)
+        except sqlite3.Error as e:
+            logger.error(f"Error reading answer cache stats: {e}")
+        return stats
+
+
+# Global answer cache instance (configured by GeminiService.initialize)
+answer_cache = AnswerCache()
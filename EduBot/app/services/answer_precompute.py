@@ -0,0 +1,197 @@
+"""
+Answer Precomputation
+Clusters frequent unknown or AI-answered questions from the chat logs and
+turns each cluster into an inactive quick action for admins to approve
+"""
+
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+from app import db
+from app.models.chat_log import ChatLog
+from app.models.quick_action import QuickAction
+from app.chatbot.quick_action_index import quick_action_index, tokenize
+from app.services.prompt_builder import AI_PREFIX
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_INTENTS = ('gemini_ai', 'default')
+CANDIDATE_CATEGORY = 'AI Suggested'
+CANDIDATE_PRIORITY = 3
+MIN_ANSWER_LENGTH = 40
+
+# Words that change how a question is phrased but not what it asks about
+PHRASING_WORDS = {
+    'explain', 'exactly', 'basic', 'simple', 'simply', 'mean', 'meaning', 'define', 'definition',
+    'detail', 'example', 'briefly', 'understand', 'describe', 'actually', 'really'
+}
+
+def cluster_terms(message: str) -> List[str]:
+    """Quick-action tokens without phrasing words, with -ed/-ing endings folded"""
+    terms = []
+    for term in tokenize(message):
+        if term in PHRASING_WORDS:
+            continue
+        if len(term) > 5 and term.endswith('ing'):
+            term = term[:-3]
+        elif len(term) > 4 and term.endswith('ed'):
+            term = term[:-2]
+        terms.append(term)
+    return terms
+
+class QuestionCluster:
+    """Chat messages that ask the same thing in slightly different words"""
+
+    def __init__(self, terms: Set[str]):
+        self.terms = set(terms)
+        self.term_counts = Counter()
+        self.questions = Counter()
+        self.users = set()
+        self.count = 0
+        self.latest_answer = None
+        self._latest_at = None
+
+    def add(self, question: str, user_id: int, terms: List[str], answer: str = None, created_at: datetime = None):
+        self.questions[' '.join(question.split())] += 1
+        self.term_counts.update(set(terms))
+        self.users.add(user_id)
+        self.count += 1
+        if answer and (self._latest_at is None or (created_at and created_at > self._latest_at)):
+            self.latest_answer = answer
+            self._latest_at = created_at
+
+    def merge(self, other: 'QuestionCluster'):
+        self.questions.update(other.questions)
+        self.term_counts.update(other.term_counts)
+        self.users |= other.users
+        self.count += other.count
+        if other.latest_answer and (self._latest_at is None or
+                                    (other._latest_at and other._latest_at > self._latest_at)):
+            self.latest_answer = other.latest_answer
+            self._latest_at = other._latest_at
+
+    @property
+    def representative(self) -> str:
+        """The most common wording"""
+        return self.questions.most_common(1)[0][0]
+
+    def keywords(self, limit: int = 6) -> List[str]:
+        return [term for term, _ in self.term_counts.most_common(limit)]
+
+
+def _similarity(a: Set[str], b: Set[str]) -> float:
+    """Jaccard overlap, treating a question that only adds words to another (two or more shared) as the same"""
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    if shared >= 2 and shared == min(len(a), len(b)):
+        return 1.0
+    return shared / len(a | b)
+
+def collect_clusters(days: int = 30, min_count: int = 3, min_users: int = 2,
+                     similarity: float = 0.6, batch_size: int = 1000) -> List[QuestionCluster]:
+    """Frequent fallback questions from the last ``days``, most asked first"""
+    since = datetime.utcnow() - timedelta(days=days)
+    query = db.session.query(ChatLog.user_message, ChatLog.bot_response, ChatLog.intent,
+                             ChatLog.user_id, ChatLog.created_at)\
+                      .filter(ChatLog.intent.in_(FALLBACK_INTENTS), ChatLog.created_at >= since)\
+                      .execution_options(yield_per=batch_size)
+
+    # Messages with the same content words form one group
+    groups: Dict[frozenset, QuestionCluster] = {}
+    for message, response, intent, user_id, created_at in query:
+        terms = cluster_terms(message)
+        if not terms:
+            continue
+        signature = frozenset(terms)
+        group = groups.get(signature)
+        if group is None:
+            group = groups[signature] = QuestionCluster(signature)
+        answer = response[len(AI_PREFIX):] if intent == 'gemini_ai' and response.startswith(AI_PREFIX) else None
+        group.add(message, user_id, terms, answer, created_at)
+
+    # Fold similar groups into the most asked one; the term index keeps comparisons local
+    clusters: List[QuestionCluster] = []
+    by_term: Dict[str, List[int]] = defaultdict(list)
+    for group in sorted(groups.values(), key=lambda g: g.count, reverse=True):
+        candidates = {index for term in group.terms for index in by_term.get(term, ())}
+        best = max(candidates, key=lambda index: _similarity(clusters[index].terms, group.terms), default=None)
+        if best is not None and _similarity(clusters[best].terms, group.terms) >= similarity:
+            clusters[best].merge(group)
+            continue
+        for term in group.terms:
+            by_term[term].append(len(clusters))
+        clusters.append(group)
+
+    frequent = [c for c in clusters if c.count >= min_count and len(c.users) >= min_users]
+    return sorted(frequent, key=lambda c: c.count, reverse=True)
+
+
+def _vetted(answer: Optional[str]) -> Optional[str]:
+    """Drop answers that are empty, too short, or a limit/error notice rather than an answer"""
+    from app.services.gemini_service import QUOTA_MESSAGE, USER_LIMIT_MESSAGE
+    if not answer:
+        return None
+    answer = answer.strip()
+    if len(answer) < MIN_ANSWER_LENGTH or answer in (QUOTA_MESSAGE, USER_LIMIT_MESSAGE):
+        return None
+    return answer
+
+
+def precompute_answers(days: int = 30, min_count: int = 3, min_users: int = 2, max_calls: int = 20,
+                       reuse_logged: bool = False, dry_run: bool = False) -> Dict:
+    """
+    Publish one inactive quick action per frequent fallback question
+
+    Clusters already answered by an active quick action, or with a
+    candidate waiting for review, are skipped. At most ``max_calls``
+    answers are generated; with ``reuse_logged`` the latest logged AI
+    answer is used instead of calling the provider.
+    """
+    from app.services.gemini_service import gemini_service
+
+    result = {'clusters': 0, 'created': 0, 'already_answered': 0, 'pending_review': 0,
+              'failed': 0, 'candidates': []}
+    clusters = collect_clusters(days, min_count, min_users)
+    result['clusters'] = len(clusters)
+
+    existing = {question.strip().lower() for (question,) in db.session.query(QuickAction.question)}
+    calls = 0
+    for cluster in clusters:
+        question = cluster.representative
+        if quick_action_index.best(question):
+            result['already_answered'] += 1
+            continue
+        if question.lower() in existing:
+            result['pending_review'] += 1
+            continue
+
+        answer = cluster.latest_answer if reuse_logged else None
+        if not answer:
+            if calls >= max_calls:
+                break
+            calls += 1
+            answer = gemini_service.generate_offline(question)
+        answer = _vetted(answer)
+        if not answer:
+            result['failed'] += 1
+            continue
+
+        result['candidates'].append({'question': question, 'asked': cluster.count,
+                                     'users': len(cluster.users), 'keywords': cluster.keywords()})
+        existing.add(question.lower())
+        if not dry_run:
+            db.session.add(QuickAction(
+                question=question,
+                response=answer,
+                category=CANDIDATE_CATEGORY,
+                keywords=', '.join(cluster.keywords()),
+                priority=CANDIDATE_PRIORITY,
+                is_active=False  # Goes live only once an admin approves it
+            ))
+            db.session.commit()
+        result['created'] += 1
+
+    logger.info(f"Precomputed answers: {result['created']} candidates from {result['clusters']} clusters")
+    return result
@@ -0,0 +1,326 @@
+"""
+Bulk Import/Export Service
+Streams quick actions, intents and quizzes in and out as CSV or JSONL,
+upserting in batches and refreshing chatbot caches once per import
+"""
+
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Callable, Dict, IO, Iterable, Iterator, List, Tuple
+from sqlalchemy import insert, update
+from app import db
+from app.models.quick_action import QuickAction
+from app.models.intent import Intent
+from app.models.quote import Quiz
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('csv', 'jsonl')
+MAX_REPORTED_ERRORS = 50
+
+
+# Field converters: each takes the raw value and returns the cleaned one or raises ValueError
+
+def _text(required: bool = False, max_length: int = None) -> Callable:
+    def convert(value):
+        value = '' if value is None else str(value).strip()
+        if required and not value:
+            raise ValueError('is required')
+        if max_length and len(value) > max_length:
+            raise ValueError(f'is longer than {max_length} characters')
+        return value or None
+    return convert
+
+def _int(default: int = None) -> Callable:
+    def convert(value):
+        if value is None or str(value).strip() == '':
+            return default
+        return int(value)
+    return convert
+
+def _bool(default: bool = True) -> Callable:
+    def convert(value):
+        if value is None or str(value).strip() == '':
+            return default
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().lower()
+        if text in ('1', 'true', 'yes', 'y', 'active'):
+            return True
+        if text in ('0', 'false', 'no', 'n', 'inactive'):
+            return False
+        raise ValueError('must be true or false')
+    return convert
+
+def _choice(choices: Tuple[str, ...], default: str = None, upper: bool = False) -> Callable:
+    def convert(value):
+        if value is None or str(value).strip() == '':
+            if default is None:
+                raise ValueError('is required')
+            return default
+        value = str(value).strip()
+        value = value.upper() if upper else value.lower()
+        if value not in choices:
+            raise ValueError(f"must be one of {', '.join(choices)}")
+        return value
+    return convert
+
+def _json_list(required: bool = True) -> Callable:
+    """A list given as a JSON array (JSONL or CSV) or as 'a | b | c' (CSV)"""
+    def convert(value):
+        if isinstance(value, list):
+            items = value
+        elif value is None or str(value).strip() == '':
+            items = []
+        else:
+            text = str(value).strip()
+            items = json.loads(text) if text.startswith('[') else text.split('|')
+        items = [str(item).strip() for item in items if str(item).strip()]
+        if required and not items:
+            raise ValueError('needs at least one entry')
+        return json.dumps(items)
+    return convert
+
+
+class BulkSpec:
+    """How one model is read, keyed for upsert, written and refreshed"""
+
+    def __init__(self, model, key: Tuple[str, ...], fields: Dict[str, Callable],
+                 export_fields: List[str] = None, refresh: Callable = None, validate: Callable = None):
+        self.model = model
+        self.key = key  # Columns that identify an existing row for upsert
+        self.fields = fields
+        self.export_fields = export_fields or list(fields)
+        self.refresh = refresh  # Called once after an import that changed anything
+        self.validate = validate  # Optional whole-record check
+
+    def clean(self, record: Dict) -> Dict:
+        cleaned = {}
+        for name, convert in self.fields.items():
+            try:
+                cleaned[name] = convert(record.get(name))
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"{name} {e}")
+        if self.validate:
+            self.validate(cleaned)
+        return cleaned
+
+    def key_of(self, record: Dict) -> Tuple:
+        return tuple(record[column] for column in self.key)
+
+
+def _refresh_quick_actions():
+    from app.chatbot.quick_action_index import quick_action_index
+    quick_action_index.invalidate()
+
+def _refresh_intents():
+    from app.chatbot.engine import chatbot_engine
+    chatbot_engine.reload_intents()
+
+def _refresh_quizzes():
+    from app.chatbot.quiz_index import quiz_index
+    quiz_index.invalidate()
+
+def _validate_quiz(record: Dict):
+    option = {'A': 'option_a', 'B': 'option_b', 'C': 'option_c', 'D': 'option_d'}[record['correct_answer']]
+    if not record[option]:
+        raise ValueError(f"correct_answer {record['correct_answer']} points at an empty option")
+
+
+SPECS = {
+    'quick_actions': BulkSpec(
+        QuickAction,
+        key=('question',),
+        fields={
+            'question': _text(required=True),
+            'response': _text(required=True),
+            'category': _text(max_length=100),
+            'keywords': _text(),
+            'priority': _int(default=5),
+            'is_active': _bool(default=True)
+        },
+        export_fields=['id', 'question', 'response', 'category', 'keywords', 'priority', 'is_active', 'usage_count'],
+        refresh=_refresh_quick_actions
+    ),
+    'intents': BulkSpec(
+        Intent,
+        key=('intent_name',),
+        fields={
+            'intent_name': _text(required=True, max_length=100),
+            'description': _text(),
+            'patterns': _json_list(),
+            'responses': _json_list(),
+            'handler_function': _text(max_length=100),
+            'priority': _int(default=0),
+            'is_active': _bool(default=True)
+        },
+        export_fields=['id', 'intent_name', 'description', 'patterns', 'responses',
+                       'handler_function', 'priority', 'is_active'],
+        refresh=_refresh_intents
+    ),
+    'quizzes': BulkSpec(
+        Quiz,
+        key=('question', 'subject'),
+        fields={
+            'question': _text(required=True),
+            'option_a': _text(required=True, max_length=255),
+            'option_b': _text(required=True, max_length=255),
+            'option_c': _text(max_length=255),
+            'option_d': _text(max_length=255),
+            'correct_answer': _choice(('A', 'B', 'C', 'D'), upper=True),
+            'explanation': _text(),
+            'subject': _text(required=True, max_length=100),
+            'difficulty': _choice(('easy', 'medium', 'hard'), default='medium'),
+            'category': _choice(('general', 'computer_science', 'mathematics', 'science', 'history', 'literature'),
+                                default='general'),
+            'points': _int(default=1),
+            'is_active': _bool(default=True)
+        },
+        export_fields=['id', 'question', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_answer',
+                       'explanation', 'subject', 'difficulty', 'category', 'points', 'is_active'],
+        refresh=_refresh_quizzes,
+        validate=_validate_quiz
+    )
+}
+
+
+# Reading
+
+def iter_records(stream: IO, fmt: str) -> Iterator[Tuple[int, Dict]]:
+    """Yield (line number, record) one at a time from a binary or text stream"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='') if isinstance(stream.read(0), bytes) else stream
+
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, record
+    else:
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, ValueError(f"invalid JSON: {e.msg}")
+                continue
+            yield line_number, record if isinstance(record, dict) else ValueError('each line must be a JSON object')
+
+
+def import_records(kind: str, stream: IO, fmt: str, batch_size: int = 500, created_by: int = None) -> Dict:
+    """Validate and upsert records in batches; returns counts and the first few errors"""
+    spec = SPECS[kind]
+    result = {'inserted': 0, 'updated': 0, 'failed': 0, 'errors': []}
+    batch: Dict[Tuple, Dict] = {}
+
+    def error(line_number, message):
+        result['failed'] += 1
+        if len(result['errors']) < MAX_REPORTED_ERRORS:
+            result['errors'].append({'line': line_number, 'error': message})
+
+    for line_number, record in iter_records(stream, fmt):
+        if isinstance(record, Exception):
+            error(line_number, str(record))
+            continue
+        try:
+            cleaned = spec.clean(record)
+        except ValueError as e:
+            error(line_number, str(e))
+            continue
+
+        batch[spec.key_of(cleaned)] = cleaned  # Later lines win within a batch
+        if len(batch) >= batch_size:
+            _write_batch(spec, batch, result, created_by)
+            batch = {}
+
+    if batch:
+        _write_batch(spec, batch, result, created_by)
+
+    if (result['inserted'] or result['updated']) and spec.refresh:
+        try:
+            spec.refresh()
+        except Exception as e:
+            logger.error(f"Error refreshing caches after {kind} import: {e}")
+
+    logger.info(f"Imported {kind}: {result['inserted']} inserted, {result['updated']} updated, {result['failed']} failed")
+    return result
+
+
+def _write_batch(spec: BulkSpec, batch: Dict[Tuple, Dict], result: Dict, created_by: int = None):
+    """Upsert one batch: one SELECT for existing keys, one bulk INSERT, one bulk UPDATE"""
+    model = spec.model
+    key_columns = [getattr(model, column) for column in spec.key]
+
+    existing = {}
+    first_key = key_columns[0]
+    rows = db.session.query(model.id, *key_columns)\
+                     .filter(first_key.in_({key[0] for key in batch})).all()
+    for row in rows:
+        key = tuple(row[1:])
+        if key in batch:
+            existing[key] = row[0]
+
+    now = datetime.utcnow()
+    inserts, updates = [], []
+    for key, record in batch.items():
+        if key in existing:
+            updates.append(dict(record, id=existing[key], updated_at=now))
+        else:
+            inserts.append(dict(record, created_by=created_by, created_at=now, updated_at=now))
+
+    try:
+        if inserts:
+            db.session.execute(insert(model), inserts)
+        if updates:
+            db.session.execute(update(model), updates)
+        db.session.commit()
+        result['inserted'] += len(inserts)
+        result['updated'] += len(updates)
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error writing {model.__tablename__} batch: {e}")
+        result['failed'] += len(batch)
+        if len(result['errors']) < MAX_REPORTED_ERRORS:
+            result['errors'].append({'line': None, 'error': f"batch of {len(batch)} rows failed: {e}"})
+
+
+# Writing
+
+def stream_csv(header: List[str], rows: Iterable, chunk_size: int = 64 * 1024) -> Iterator[str]:
+    """Yield CSV text in chunks of about ``chunk_size`` characters"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() > chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_records(kind: str, fmt: str, batch_size: int = 500) -> Iterator[str]:
+    """Yield the table as CSV or JSONL text, reading it in batches"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    spec = SPECS[kind]
+    columns = [getattr(spec.model, name) for name in spec.export_fields]
+    query = db.session.query(*columns).order_by(spec.model.id).execution_options(yield_per=batch_size)
+
+    if fmt == 'csv':
+        yield from stream_csv(spec.export_fields, query)
+    else:
+        json_fields = {name for name in spec.export_fields if name in ('patterns', 'responses')}
+        for row in query:
+            record = dict(zip(spec.export_fields, row))
+            for name in json_fields:
+                try:
+                    record[name] = json.loads(record[name]) if record[name] else []
+                except json.JSONDecodeError:
+                    pass
+            yield json.dumps(record, ensure_ascii=False) + '\n'
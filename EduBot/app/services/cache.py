@@ -0,0 +1,75 @@
+"""
+Cache Helpers
+Shared building blocks for the in-memory caches and indexes used by the chatbot
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+
+
+def watch_models(callback, *models):
+    """Call ``callback()`` whenever a row of any of the given models is
+    inserted, updated or deleted through the ORM in this process."""
+    def _listener(mapper, connection, target):
+        callback()
+
+    for model in models:
+        for event_name in ('after_insert', 'after_update', 'after_delete'):
+            event.listen(model, event_name, _listener)
+
+
+def watch_rows(callback, *models):
+    """Like ``watch_models`` but calls ``callback(row)`` with the changed row,
+    for caches that invalidate per entity."""
+    def _listener(mapper, connection, target):
+        callback(target)
+
+    for model in models:
+        for event_name in ('after_insert', 'after_update', 'after_delete'):
+            event.listen(model, event_name, _listener)
+
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU cache whose entries expire after ``ttl`` seconds"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return entry[1] if entry else default
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
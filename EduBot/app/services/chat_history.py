@@ -0,0 +1,105 @@
+"""
+Chat History Pagination and Export
+Keyset pages over a user's chat logs on (created_at, id) with opaque
+cursors, so every page costs the same however far back the user scrolls,
+and streamed CSV/JSONL exports that read the logs in batches
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+from app import db
+from app.models.chat_log import ChatLog
+from app.services.bulk_io import FORMATS, stream_csv
+from app.services.cache import TTLCache
+
+MAX_PAGE_SIZE = 100
+EXPORT_FIELDS = ['id', 'user_id', 'session_id', 'created_at', 'intent', 'confidence_score',
+                 'response_time_ms', 'user_message', 'bot_response']
+
+def encode_cursor(chat: ChatLog) -> str:
+    """Opaque cursor pointing just past this row"""
+    raw = json.dumps([chat.created_at.isoformat(), chat.id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Position encoded by encode_cursor; raises ValueError for anything else"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, chat_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(chat_id)
+    except (TypeError, ValueError, json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+class ChatHistory:
+    """Newest-first pages of one user's chat logs, with a cached approximate total"""
+
+    def __init__(self, total_ttl: float = 300):
+        self._totals = TTLCache(maxsize=4096, ttl=total_ttl)
+
+    def page(self, user_id: int, limit: int = 20, cursor: str = None) -> Tuple[List[ChatLog], Optional[str]]:
+        """Up to ``limit`` chats older than the cursor, and the cursor for the next page (None at the end)"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        query = ChatLog.query.filter(ChatLog.user_id == user_id)
+        if cursor:
+            created_at, chat_id = decode_cursor(cursor)
+            query = query.filter(db.or_(
+                ChatLog.created_at < created_at,
+                db.and_(ChatLog.created_at == created_at, ChatLog.id < chat_id)
+            ))
+
+        # One extra row tells whether another page exists without counting
+        chats = query.order_by(ChatLog.created_at.desc(), ChatLog.id.desc()).limit(limit + 1).all()
+        if len(chats) > limit:
+            chats = chats[:limit]
+            return chats, encode_cursor(chats[-1])
+        return chats, None
+
+    def approximate_total(self, user_id: int) -> int:
+        """The user's chat count, recounted at most every ``total_ttl`` seconds"""
+        total = self._totals.get(user_id)
+        if total is None:
+            total = db.session.query(db.func.count(ChatLog.id)).filter(ChatLog.user_id == user_id).scalar() or 0
+            self._totals.set(user_id, total)
+        return total
+
+    def export(self, fmt: str, user_id: int = None, start: datetime = None, end: datetime = None,
+               batch_size: int = 1000) -> Iterator[str]:
+        """
+        Yield chat logs oldest first as CSV or JSONL text
+
+        Rows are plain column tuples read ``batch_size`` at a time through a
+        server-side cursor, so memory stays flat however many rows match.
+        ``start`` is inclusive and ``end`` exclusive.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+        columns = [getattr(ChatLog, name) for name in EXPORT_FIELDS]
+        query = db.session.query(*columns)
+        if user_id is not None:
+            query = query.filter(ChatLog.user_id == user_id)
+        if start is not None:
+            query = query.filter(ChatLog.created_at >= start)
+        if end is not None:
+            query = query.filter(ChatLog.created_at < end)
+        rows = query.order_by(ChatLog.created_at, ChatLog.id).execution_options(yield_per=batch_size)
+
+        if fmt == 'csv':
+            yield from stream_csv(EXPORT_FIELDS, (self._plain(row) for row in rows))
+        else:
+            for row in rows:
+                yield json.dumps(dict(zip(EXPORT_FIELDS, self._plain(row))), ensure_ascii=False) + '\n'
+
+    @staticmethod
+    def _plain(row) -> list:
+        """Column values as CSV/JSON friendly types"""
+        values = list(row)
+        created_at, confidence = EXPORT_FIELDS.index('created_at'), EXPORT_FIELDS.index('confidence_score')
+        values[created_at] = values[created_at].isoformat() if values[created_at] else None
+        values[confidence] = float(values[confidence]) if values[confidence] is not None else None
+        return values
+
+
+# Global chat history instance
+chat_history = ChatHistory()
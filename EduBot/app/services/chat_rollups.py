@@ -0,0 +1,425 @@
+"""
+Chat Analytics Rollups
+Keeps hourly per-intent totals and daily per-user counts of chat logs,
+buffered per worker and merged into the rollup tables in batches, so the
+analytics page reads a few hundred rollup rows instead of every log
+"""
+
+import atexit
+import hashlib
+import logging
+import math
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple
+from flask import current_app
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+from app import db
+from app.models.chat_log import ChatLog
+from app.models.chat_rollup import ChatHourlyRollup, ChatUserDailyRollup
+
+logger = logging.getLogger(__name__)
+
+
+class UserSketch:
+    """HyperLogLog distinct counter (2**precision one-byte registers); sketches merge by register max"""
+
+    def __init__(self, registers: bytes = None, precision: int = 8):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(registers) if registers else bytearray(self.size)
+
+    def add(self, value):
+        digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest()
+        hashed = int.from_bytes(digest, 'big')
+        index = hashed >> (64 - self.precision)
+        rest = (hashed << self.precision) & ((1 << 64) - 1)
+        rank = min(64 - self.precision, 64 - rest.bit_length()) + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: 'UserSketch') -> 'UserSketch':
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    @classmethod
+    def union(cls, sketches, batch: int = 512) -> 'UserSketch':
+        """Merge many stored sketches, taking each register's max across a batch at a time"""
+        merged = cls()
+        pending = []
+        for registers in sketches:
+            pending.append(registers)
+            if len(pending) >= batch:
+                merged.registers = bytearray(map(max, merged.registers, *pending))
+                pending = []
+        if pending:
+            merged.registers = bytearray(map(max, merged.registers, *pending))
+        return merged
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size ** 2 / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.size and zeros:
+            estimate = self.size * math.log(self.size / zeros)  # Small ranges: linear counting
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+
+class _HourTotals:
+    """Pending additions to one (hour, intent) rollup row"""
+
+    def __init__(self):
+        self.messages = 0
+        self.response_time_sum = 0
+        self.response_time_count = 0
+        self.confidence_sum = 0.0
+        self.confidence_count = 0
+        self.sketch = UserSketch()
+
+    def add(self, user_id: int, response_time_ms: Optional[int], confidence: Optional[float]):
+        self.messages += 1
+        if response_time_ms is not None:
+            self.response_time_sum += int(response_time_ms)
+            self.response_time_count += 1
+        if confidence is not None:
+            self.confidence_sum += float(confidence)
+            self.confidence_count += 1
+        self.sketch.add(user_id)
+
+
+def hour_of(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+class ChatRollups:
+    """Per-worker buffer of rollup increments, flushed every ``flush_interval`` seconds"""
+
+    def __init__(self, flush_interval: int = 30):
+        self.flush_interval = flush_interval
+        self._hours: Dict[Tuple[datetime, str], _HourTotals] = defaultdict(_HourTotals)
+        self._users: Dict[Tuple[date, int], list] = {}  # (day, user_id) -> [messages, last_chat]
+        self._lock = threading.Lock()
+        self._app = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    # Recording
+
+    def add(self, user_id: int, intent: Optional[str], created_at: datetime,
+            response_time_ms: int = None, confidence: float = None):
+        """Count one chat log; it reaches the rollup tables on the next flush"""
+        created_at = created_at or datetime.utcnow()
+        with self._lock:
+            self._add(self._hours, self._users, user_id, intent, created_at, response_time_ms, confidence)
+        if self._thread is None:
+            try:
+                self._start(current_app._get_current_object())
+            except RuntimeError:
+                pass
+
+    @staticmethod
+    def _add(hours, users, user_id, intent, created_at, response_time_ms, confidence):
+        hours[(hour_of(created_at), intent or '')].add(user_id, response_time_ms, confidence)
+        day_key = (created_at.date(), user_id)
+        totals = users.get(day_key)
+        if totals is None:
+            users[day_key] = [1, created_at]
+        else:
+            totals[0] += 1
+            totals[1] = max(totals[1], created_at)
+
+    def _start(self, app):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._app = app
+            self.flush_interval = app.config.get('ROLLUP_FLUSH_INTERVAL', self.flush_interval)
+            self._thread = threading.Thread(target=self._run, name='chat-rollups', daemon=True)
+            self._thread.start()
+        atexit.register(self.shutdown)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    # Writing
+
+    def flush(self) -> int:
+        """Merge buffered increments into the rollup tables; returns rollup rows touched"""
+        with self._lock:
+            hours, self._hours = self._hours, defaultdict(_HourTotals)
+            users, self._users = self._users, {}
+        if not hours and not users:
+            return 0
+
+        try:
+            app = self._app or current_app._get_current_object()
+            with app.app_context():
+                with db.engine.begin() as connection:
+                    self._write(connection, hours, users)
+            return len(hours) + len(users)
+        except Exception as e:
+            # Keep the increments for the next attempt
+            with self._lock:
+                for key, totals in hours.items():
+                    self._merge_hour(self._hours[key], totals)
+                for key, (messages, last_chat) in users.items():
+                    current = self._users.setdefault(key, [0, last_chat])
+                    current[0] += messages
+                    current[1] = max(current[1], last_chat)
+            logger.error(f"Error flushing chat rollups: {e}")
+            return 0
+
+    @staticmethod
+    def _merge_hour(target: _HourTotals, source: _HourTotals):
+        target.messages += source.messages
+        target.response_time_sum += source.response_time_sum
+        target.response_time_count += source.response_time_count
+        target.confidence_sum += source.confidence_sum
+        target.confidence_count += source.confidence_count
+        target.sketch.merge(source.sketch)
+
+    @staticmethod
+    def _write(connection, hours, users):
+        """
+        Add totals to existing rollup rows (one SELECT per table) and insert the rest
+
+        Counts are added in SQL, but sketches are merged here. Hour rows are
+        read FOR UPDATE where the database supports it, and each update only
+        applies if the stored sketch is still the one that was read; otherwise
+        the row is read again and re-merged, so concurrent flushes from other
+        workers never overwrite each other's registers. Two workers inserting
+        the same new row make one flush fail on the unique key; flush() keeps
+        its increments for the next attempt.
+        """
+        hourly = ChatHourlyRollup.__table__
+        daily = ChatUserDailyRollup.__table__
+
+        if hours:
+            existing = {}
+            for hour_keys in _batches(list(hours), 500):
+                rows = connection.execute(
+                    select(hourly.c.id, hourly.c.hour, hourly.c.intent, hourly.c.user_sketch)
+                    .where(hourly.c.hour.in_({hour for hour, _ in hour_keys}))
+                    .with_for_update()
+                )
+                for row in rows:
+                    existing[(row.hour, row.intent)] = row
+            inserts = []
+            for key, totals in hours.items():
+                row = existing.get(key)
+                if row is None:
+                    inserts.append({
+                        'hour': key[0], 'intent': key[1], 'messages': totals.messages,
+                        'response_time_sum': totals.response_time_sum,
+                        'response_time_count': totals.response_time_count,
+                        'confidence_sum': totals.confidence_sum,
+                        'confidence_count': totals.confidence_count,
+                        'user_sketch': totals.sketch.to_bytes()
+                    })
+                    continue
+                while row is not None:
+                    sketch = UserSketch(totals.sketch.to_bytes())
+                    if row.user_sketch:
+                        sketch.merge(UserSketch(row.user_sketch))
+                    unchanged = hourly.c.user_sketch.is_(None) if row.user_sketch is None \
+                        else hourly.c.user_sketch == row.user_sketch
+                    result = connection.execute(hourly.update().where(hourly.c.id == row.id, unchanged).values(
+                        messages=hourly.c.messages + totals.messages,
+                        response_time_sum=hourly.c.response_time_sum + totals.response_time_sum,
+                        response_time_count=hourly.c.response_time_count + totals.response_time_count,
+                        confidence_sum=hourly.c.confidence_sum + totals.confidence_sum,
+                        confidence_count=hourly.c.confidence_count + totals.confidence_count,
+                        user_sketch=sketch.to_bytes()
+                    ))
+                    if result.rowcount:
+                        break
+                    # Another worker merged into this row after we read it
+                    row = connection.execute(
+                        select(hourly.c.id, hourly.c.user_sketch).where(hourly.c.id == row.id).with_for_update()
+                    ).first()
+                if row is None:
+                    inserts.append({
+                        'hour': key[0], 'intent': key[1], 'messages': totals.messages,
+                        'response_time_sum': totals.response_time_sum,
+                        'response_time_count': totals.response_time_count,
+                        'confidence_sum': totals.confidence_sum,
+                        'confidence_count': totals.confidence_count,
+                        'user_sketch': totals.sketch.to_bytes()
+                    })
+            if inserts:
+                connection.execute(hourly.insert(), inserts)
+
+        if users:
+            existing = {}
+            for user_keys in _batches(list(users), 500):
+                rows = connection.execute(
+                    select(daily.c.id, daily.c.day, daily.c.user_id)
+                    .where(daily.c.day.in_({day for day, _ in user_keys}),
+                           daily.c.user_id.in_({user_id for _, user_id in user_keys}))
+                )
+                for row in rows:
+                    existing[(row.day, row.user_id)] = row.id
+            inserts = []
+            for (day, user_id), (messages, last_chat) in users.items():
+                row_id = existing.get((day, user_id))
+                if row_id is None:
+                    inserts.append({'day': day, 'user_id': user_id, 'messages': messages, 'last_chat': last_chat})
+                    continue
+                connection.execute(daily.update().where(daily.c.id == row_id).values(
+                    messages=daily.c.messages + messages,
+                    last_chat=db.case((daily.c.last_chat > last_chat, daily.c.last_chat), else_=last_chat)
+                ))
+            if inserts:
+                connection.execute(daily.insert(), inserts)
+
+    def backfill(self, start: datetime = None, end: datetime = None, batch_size: int = 5000) -> int:
+        """
+        Rebuild the rollups for whole days in [start, end) from chat_logs
+
+        Existing rollup rows in the range are replaced. Logs are read in one
+        ordered pass and written out a day at a time, so memory stays small.
+        Returns the number of chat logs counted.
+
+        Only this process's buffer is flushed first. Logs still buffered in
+        running web workers (up to ROLLUP_FLUSH_INTERVAL seconds' worth) are
+        added again when those workers flush, so run it with the app stopped
+        or with an ``end`` before the most recent chats.
+        """
+        self.flush()
+        if start is None:
+            start = db.session.query(func.min(ChatLog.created_at)).scalar()
+            if start is None:
+                return 0
+        start = datetime.combine(start.date(), datetime.min.time())
+        end = end or datetime.utcnow()
+        if end.time() != datetime.min.time():
+            end = datetime.combine(end.date(), datetime.min.time()) + timedelta(days=1)
+
+        # One transaction on one connection: readers never see a half rebuilt range,
+        # and the streamed read cannot lock out the writes (SQLite)
+        counted = 0
+        with db.engine.begin() as connection:
+            connection.execute(ChatHourlyRollup.__table__.delete().where(
+                ChatHourlyRollup.hour >= start, ChatHourlyRollup.hour < end))
+            connection.execute(ChatUserDailyRollup.__table__.delete().where(
+                ChatUserDailyRollup.day >= start.date(), ChatUserDailyRollup.day < end.date()))
+
+            logs = ChatLog.__table__
+            rows = connection.execution_options(yield_per=batch_size).execute(
+                select(logs.c.user_id, logs.c.intent, logs.c.created_at,
+                       logs.c.response_time_ms, logs.c.confidence_score)
+                .where(logs.c.created_at >= start, logs.c.created_at < end)
+                .order_by(logs.c.created_at)
+            )
+
+            hours, users = defaultdict(_HourTotals), {}
+            current_day = None
+            for user_id, intent, created_at, response_time_ms, confidence in rows:
+                if current_day is not None and created_at.date() != current_day and hours:
+                    self._write(connection, hours, users)
+                    hours, users = defaultdict(_HourTotals), {}
+                current_day = created_at.date()
+                self._add(hours, users, user_id, intent, created_at, response_time_ms,
+                          float(confidence) if confidence is not None else None)
+                counted += 1
+            if hours:
+                self._write(connection, hours, users)
+        return counted
+
+    def shutdown(self):
+        """Stop the flusher and write whatever is left"""
+        self._stop.set()
+        if self._app is not None:
+            self.flush()
+
+    # Reading
+
+    def summary(self, start: datetime = None, end: datetime = None, top: int = 10) -> Dict:
+        """All analytics page figures for [start, end), read from the rollup tables only"""
+        hour_filters = []
+        day_filters = []
+        if start is not None:
+            hour_filters.append(ChatHourlyRollup.hour >= start)
+            day_filters.append(ChatUserDailyRollup.day >= start.date())
+        if end is not None:
+            hour_filters.append(ChatHourlyRollup.hour < end)
+            day_filters.append(ChatUserDailyRollup.day < end.date())
+
+        # One pass over the hour rows in range yields every per-hour figure together
+        messages = response_time_sum = response_time_count = confidence_count = 0
+        confidence_sum = 0.0
+        by_day = defaultdict(int)
+        by_hour = defaultdict(int)
+        by_intent = defaultdict(int)
+        sketches = []
+        rows = db.session.query(
+            ChatHourlyRollup.hour, ChatHourlyRollup.intent, ChatHourlyRollup.messages,
+            ChatHourlyRollup.response_time_sum, ChatHourlyRollup.response_time_count,
+            ChatHourlyRollup.confidence_sum, ChatHourlyRollup.confidence_count, ChatHourlyRollup.user_sketch
+        ).filter(*hour_filters)
+        for row in rows:
+            messages += row.messages
+            response_time_sum += row.response_time_sum
+            response_time_count += row.response_time_count
+            confidence_sum += row.confidence_sum
+            confidence_count += row.confidence_count
+            by_day[row.hour.date()] += row.messages
+            by_hour[row.hour.hour] += row.messages
+            if row.intent:
+                by_intent[row.intent] += row.messages
+            if row.user_sketch:
+                sketches.append(row.user_sketch)
+        sketch = UserSketch.union(sketches)
+        top_intents = sorted(by_intent.items(), key=lambda item: item[1], reverse=True)[:top]
+
+        top_users = db.session.query(
+            ChatUserDailyRollup.user_id,
+            func.sum(ChatUserDailyRollup.messages).label('message_count'),
+            func.max(ChatUserDailyRollup.last_chat).label('last_chat')
+        ).filter(*day_filters)\
+         .group_by(ChatUserDailyRollup.user_id).order_by(db.desc('message_count')).limit(top).all()
+
+        return {
+            'total_messages': int(messages),
+            'active_users': sketch.count() if messages else 0,
+            'avg_response_time_ms': response_time_sum / response_time_count if response_time_count else None,
+            'avg_confidence': confidence_sum / confidence_count if confidence_count else None,
+            'by_day': sorted(by_day.items()),
+            'by_hour': sorted(by_hour.items()),
+            'top_intents': top_intents,
+            'top_users': [(user_id, int(count), last_chat) for user_id, count, last_chat in top_users]
+        }
+
+
+def _batches(items, size):
+    for index in range(0, len(items), size):
+        yield items[index:index + size]
+
+
+# Global rollup instance
+chat_rollups = ChatRollups()
+
+@event.listens_for(ChatLog, 'after_insert')
+def _remember_new_log(mapper, connection, target):
+    """Note new logs on their session; they are counted once it commits"""
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault('rollup_pending', []).append((
+            target.user_id, target.intent, target.created_at, target.response_time_ms,
+            float(target.confidence_score) if target.confidence_score is not None else None
+        ))
+
+@event.listens_for(Session, 'after_commit')
+def _count_after_commit(session):
+    for log in session.info.pop('rollup_pending', ()):
+        chat_rollups.add(*log)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('rollup_pending', None)
@@ -0,0 +1,100 @@
+"""
+Circuit Breaker
+Stops calling a failing upstream after consecutive failures and lets a
+single probe through once the cool-down has passed
+"""
+
+import threading
+import time
+from typing import Dict
+
+class CircuitBreaker:
+    """closed -> (failure_threshold failures) -> open -> (reset_timeout) -> half-open -> closed/open"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0, probe_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout  # A probe not reported back by then is treated as lost
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._open_for = reset_timeout
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self._open_for:
+                return self.HALF_OPEN
+            return self._state
+
+    def available(self) -> bool:
+        """Whether allow() would let a call out now, without taking the probe slot"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                return time.monotonic() - self._opened_at >= self._open_for
+            return not self._probe_busy()
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (in half-open state only one probe at a time).
+        Call it right before the call and report the outcome with record_success,
+        record_failure or open_for; a probe never reported back expires after probe_timeout."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self._open_for:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._probe_busy():
+                return False
+            self._probe_in_flight = True
+            self._probe_started = time.monotonic()
+            return True
+
+    def _probe_busy(self) -> bool:
+        return self._probe_in_flight and time.monotonic() - self._probe_started < self.probe_timeout
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._trip(self.reset_timeout)
+
+    def open_for(self, seconds: float):
+        """Open immediately for a known outage (e.g. quota exhausted)"""
+        with self._lock:
+            self._failures = max(self._failures, self.failure_threshold)
+            self._probe_in_flight = False
+            self._trip(seconds)
+
+    def _trip(self, seconds: float):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._open_for = seconds
+
+    def get_status(self) -> Dict:
+        state = self.state
+        with self._lock:
+            retry_in = max(0.0, self._open_for - (time.monotonic() - self._opened_at)) if state == self.OPEN else 0.0
+            return {
+                'state': state,
+                'consecutive_failures': self._failures,
+                'retry_in_seconds': round(retry_in, 1)
+            }
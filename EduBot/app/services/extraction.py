@@ -0,0 +1,305 @@
+"""
+Text Extraction Service
+Pulls plain text out of uploaded notes and syllabus files on a background
+worker pool and stores it as searchable chunks, skipping unchanged files
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Optional, Tuple
+from xml.etree import ElementTree
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app import db
+from app.models.note import Note
+from app.models.syllabus import SyllabusFile
+from app.models.document import ExtractedDocument, DocumentChunk
+from app.services.cache import watch_rows
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # In requirements.txt; without it PDFs stay 'unsupported' until it is installed
+    PdfReader = None
+
+logger = logging.getLogger(__name__)
+
+SOURCES = {
+    'note': Note,
+    'syllabus': SyllabusFile
+}
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+DRAWING_NS = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+
+
+class UnsupportedFormat(Exception):
+    """Raised when a file type has no text extractor"""
+
+
+# Extractors
+
+def _extract_txt(path: str) -> str:
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8', errors='replace')
+
+def _extract_docx(path: str) -> str:
+    with zipfile.ZipFile(path) as archive:
+        root = ElementTree.fromstring(archive.read('word/document.xml'))
+    return '\n\n'.join(
+        ''.join(node.text or '' for node in paragraph.iter(f'{WORD_NS}t'))
+        for paragraph in root.iter(f'{WORD_NS}p')
+    )
+
+def _extract_pptx(path: str) -> str:
+    with zipfile.ZipFile(path) as archive:
+        slides = sorted(
+            (name for name in archive.namelist() if re.match(r'ppt/slides/slide\d+\.xml$', name)),
+            key=lambda name: int(re.search(r'(\d+)', name.rsplit('/', 1)[1]).group(1))
+        )
+        pages = []
+        for name in slides:
+            root = ElementTree.fromstring(archive.read(name))
+            pages.append('\n'.join(
+                ''.join(node.text or '' for node in paragraph.iter(f'{DRAWING_NS}t'))
+                for paragraph in root.iter(f'{DRAWING_NS}p')
+            ))
+    return '\n\n'.join(pages)
+
+def _extract_pdf(path: str) -> str:
+    if PdfReader is None:
+        raise UnsupportedFormat('PDF support needs the pypdf package')
+    reader = PdfReader(path)
+    return '\n\n'.join(page.extract_text() or '' for page in reader.pages)
+
+EXTRACTORS = {
+    'txt': _extract_txt,
+    'docx': _extract_docx,
+    'pptx': _extract_pptx,
+    'pdf': _extract_pdf
+}
+
+def _extension(path: str) -> str:
+    return path.rsplit('.', 1)[-1].lower() if '.' in path else ''
+
+def has_extractor(path: str) -> bool:
+    """Whether text can be extracted from this file type with the packages installed now"""
+    extension = _extension(path)
+    if extension == 'pdf':
+        return PdfReader is not None
+    return extension in EXTRACTORS
+
+def extract_text(path: str) -> str:
+    """Plain text of a file, chosen by extension"""
+    extension = _extension(path)
+    extractor = EXTRACTORS.get(extension)
+    if extractor is None:
+        raise UnsupportedFormat(f'No text extractor for .{extension} files')
+    return extractor(path)
+
+def chunk_text(text: str, size: int = 1200) -> List[str]:
+    """Split text into chunks of about ``size`` characters on paragraph, then word, boundaries"""
+    paragraphs = [' '.join(p.split()) for p in re.split(r'\n\s*\n', text)]
+    chunks, current = [], ''
+
+    for paragraph in filter(None, paragraphs):
+        while len(paragraph) > size:
+            cut = paragraph.rfind(' ', 0, size)
+            cut = cut if cut > 0 else size
+            if current:
+                chunks.append(current)
+                current = ''
+            chunks.append(paragraph[:cut])
+            paragraph = paragraph[cut:].strip()
+
+        if current and len(current) + len(paragraph) + 1 > size:
+            chunks.append(current)
+            current = ''
+        current = f"{current}\n{paragraph}" if current else paragraph
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(65536), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractionService:
+    """Background worker pool that keeps extracted_documents in step with uploaded files"""
+
+    def __init__(self):
+        self._executor = None
+        self._queued = set()  # (source_type, source_id) waiting or running
+        self._again = set()  # changed again while queued - run once more when done
+        self._lock = threading.Lock()
+
+    def _get_executor(self, app) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=app.config.get('EXTRACTION_WORKERS', 2),
+                        thread_name_prefix='extraction'
+                    )
+        return self._executor
+
+    # Queueing
+
+    def on_row_change(self, row):
+        """Remember changed upload rows on their session; they are queued once it commits"""
+        session = object_session(row)
+        if session is None:
+            return
+        source_type = 'note' if isinstance(row, Note) else 'syllabus'
+        session.info.setdefault('extraction_pending', set()).add((source_type, row.id))
+
+    def submit(self, source_type: str, source_id: int, app=None):
+        """Queue one upload for extraction without waiting for it"""
+        app = app or current_app._get_current_object()
+        key = (source_type, source_id)
+        with self._lock:
+            if key in self._queued:
+                self._again.add(key)
+                return
+            self._queued.add(key)
+        self._get_executor(app).submit(self._run, app, key)
+
+    def scan(self, app=None):
+        """Queue uploads that have no extracted document yet or changed since the last extraction"""
+        app = app or current_app._get_current_object()
+        for source_type, model in SOURCES.items():
+            rows = db.session.query(model.id).outerjoin(
+                ExtractedDocument,
+                db.and_(ExtractedDocument.source_type == source_type,
+                        ExtractedDocument.source_id == model.id)
+            ).filter(
+                model.is_active == True,
+                model.file_path.isnot(None),
+                db.or_(ExtractedDocument.id.is_(None),
+                       ExtractedDocument.extracted_at < model.updated_at,
+                       ExtractedDocument.status == 'unsupported')  # An extractor may have been installed since
+            ).all()
+            for (source_id,) in rows:
+                self.submit(source_type, source_id, app)
+
+    def _run(self, app, key: Tuple[str, int]):
+        try:
+            with app.app_context():
+                try:
+                    self.process(*key)
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Error extracting text from {key[0]} {key[1]}: {e}")
+        finally:
+            with self._lock:
+                self._queued.discard(key)
+                again = key in self._again
+                self._again.discard(key)
+            if again:
+                self.submit(*key, app=app)
+
+    # Processing
+
+    @staticmethod
+    def resolve_path(file_path: str) -> str:
+        """Stored paths are relative to the static folder ('uploads/x.pdf')"""
+        if os.path.isabs(file_path):
+            return file_path
+        return os.path.join(current_app.static_folder, file_path)
+
+    def process(self, source_type: str, source_id: int) -> Optional[ExtractedDocument]:
+        """Extract and chunk one upload if its file content changed; runs inside an app context"""
+        row = SOURCES[source_type].query.get(source_id)
+        document = ExtractedDocument.query.filter_by(source_type=source_type, source_id=source_id).first()
+
+        if not row or not row.is_active or not row.file_path:
+            if document:
+                db.session.delete(document)
+                db.session.commit()
+            return None
+
+        path = self.resolve_path(row.file_path)
+        if not os.path.exists(path):
+            logger.warning(f"Upload for {source_type} {source_id} is missing: {path}")
+            return document
+
+        digest = file_hash(path)
+        retry = document is not None and (
+            document.status == 'failed' or (document.status == 'unsupported' and has_extractor(path))
+        )
+        if document and document.content_hash == digest and not retry:
+            if document.file_path != row.file_path:
+                document.file_path = row.file_path
+            document.title = row.title if source_type == 'note' else row.original_name
+            document.course_id = row.course_id
+            document.extracted_at = datetime.utcnow()
+            db.session.commit()
+            return document
+
+        if document is None:
+            document = ExtractedDocument(source_type=source_type, source_id=source_id)
+            db.session.add(document)
+
+        document.course_id = row.course_id
+        document.title = row.title if source_type == 'note' else row.original_name
+        document.file_path = row.file_path
+        document.content_hash = digest
+        document.extracted_at = datetime.utcnow()
+        document.error = None
+
+        try:
+            chunks = chunk_text(extract_text(path), current_app.config.get('EXTRACTION_CHUNK_SIZE', 1200))
+            document.status = 'done'
+        except UnsupportedFormat as e:
+            chunks = []
+            document.status = 'unsupported'
+            document.error = str(e)[:255]
+        except Exception as e:
+            chunks = []
+            document.status = 'failed'
+            document.error = str(e)[:255]
+            logger.error(f"Error extracting text from {path}: {e}")
+
+        document.chunks = [DocumentChunk(position=i, text=chunk) for i, chunk in enumerate(chunks)]
+        document.char_count = sum(len(chunk) for chunk in chunks)
+        document.chunk_count = len(chunks)
+        db.session.commit()
+        return document
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+# Global extraction service instance
+extraction_service = ExtractionService()
+watch_rows(extraction_service.on_row_change, Note, SyllabusFile)
+
+@event.listens_for(Session, 'after_commit')
+def _submit_after_commit(session):
+    """Hand committed uploads to the worker pool"""
+    pending = session.info.pop('extraction_pending', None)
+    if not pending:
+        return
+    try:
+        app = current_app._get_current_object()
+    except RuntimeError:
+        return
+    for source_type, source_id in pending:
+        extraction_service.submit(source_type, source_id, app)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('extraction_pending', None)
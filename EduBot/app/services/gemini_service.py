@@ -1,152 +1,252 @@
 """
 Gemini AI Service Module
-Handles integration with Google's Gemini AI API for intelligent responses
+Handles the AI fallback for intelligent responses, through Google's Gemini API
+or the local stand-in provider (LLM_PROVIDER)
 """
 
 import os
 import time
 import logging
 from typing import Optional, Dict, Any
-import google.generativeai as genai
 from flask import current_app
+from app.services.answer_cache import answer_cache
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.llm_budget import llm_budget, estimate_tokens, ANSWER_TOKENS, USER_LIMIT, DAILY_LIMIT
+from app.services.llm_limiter import llm_limiter
+from app.services.llm_providers import LLMProvider, create_provider
+from app.services.prompt_builder import prompt_builder
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MODEL_NAME = 'gemini-1.5-flash'
+PROMPT_VERSION = '3'  # Bump when the prompt builder changes so cached answers are not reused
+
+QUOTA_MESSAGE = "I'd love to help with that question, but I've reached my daily limit for AI responses. Please try again tomorrow, or ask about college-specific topics like faculty, courses, events, or attendance that I can answer from our database!"
+USER_LIMIT_MESSAGE = "You've asked a lot of AI questions recently, so I'm pausing AI answers for you for a little while. I can still help with faculty, courses, events, notes, or attendance from our database!"
+
 class GeminiService:
     """Service class for interacting with Google Gemini AI"""
     
     def __init__(self):
-        self.model = None
+        self.provider: Optional[LLMProvider] = None
         self.is_initialized = False
-        self.max_retries = 3
-        self.retry_delay = 1
+        self.model_name = MODEL_NAME
+        self.max_retries = 2
+        self.call_timeout = 6.0  # Seconds allowed for one API call
+        self.min_call_time = 1.0  # Don't start an attempt with less time than this left
+        self.request_budget = 8.0  # Default overall deadline when the caller gives none
+        self.quota_cooldown = 300.0  # Stop calling for this long after a quota error
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0)
         
     def initialize(self, api_key: str = None):
-        """Initialize the Gemini AI service with API key"""
+        """Initialize the AI service with the configured provider (Gemini needs an API key)"""
         try:
-            # Get API key from parameter or environment
-            if not api_key:
-                api_key = os.environ.get('GEMINI_API_KEY')
+            try:
+                config = current_app.config
+            except RuntimeError:
+                config = {}
             
-            if not api_key or api_key == 'your-gemini-api-key-here':
-                logger.warning("Gemini API key not configured. Gemini features will be disabled.")
-                return False
+            if config.get('LLM_PROVIDER', 'gemini') == 'gemini':
+                # Get API key from parameter or environment
+                if not api_key:
+                    api_key = os.environ.get('GEMINI_API_KEY')
+                
+                if not api_key or api_key == 'your-gemini-api-key-here':
+                    logger.warning("Gemini API key not configured. Gemini features will be disabled.")
+                    return False
             
-            # Configure the API
-            genai.configure(api_key=api_key)
+            # Configure the provider and model
+            self.provider = create_provider(config, api_key, MODEL_NAME)
+            self.model_name = self.provider.model_name
             
-            # Initialize the model
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
+            # Answers are cached in a local SQLite file next to the app's instance data
+            if config:
+                answer_cache.configure(
+                    config.get('LLM_CACHE_PATH') or os.path.join(current_app.instance_path, 'llm_cache.db'),
+                    ttl=config.get('LLM_CACHE_TTL'),
+                    max_entries=config.get('LLM_CACHE_MAX_ENTRIES')
+                )
+                llm_budget.configure(
+                    config.get('LLM_BUDGET_PATH') or os.path.join(current_app.instance_path, 'llm_budget.db'),
+                    config
+                )
+            else:
+                logger.warning("No app context - Gemini answer cache and budget disabled")
+            
+            # Timeouts, circuit breaker and concurrency settings
+            self.call_timeout = config.get('GEMINI_CALL_TIMEOUT', self.call_timeout)
+            self.request_budget = config.get('LLM_REQUEST_BUDGET', self.request_budget)
+            self.breaker = CircuitBreaker(
+                failure_threshold=config.get('GEMINI_BREAKER_THRESHOLD', 3),
+                reset_timeout=config.get('GEMINI_BREAKER_RESET', 30.0),
+                probe_timeout=self.call_timeout * 2  # A probe is one call, bounded by call_timeout
+            )
+            prompt_builder.configure(config)
+            llm_limiter.configure(
+                max_concurrent=config.get('LLM_MAX_CONCURRENT'),
+                queue_timeout=config.get('LLM_QUEUE_TIMEOUT')
+            )
             
             # Skip the test connection for now to prevent startup hanging
             # The connection will be tested when first used
             self.is_initialized = True
-            logger.info("Gemini AI service initialized successfully")
+            logger.info(f"AI service initialized successfully ({self.provider.name}: {self.model_name})")
             return True
                 
         except Exception as e:
             logger.error(f"Error initializing Gemini AI service: {e}")
             return False
     
-    def generate_response(self, user_message: str, context: Dict[str, Any] = None) -> Optional[str]:
+    def generate_response(self, user_message: str, context: Dict[str, Any] = None,
+                          deadline: float = None) -> Optional[str]:
         """
         Generate a response using Gemini AI
         
         Args:
             user_message: The user's input message
             context: Additional context about the user and conversation
+            deadline: time.time() by which an answer is needed (defaults to now + request_budget)
             
         Returns:
-            Generated response string or None if failed
+            Generated response string or None if failed, timed out or the circuit is open
         """
         if not self.is_initialized:
             return None
             
         try:
-            # Build the prompt with context
-            prompt = self._build_prompt(user_message, context)
+            # Standalone questions are answered from the cache when someone asked them before
+            use_cache = answer_cache.cacheable(user_message)
+            if use_cache:
+                cached_response = answer_cache.get(user_message, self.model_name, PROMPT_VERSION)
+                if cached_response:
+                    logger.info("Gemini response served from cache")
+                    return cached_response
+            
+            # Fail fast while the upstream is known to be down
+            if not self.breaker.available():
+                logger.info("Gemini circuit open - skipping API call")
+                return None
+            
+            # Shared (cached or coalesced) answers must not carry one user's name, role or history
+            prompt = self._build_prompt(user_message, None if use_cache else context)
+            
+            # Stay inside the provider's quota, keeping headroom for signed-in students
+            authenticated = bool(context and context.get('is_authenticated'))
+            user_key = f"user:{context.get('user_id')}" if authenticated else 'anonymous'
+            refusal, reservation = llm_budget.check(user_key, authenticated, estimate_tokens(prompt) + ANSWER_TOKENS)
+            if refusal == USER_LIMIT:
+                return USER_LIMIT_MESSAGE
+            if refusal == DAILY_LIMIT:
+                return QUOTA_MESSAGE
+            if refusal:
+                return None
+            
+            deadline = deadline or time.time() + self.request_budget
+            ran = False
+            
+            def call():
+                nonlocal ran
+                ran = True
+                return self._call_model(prompt, deadline, user_key, authenticated, reservation,
+                                        user_message if use_cache else None)
             
-            # Generate response with retries
+            # Identical standalone questions asked at the same time share one call
+            try:
+                key = answer_cache.make_key(user_message, self.model_name, PROMPT_VERSION) if use_cache else None
+                return llm_limiter.run(key, call, deadline)
+            finally:
+                # Waiting on someone else's call, or finding no free slot, uses no budget
+                if not ran:
+                    llm_budget.cancel(reservation)
+            
+        except Exception as e:
+            logger.error(f"Error generating Gemini response: {e}")
+            return None
+    
+    def generate_offline(self, question: str, timeout: float = 30.0) -> Optional[str]:
+        """Answer a question for a batch job (no cache, no user context, outside the students' reserved budget)"""
+        if not self.is_initialized or not self.breaker.available():
+            return None
+        prompt = self._build_prompt(question)
+        refusal, reservation = llm_budget.check('batch', False, estimate_tokens(prompt) + ANSWER_TOKENS)
+        if refusal:
+            return None
+        return self._call_model(prompt, time.time() + timeout, 'batch', False, reservation)
+    
+    def _call_model(self, prompt: str, deadline: float, user_key: str, authenticated: bool,
+                    reservation: Optional[int], cache_question: str = None) -> Optional[str]:
+        """Call the model, retrying while the deadline allows; caches the answer under cache_question.
+        The first attempt uses the caller's budget reservation, retries reserve their own."""
+        try:
+            # Retry immediately (no sleeping) while the deadline allows another call
             for attempt in range(self.max_retries):
+                remaining = deadline - time.time()
+                if remaining < self.min_call_time:
+                    logger.warning(f"Gemini deadline reached before attempt {attempt + 1}")
+                    break
+                
+                if reservation is None:
+                    refusal, reservation = llm_budget.check(user_key, authenticated,
+                                                            estimate_tokens(prompt) + ANSWER_TOKENS)
+                    if refusal:
+                        break
+                
+                # Take the (half-open) probe slot only now; every outcome below reports back
+                if not self.breaker.allow():
+                    logger.info("Gemini circuit open - skipping API call")
+                    break
+                used, reservation = reservation, None
                 try:
-                    response = self.model.generate_content(prompt)
+                    text = self.provider.generate(prompt, timeout=min(self.call_timeout, remaining))
+                    
+                except ValueError as e:
+                    # The API answered but returned no usable text (e.g. blocked) - retrying won't help
+                    self.breaker.record_success()
+                    logger.warning(f"Unusable response from Gemini: {e}")
+                    return None
                     
-                    if response and response.text:
-                        # Clean and validate the response
-                        cleaned_response = self._clean_response(response.text)
-                        logger.info(f"Gemini response generated successfully (attempt {attempt + 1})")
-                        return cleaned_response
-                    else:
-                        logger.warning(f"Empty response from Gemini (attempt {attempt + 1})")
-                        
                 except Exception as e:
                     error_str = str(e)
                     # Handle quota exceeded specifically
                     if "429" in error_str and "quota" in error_str.lower():
                         logger.error(f"Gemini API quota exceeded: {e}")
-                        return "I'd love to help with that question, but I've reached my daily limit for AI responses. Please try again tomorrow, or ask about college-specific topics like faculty, courses, events, or attendance that I can answer from our database!"
+                        self.breaker.open_for(self.quota_cooldown)
+                        return QUOTA_MESSAGE
                     
                     logger.warning(f"Gemini API call failed (attempt {attempt + 1}): {e}")
-                    if attempt < self.max_retries - 1:
-                        time.sleep(self.retry_delay * (attempt + 1))
+                    self.breaker.record_failure()
+                    if not self.breaker.available():
+                        break
+                    continue
+                
+                self.breaker.record_success()
+                if text:
+                    llm_budget.settle(used, estimate_tokens(prompt) + estimate_tokens(text))
+                    
+                    # Clean and validate the response
+                    cleaned_response = self._clean_response(text)
+                    logger.info(f"Gemini response generated successfully (attempt {attempt + 1})")
+                    if cache_question:
+                        answer_cache.set(cache_question, cleaned_response, self.model_name, PROMPT_VERSION)
+                    return cleaned_response
+                logger.warning(f"Empty response from Gemini (attempt {attempt + 1})")
                     
             logger.error("All Gemini API attempts failed")
             return None
             
         except Exception as e:
-            logger.error(f"Error generating Gemini response: {e}")
+            logger.error(f"Error calling Gemini: {e}")
             return None
+        
+        finally:
+            # A reservation no call went out on is given back
+            llm_budget.cancel(reservation)
     
     def _build_prompt(self, user_message: str, context: Dict[str, Any] = None) -> str:
-        """Build a comprehensive prompt for Gemini AI"""
-        
-        # Base system prompt for EduBot
-        system_prompt = """You are EduBot, an intelligent college chatbot assistant. You help students with educational queries.
-
-IMPORTANT: You are being used as a fallback when the college's internal database doesn't have the answer.
-
-Your role:
-- Provide general educational guidance and study tips
-- Answer academic questions (math, science, literature, etc.)
-- Give career advice and course selection help
-- Explain concepts and provide learning resources
-- Offer motivational support for students
-- Help with assignment and project ideas
-
-Guidelines:
-- Be helpful, encouraging, and educational
-- Keep responses concise (under 200 words)
-- If asked about specific college details (faculty, events, schedules), politely say you don't have access to that institutional data
-- Focus on being a learning companion and study assistant
-- Always maintain a supportive, academic tone
-"""
-        
-        # Add user context if available
-        context_info = ""
-        if context:
-            if context.get('is_authenticated'):
-                context_info += f"User: {context.get('user_name', 'Student')}\n"
-                context_info += f"Role: {context.get('user_role', 'student')}\n"
-            
-            # Add conversation history if available
-            if context.get('conversation_history'):
-                context_info += "Recent conversation:\n"
-                for msg in context['conversation_history'][-2:]:  # Last 2 messages
-                    context_info += f"User: {msg['user_message']}\n"
-                    context_info += f"Bot: {msg['bot_response']}\n"
-        
-        # Build final prompt
-        full_prompt = f"""{system_prompt}
-
-{context_info}
-
-Current Question: {user_message}
-
-Please provide a helpful response:"""
-        
-        return full_prompt
+        """Build the prompt for Gemini AI within the configured token budget"""
+        return prompt_builder.build(user_message, context)
     
     def _clean_response(self, response: str) -> str:
         """Clean and format the Gemini response"""
@@ -172,7 +272,13 @@ Please provide a helpful response:"""
         return {
             'initialized': self.is_initialized,
             'available': self.is_available(),
-            'model': 'gemini-pro' if self.is_initialized else None
+            'provider': self.provider.name if self.is_initialized else None,
+            'model': self.model_name if self.is_initialized else None,
+            'circuit': self.breaker.get_status(),
+            'limiter': llm_limiter.get_status(),
+            'cache': answer_cache.stats(),
+            'prompt': prompt_builder.get_status(),
+            'budget': llm_budget.remaining()
         }
 
 
@@ -0,0 +1,230 @@
+"""
+LLM Budget Scheduler
+Tracks AI calls and estimated tokens per user and globally over rolling
+windows in a local SQLite file, refusing calls before the provider's quota
+is hit and keeping headroom for signed-in students
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WINDOWS = {'minute': 60, 'hour': 3600, 'day': 86400}
+ANSWER_TOKENS = 300  # Expected answer length, added to the prompt when estimating
+
+# Reasons check() can refuse a call for
+USER_LIMIT = 'user_limit'
+DAILY_LIMIT = 'daily_limit'
+BUSY = 'busy'
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+class LLMBudget:
+    """Rolling-window call and token limits shared by every worker through one SQLite file"""
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.global_limits: Dict[str, Dict[str, int]] = {}  # window -> {'calls': n, 'tokens': n}
+        self.user_limits: Dict[str, int] = {}  # window -> calls per signed-in user
+        self.safety = 0.9  # Share of the provider limit we allow ourselves
+        self.reserved = 0.2  # Share of the global budget only signed-in users may use
+        self._connection = None
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        self.refused = {USER_LIMIT: 0, DAILY_LIMIT: 0, BUSY: 0}
+
+    def configure(self, path: str, config):
+        """Point the budget at a file and load limits (called once the app config is known)"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+            self.path = path
+            self.global_limits = {
+                'minute': {'calls': config.get('LLM_GLOBAL_CALLS_PER_MINUTE'),
+                           'tokens': config.get('LLM_GLOBAL_TOKENS_PER_MINUTE')},
+                'day': {'calls': config.get('LLM_GLOBAL_CALLS_PER_DAY'),
+                        'tokens': config.get('LLM_GLOBAL_TOKENS_PER_DAY')}
+            }
+            self.user_limits = {
+                'hour': config.get('LLM_USER_CALLS_PER_HOUR'),
+                'day': config.get('LLM_USER_CALLS_PER_DAY')
+            }
+            self.safety = config.get('LLM_BUDGET_SAFETY', self.safety)
+            self.reserved = config.get('LLM_BUDGET_RESERVED', self.reserved)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            connection = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS llm_usage (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_key TEXT NOT NULL,
+                    ts REAL NOT NULL,
+                    tokens INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            connection.execute('CREATE INDEX IF NOT EXISTS idx_llm_usage_ts ON llm_usage (ts)')
+            connection.execute('CREATE INDEX IF NOT EXISTS idx_llm_usage_user_ts ON llm_usage (user_key, ts)')
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _global_usage(self, connection: sqlite3.Connection, now: float) -> Dict[str, Dict[str, int]]:
+        minute, day = now - WINDOWS['minute'], now - WINDOWS['day']
+        calls_minute, tokens_minute, calls_day, tokens_day = connection.execute(
+            'SELECT COALESCE(SUM(ts >= ?), 0), COALESCE(SUM(CASE WHEN ts >= ? THEN tokens ELSE 0 END), 0), '
+            'COUNT(*), COALESCE(SUM(tokens), 0) FROM llm_usage WHERE ts >= ?',
+            (minute, minute, day)
+        ).fetchone()
+        return {
+            'minute': {'calls': calls_minute, 'tokens': tokens_minute},
+            'day': {'calls': calls_day, 'tokens': tokens_day}
+        }
+
+    def _user_usage(self, connection: sqlite3.Connection, user_key: str, now: float) -> Dict[str, int]:
+        calls_hour, calls_day = connection.execute(
+            'SELECT COALESCE(SUM(ts >= ?), 0), COUNT(*) FROM llm_usage WHERE user_key = ? AND ts >= ?',
+            (now - WINDOWS['hour'], user_key, now - WINDOWS['day'])
+        ).fetchone()
+        return {'hour': calls_hour, 'day': calls_day}
+
+    def check(self, user_key: str, authenticated: bool, tokens: int) -> Tuple[Optional[str], Optional[int]]:
+        """
+        Reserve a call of about ``tokens`` if the limits allow it now
+
+        The usage is read and the call counted in one write transaction, so
+        workers checking at the same moment cannot all take the last slot.
+        Returns (None, reservation) when the call may go out, else (reason,
+        None). Pass the reservation to settle() once the call is made, or to
+        cancel() if it is not.
+        """
+        if not self.path:
+            return None, None
+        now = time.time()
+        try:
+            with self._lock:
+                connection = self._connect()
+                # IMMEDIATE takes the file's write lock up front, so other workers wait for our insert
+                connection.execute('BEGIN IMMEDIATE')
+                try:
+                    usage = self._global_usage(connection, now)
+                    user_usage = self._user_usage(connection, user_key, now) if authenticated else {}
+                    reason = self._refusal(usage, user_usage, authenticated, tokens)
+                    reservation = None
+                    if not reason:
+                        reservation = connection.execute(
+                            'INSERT INTO llm_usage (user_key, ts, tokens) VALUES (?, ?, ?)', (user_key, now, tokens)
+                        ).lastrowid
+                        self._writes_since_prune += 1
+                        # Nothing older than the longest window is ever read again
+                        if self._writes_since_prune >= 100:
+                            self._writes_since_prune = 0
+                            connection.execute('DELETE FROM llm_usage WHERE ts < ?', (now - max(WINDOWS.values()),))
+                    connection.commit()
+                except BaseException:
+                    connection.rollback()
+                    raise
+        except sqlite3.Error as e:
+            logger.error(f"Error checking LLM budget: {e}")
+            return None, None
+
+        if reason:
+            self.refused[reason] += 1
+            logger.info(f"LLM budget refused a call for {user_key}: {reason}")
+        return reason, reservation
+
+    def _refusal(self, usage: Dict, user_usage: Dict[str, int], authenticated: bool, tokens: int) -> Optional[str]:
+        reason = None
+        for window, used in user_usage.items():
+            limit = self.user_limits.get(window)
+            if limit and used >= limit:
+                reason = USER_LIMIT
+                break
+
+        # Anonymous traffic stops early so signed-in students keep some headroom
+        share = self.safety * (1 if authenticated else 1 - self.reserved)
+        for window in ('day', 'minute'):
+            if reason:
+                break
+            for metric, amount in (('calls', 1), ('tokens', tokens)):
+                limit = self.global_limits.get(window, {}).get(metric)
+                if limit and usage[window][metric] + amount > limit * share:
+                    reason = DAILY_LIMIT if window == 'day' else BUSY
+                    break
+        return reason
+
+    def settle(self, reservation: Optional[int], tokens: int):
+        """Replace a reserved call's estimated tokens with the count known after the call"""
+        self._update(reservation, 'UPDATE llm_usage SET tokens = ? WHERE id = ?', (tokens, reservation))
+
+    def cancel(self, reservation: Optional[int]):
+        """Give back a reserved call that was never made"""
+        self._update(reservation, 'DELETE FROM llm_usage WHERE id = ?', (reservation,))
+
+    def _update(self, reservation: Optional[int], statement: str, parameters: tuple):
+        if not self.path or reservation is None:
+            return
+        try:
+            with self._lock:
+                connection = self._connect()
+                connection.execute(statement, parameters)
+                connection.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error updating LLM usage: {e}")
+
+    def remaining(self) -> Dict:
+        """Used and remaining global budget per window, plus the heaviest users today"""
+        status = {'windows': [], 'top_users': [], 'refused': dict(self.refused),
+                  'user_limits': {window: limit for window, limit in self.user_limits.items() if limit}}
+        if not self.path:
+            return status
+        now = time.time()
+        try:
+            with self._lock:
+                connection = self._connect()
+                usage = self._global_usage(connection, now)
+                top_users = connection.execute(
+                    'SELECT user_key, COUNT(*), SUM(tokens) FROM llm_usage WHERE ts >= ? '
+                    'GROUP BY user_key ORDER BY COUNT(*) DESC LIMIT 5',
+                    (now - WINDOWS['day'],)
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading LLM budget: {e}")
+            return status
+
+        windows: List[Dict] = []
+        for window in ('minute', 'day'):
+            for metric in ('calls', 'tokens'):
+                limit = self.global_limits.get(window, {}).get(metric)
+                if not limit:
+                    continue
+                usable = int(limit * self.safety)
+                used = usage[window][metric]
+                windows.append({
+                    'window': window,
+                    'metric': metric,
+                    'used': used,
+                    'limit': usable,
+                    'remaining': max(0, usable - used),
+                    'percent_used': round(100 * used / usable, 1) if usable else 100.0
+                })
+        status['windows'] = windows
+        status['top_users'] = [{'user': key, 'calls': calls, 'tokens': tokens}
+                               for key, calls, tokens in top_users]
+        return status
+
+
+# Global budget instance (configured by GeminiService.initialize)
+llm_budget = LLMBudget()
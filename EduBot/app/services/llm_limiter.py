@@ -0,0 +1,110 @@
+"""
+LLM Concurrency Limiter
+Caps how many AI calls run at once in this process and lets identical
+in-flight questions share a single call
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+class _InFlight:
+    """One running call and the result its waiters will share"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+class LLMLimiter:
+    """Process-wide semaphore plus coalescing of calls with the same key"""
+
+    def __init__(self, max_concurrent: int = 4, queue_timeout: float = 2.0):
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout  # Longest a call waits for a free slot
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._inflight: Dict[Hashable, _InFlight] = {}
+        self._lock = threading.Lock()
+        self._active = 0
+        self.calls = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    def configure(self, max_concurrent: int = None, queue_timeout: float = None):
+        """Resize the limiter (called once the app config is known, before any calls)"""
+        with self._lock:
+            if max_concurrent and max_concurrent != self.max_concurrent:
+                self.max_concurrent = max_concurrent
+                self._slots = threading.BoundedSemaphore(max_concurrent)
+            if queue_timeout is not None:
+                self.queue_timeout = queue_timeout
+
+    def run(self, key: Optional[Hashable], call: Callable[[], Any], deadline: float = None) -> Any:
+        """
+        Run call() under the concurrency cap and return its result
+
+        Callers passing the same key while a call is running wait for that
+        call's result instead of making their own (key None disables this).
+        Returns None when no slot frees up in time or the deadline passes.
+        """
+        deadline = deadline or time.time() + self.queue_timeout
+        if key is None:
+            return self._run_limited(call, deadline)
+
+        with self._lock:
+            inflight = self._inflight.get(key)
+            leader = inflight is None
+            if leader:
+                inflight = self._inflight[key] = _InFlight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            if not inflight.done.wait(max(0.0, deadline - time.time())):
+                logger.info("Gave up waiting for a coalesced LLM call")
+                return None
+            return inflight.result
+
+        try:
+            inflight.result = self._run_limited(call, deadline)
+            return inflight.result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            inflight.done.set()
+
+    def _run_limited(self, call: Callable[[], Any], deadline: float) -> Any:
+        wait = min(self.queue_timeout, deadline - time.time())
+        slots = self._slots
+        if wait <= 0 or not slots.acquire(timeout=wait):
+            with self._lock:
+                self.rejected += 1
+            logger.warning("LLM concurrency limit reached - falling back without an AI answer")
+            return None
+
+        with self._lock:
+            self._active += 1
+            self.calls += 1
+        try:
+            return call()
+        finally:
+            with self._lock:
+                self._active -= 1
+            slots.release()
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'active': self._active,
+                'in_flight_questions': len(self._inflight),
+                'calls': self.calls,
+                'coalesced': self.coalesced,
+                'rejected': self.rejected
+            }
+
+
+# Global limiter instance (configured by GeminiService.initialize)
+llm_limiter = LLMLimiter()
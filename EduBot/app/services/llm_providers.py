@@ -0,0 +1,137 @@
+"""
+LLM Providers
+Interchangeable backends for the AI fallback: Google Gemini, and a local
+stand-in with simulated latency and errors for load testing
+"""
+
+import math
+import random
+import re
+import time
+from typing import Iterator, Optional
+
+try:
+    import google.generativeai as genai
+except ImportError:  # Only needed for the Gemini provider
+    genai = None
+
+class LLMProvider:
+    """
+    Interface every backend implements
+
+    generate() returns the full answer text and stream() yields it in chunks.
+    Transport failures raise; a reply without usable text raises ValueError.
+    """
+
+    name = 'base'
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def generate(self, prompt: str, timeout: float = None) -> Optional[str]:
+        return ''.join(self.stream(prompt, timeout))
+
+    def stream(self, prompt: str, timeout: float = None) -> Iterator[str]:
+        raise NotImplementedError
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini via google-generativeai"""
+
+    name = 'gemini'
+
+    def __init__(self, api_key: str, model_name: str = 'gemini-1.5-flash'):
+        if genai is None:
+            raise RuntimeError("google-generativeai is not installed")
+        super().__init__(model_name)
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt: str, timeout: float = None) -> Optional[str]:
+        response = self.model.generate_content(prompt, request_options=self._options(timeout))
+        return response.text if response else None
+
+    def stream(self, prompt: str, timeout: float = None) -> Iterator[str]:
+        response = self.model.generate_content(prompt, stream=True, request_options=self._options(timeout))
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+    @staticmethod
+    def _options(timeout: float = None) -> dict:
+        return {'timeout': timeout} if timeout else {}
+
+class LocalProvider(LLMProvider):
+    """Canned answers after a sampled delay, failing at error_rate like a flaky upstream"""
+
+    name = 'local'
+    LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'lognormal')
+
+    def __init__(self, latency: str = 'lognormal', latency_median: float = 1.0, latency_spread: float = 0.5,
+                 error_rate: float = 0.0, chunk_size: int = 40, chunk_delay: float = 0.02, seed: int = None):
+        if latency not in self.LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency}")
+        super().__init__('local-stand-in')
+        self.latency = latency
+        self.latency_median = latency_median  # Seconds before the first chunk
+        self.latency_spread = latency_spread  # +/- seconds (uniform) or sigma (lognormal)
+        self.error_rate = error_rate
+        self.chunk_size = max(1, chunk_size)  # Characters per streamed chunk
+        self.chunk_delay = chunk_delay  # Seconds between chunks
+        self._random = random.Random(seed)
+
+    @classmethod
+    def from_config(cls, config) -> 'LocalProvider':
+        return cls(
+            latency=config.get('LLM_LOCAL_LATENCY', 'lognormal'),
+            latency_median=config.get('LLM_LOCAL_LATENCY_MEDIAN', 1.0),
+            latency_spread=config.get('LLM_LOCAL_LATENCY_SPREAD', 0.5),
+            error_rate=config.get('LLM_LOCAL_ERROR_RATE', 0.0),
+            chunk_size=config.get('LLM_LOCAL_CHUNK_SIZE', 40),
+            chunk_delay=config.get('LLM_LOCAL_CHUNK_DELAY', 0.02),
+            seed=config.get('LLM_LOCAL_SEED')
+        )
+
+    def sample_latency(self) -> float:
+        if self.latency == 'fixed':
+            return self.latency_median
+        if self.latency == 'uniform':
+            return self._random.uniform(max(0.0, self.latency_median - self.latency_spread),
+                                        self.latency_median + self.latency_spread)
+        return self._random.lognormvariate(math.log(max(self.latency_median, 1e-6)), self.latency_spread)
+
+    def stream(self, prompt: str, timeout: float = None) -> Iterator[str]:
+        deadline = time.monotonic() + timeout if timeout else None
+        self._wait(self.sample_latency(), deadline)
+        if self._random.random() < self.error_rate:
+            raise RuntimeError("503 Service unavailable (simulated by the local LLM provider)")
+
+        text = self._answer(prompt)
+        for start in range(0, len(text), self.chunk_size):
+            if start:
+                self._wait(self.chunk_delay, deadline)
+            yield text[start:start + self.chunk_size]
+
+    @staticmethod
+    def _wait(seconds: float, deadline: float = None):
+        """Sleep like a slow network call, timing out the way the real client would"""
+        if deadline is not None and time.monotonic() + seconds > deadline:
+            time.sleep(max(0.0, deadline - time.monotonic()))
+            raise TimeoutError("504 Deadline exceeded (simulated by the local LLM provider)")
+        time.sleep(seconds)
+
+    @staticmethod
+    def _answer(prompt: str) -> str:
+        match = re.search(r'Current Question:\s*(.+)', prompt)
+        question = match.group(1).strip() if match else prompt[-200:].strip()
+        return (f"This is a simulated answer to \"{question}\". A real model would explain the topic "
+                f"in a few short paragraphs and suggest where to read more. Good luck with your studies!")
+
+
+def create_provider(config, api_key: str = None, model_name: str = 'gemini-1.5-flash') -> LLMProvider:
+    """Build the provider named by LLM_PROVIDER ('gemini' or 'local')"""
+    name = config.get('LLM_PROVIDER', 'gemini')
+    if name == 'local':
+        return LocalProvider.from_config(config)
+    if name == 'gemini':
+        return GeminiProvider(api_key, model_name)
+    raise ValueError(f"Unknown LLM provider: {name}")
@@ -0,0 +1,139 @@
+"""
+Prompt Builder
+Assembles AI fallback prompts from a precomputed system prompt, a trimmed
+slice of recent conversation and the (truncated) question, within a token budget
+"""
+
+import re
+import threading
+from typing import Any, Dict, List
+
+from app.services.llm_budget import estimate_tokens
+
+SYSTEM_PROMPT = """You are EduBot, an intelligent college chatbot assistant. You help students with educational queries.
+
+IMPORTANT: You are being used as a fallback when the college's internal database doesn't have the answer.
+
+Your role:
+- Provide general educational guidance and study tips
+- Answer academic questions (math, science, literature, etc.)
+- Give career advice and course selection help
+- Explain concepts and provide learning resources
+- Offer motivational support for students
+- Help with assignment and project ideas
+
+Guidelines:
+- Be helpful, encouraging, and educational
+- Keep responses concise (under 200 words)
+- If asked about specific college details (faculty, events, schedules), politely say you don't have access to that institutional data
+- Focus on being a learning companion and study assistant
+- Always maintain a supportive, academic tone
+"""
+
+TRUNCATED_MARK = ' [...]'
+AI_PREFIX = 'This answer is provided by AI: '
+
+def _shorten(text: str, max_tokens: int) -> str:
+    """Cut text to about max_tokens, at a sentence or word boundary when one is close"""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    boundary = max(cut.rfind('. '), cut.rfind('? '), cut.rfind('! '))
+    if boundary < max_chars // 2:
+        boundary = cut.rfind(' ')
+    return (cut[:boundary + 1] if boundary > 0 else cut).rstrip() + TRUNCATED_MARK
+
+class PromptBuilder:
+    """Builds prompts within a token budget and keeps size metrics"""
+
+    def __init__(self, max_prompt_tokens: int = 1200, max_message_tokens: int = 400,
+                 history_turns: int = 2, max_turn_tokens: int = 60):
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_message_tokens = max_message_tokens  # Longer questions are truncated
+        self.history_turns = history_turns  # Most recent exchanges to include
+        self.max_turn_tokens = max_turn_tokens  # Each remembered user/bot message is shortened to this
+        self.prefix = SYSTEM_PROMPT
+        self.prefix_tokens = estimate_tokens(SYSTEM_PROMPT)
+        self._lock = threading.Lock()
+        self.built = 0
+        self.total_tokens = 0
+        self.largest = 0
+        self.truncated_messages = 0
+        self.dropped_turns = 0
+
+    def configure(self, config):
+        self.max_prompt_tokens = config.get('LLM_PROMPT_MAX_TOKENS', self.max_prompt_tokens)
+        self.max_message_tokens = config.get('LLM_MESSAGE_MAX_TOKENS', self.max_message_tokens)
+        self.history_turns = config.get('LLM_HISTORY_TURNS', self.history_turns)
+        self.max_turn_tokens = config.get('LLM_HISTORY_TURN_TOKENS', self.max_turn_tokens)
+
+    def build(self, user_message: str, context: Dict[str, Any] = None) -> str:
+        """Prompt for one question; history is dropped oldest-first when over budget"""
+        question = ' '.join(user_message.split())
+        message_truncated = estimate_tokens(question) > self.max_message_tokens
+        if message_truncated:
+            question = _shorten(question, self.max_message_tokens)
+        suffix = f"\nCurrent Question: {question}\n\nPlease provide a helpful response:"
+
+        user_info = ''
+        history: List[str] = []
+        if context:
+            if context.get('is_authenticated'):
+                user_info = (f"User: {context.get('user_name', 'Student')}\n"
+                             f"Role: {context.get('user_role', 'student')}\n")
+            history = self._history_lines(context.get('conversation_history') or [])
+
+        # Whatever the fixed parts leave over is available for history
+        available = self.max_prompt_tokens - self.prefix_tokens - estimate_tokens(user_info + suffix)
+        kept: List[str] = []
+        for turn in reversed(history):  # Newest first
+            cost = estimate_tokens(turn)
+            if cost > available:
+                break
+            kept.insert(0, turn)
+            available -= cost
+        dropped = len(history) - len(kept)
+
+        context_info = user_info
+        if kept:
+            context_info += "Recent conversation:\n" + ''.join(kept)
+        prompt = f"{self.prefix}\n{context_info}\n{suffix}"
+
+        tokens = estimate_tokens(prompt)
+        with self._lock:
+            self.built += 1
+            self.total_tokens += tokens
+            self.largest = max(self.largest, tokens)
+            self.truncated_messages += int(message_truncated)
+            self.dropped_turns += dropped
+        return prompt
+
+    def _history_lines(self, conversation_history: List[Dict]) -> List[str]:
+        """Most recent exchanges, oldest first, each side shortened to a summary"""
+        # conversation_history comes newest first
+        recent = list(reversed(conversation_history[:self.history_turns]))
+        lines = []
+        for message in recent:
+            bot_response = re.sub(r'<[^>]+>', ' ', message.get('bot_response') or '')
+            bot_response = ' '.join(bot_response.replace(AI_PREFIX, '').split())
+            user_message = ' '.join((message.get('user_message') or '').split())
+            lines.append(f"User: {_shorten(user_message, self.max_turn_tokens)}\n"
+                         f"Bot: {_shorten(bot_response, self.max_turn_tokens)}\n")
+        return lines
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            return {
+                'prompts_built': self.built,
+                'average_tokens': round(self.total_tokens / self.built) if self.built else 0,
+                'largest_tokens': self.largest,
+                'system_prompt_tokens': self.prefix_tokens,
+                'max_prompt_tokens': self.max_prompt_tokens,
+                'truncated_messages': self.truncated_messages,
+                'dropped_history_turns': self.dropped_turns
+            }
+
+
+# Global prompt builder instance (configured by GeminiService.initialize)
+prompt_builder = PromptBuilder()
@@ -0,0 +1,469 @@
+"""
+Full-Text Search Service
+Ranked full-text indexes kept in shadow tables: SQLite FTS5 in development,
+MySQL FULLTEXT in production, and a LIKE scan on any other database
+"""
+
+import logging
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import bindparam, event, select, text
+from sqlalchemy.orm import Session
+from app import db
+from app.models.user import User
+from app.models.faculty import Faculty
+from app.models.course import Course
+from app.models.note import Note
+from app.models.document import ExtractedDocument, DocumentChunk
+from app.services.cache import watch_rows
+from app.services.text_terms import search_terms
+
+logger = logging.getLogger(__name__)
+
+class FullTextIndex:
+    """A ranked full-text index over one kind of document.
+
+    Documents live in a shadow table ``table_name`` keyed by ``doc_id``.
+    Changed documents are marked dirty (usually from ORM events) and are
+    re-indexed after the next commit, or lazily before the next search.
+    """
+
+    def __init__(self, table_name: str, columns: List[str], source: Callable,
+                 weights: List[float] = None, related: Callable = None):
+        self.table_name = table_name
+        self.columns = columns
+        self.source = source  # source(ids or None) -> select of (doc_id, *columns)
+        self.weights = weights or [1.0] * len(columns)
+        self.related = related  # related(parent ids) -> select of doc ids built from those rows
+        self._dirty: Set[int] = set()
+        self._dirty_related: Set[int] = set()
+        self._rebuild_needed = False
+        self._ready = False
+        self._lock = threading.Lock()
+        _indexes.append(self)
+
+    # Dialect handling
+
+    @property
+    def dialect(self) -> str:
+        name = db.engine.dialect.name
+        if name == 'sqlite':
+            return 'fts5' if self._fts5_available() else 'like'
+        if name in ('mysql', 'mariadb'):
+            return 'mysql'
+        return 'like'
+
+    _fts5 = None
+
+    @classmethod
+    def _fts5_available(cls) -> bool:
+        if cls._fts5 is None:
+            try:
+                import sqlite3
+                sqlite3.connect(':memory:').execute('CREATE VIRTUAL TABLE probe USING fts5(x)')
+                cls._fts5 = True
+            except Exception:
+                cls._fts5 = False
+        return cls._fts5
+
+    @property
+    def _key(self) -> str:
+        return 'rowid' if self.dialect == 'fts5' else 'doc_id'
+
+    def _create_table(self, connection):
+        columns = ', '.join(self.columns)
+        if self.dialect == 'fts5':
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table_name} "
+                f"USING fts5({columns}, tokenize='porter unicode61')"
+            ))
+        elif self.dialect == 'mysql':
+            column_defs = ', '.join(f"{column} TEXT" for column in self.columns)
+            connection.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {self.table_name} ("
+                f"doc_id INT PRIMARY KEY, {column_defs}, "
+                f"FULLTEXT KEY ft_{self.table_name} ({columns})"
+                f") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4"
+            ))
+        else:
+            column_defs = ', '.join(f"{column} TEXT" for column in self.columns)
+            connection.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {self.table_name} (doc_id INTEGER PRIMARY KEY, {column_defs})"
+            ))
+
+    def ensure_ready(self):
+        """Create the shadow table and fill it if it is empty"""
+        if self._ready:
+            return
+        with db.engine.begin() as connection:
+            self._create_table(connection)
+            has_rows = connection.execute(text(f"SELECT 1 FROM {self.table_name} LIMIT 1")).first()
+        if not has_rows:
+            self.rebuild()
+        self._ready = True
+
+    # Maintenance
+
+    def mark_dirty(self, doc_id: Optional[int]):
+        if doc_id is not None:
+            with self._lock:
+                self._dirty.add(doc_id)
+
+    def mark_related_dirty(self, parent_id: Optional[int]):
+        """Re-index the documents built from a related row (resolved at sync time)"""
+        if parent_id is not None:
+            with self._lock:
+                self._dirty_related.add(parent_id)
+
+    def mark_all_dirty(self):
+        with self._lock:
+            self._rebuild_needed = True
+
+    def has_pending(self) -> bool:
+        return bool(self._dirty or self._dirty_related or self._rebuild_needed)
+
+    def _write(self, connection, rows: Iterable[Tuple]):
+        columns = ', '.join(self.columns)
+        placeholders = ', '.join(f":c{i}" for i in range(len(self.columns)))
+        statement = text(f"INSERT INTO {self.table_name} ({self._key}, {columns}) VALUES (:doc_id, {placeholders})")
+        batch = [
+            dict({'doc_id': row[0]}, **{f"c{i}": value or '' for i, value in enumerate(row[1:])})
+            for row in rows
+        ]
+        if batch:
+            connection.execute(statement, batch)
+
+    def rebuild(self):
+        """Re-index every document"""
+        with self._lock:
+            self._dirty.clear()
+            self._dirty_related.clear()
+            self._rebuild_needed = False
+        with db.engine.begin() as connection:
+            self._create_table(connection)
+            connection.execute(text(f"DELETE FROM {self.table_name}"))
+            self._write(connection, connection.execute(self.source(None)))
+        logger.info(f"Rebuilt search index {self.table_name}")
+
+    def sync(self):
+        """Re-index documents that changed since the last sync"""
+        if self._rebuild_needed:
+            self.rebuild()
+            return
+
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            related, self._dirty_related = self._dirty_related, set()
+        if not dirty and not related:
+            return
+
+        try:
+            if related:
+                with db.engine.connect() as connection:
+                    dirty.update(row[0] for row in connection.execute(self.related(sorted(related))))
+            if not dirty:
+                return
+            ids = sorted(dirty)
+            delete = text(f"DELETE FROM {self.table_name} WHERE {self._key} IN :ids")\
+                .bindparams(bindparam('ids', expanding=True))
+            with db.engine.begin() as connection:
+                self._create_table(connection)
+                connection.execute(delete, {'ids': ids})
+                self._write(connection, connection.execute(self.source(ids)))
+        except Exception:
+            with self._lock:
+                self._dirty.update(dirty)
+                self._dirty_related.update(related)
+            raise
+
+    # Querying
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[int, float]]:
+        """Return [(doc_id, score)] best match first"""
+        terms = search_terms(query)
+        if not terms:
+            return []
+
+        self.ensure_ready()
+        try:
+            self.sync()
+        except Exception as e:
+            logger.error(f"Error syncing search index {self.table_name}: {e}")
+
+        with db.engine.connect() as connection:
+            if self.dialect == 'fts5':
+                match = ' OR '.join(f'"{term}"*' for term in terms)
+                weights = ', '.join(str(weight) for weight in self.weights)
+                rows = connection.execute(text(
+                    f"SELECT rowid, bm25({self.table_name}, {weights}) AS score "
+                    f"FROM {self.table_name} WHERE {self.table_name} MATCH :match "
+                    f"ORDER BY score LIMIT :limit"
+                ), {'match': match, 'limit': limit}).all()
+                # bm25() is lower-is-better; flip it so callers can sort descending
+                return [(row[0], -row[1]) for row in rows]
+
+            if self.dialect == 'mysql':
+                columns = ', '.join(self.columns)
+                rows = connection.execute(text(
+                    f"SELECT doc_id, MATCH({columns}) AGAINST (:query IN NATURAL LANGUAGE MODE) AS score "
+                    f"FROM {self.table_name} "
+                    f"WHERE MATCH({columns}) AGAINST (:query IN NATURAL LANGUAGE MODE) "
+                    f"ORDER BY score DESC LIMIT :limit"
+                ), {'query': ' '.join(terms), 'limit': limit}).all()
+                return [(row[0], float(row[1])) for row in rows]
+
+            # Portable fallback: LIKE scan, scored by weighted term hits
+            conditions = ' OR '.join(
+                f"LOWER({column}) LIKE :t{i}"
+                for i in range(len(terms)) for column in self.columns
+            )
+            params = {f"t{i}": f"%{term}%" for i, term in enumerate(terms)}
+            rows = connection.execute(text(
+                f"SELECT doc_id, {', '.join(self.columns)} FROM {self.table_name} WHERE {conditions}"
+            ), params).all()
+
+        scored = []
+        for row in rows:
+            score = sum(
+                weight
+                for term in terms
+                for weight, value in zip(self.weights, row[1:])
+                if value and term in value.lower()
+            )
+            scored.append((row[0], score))
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
+
+
+_indexes: List[FullTextIndex] = []
+
+@event.listens_for(Session, 'after_commit')
+def _sync_after_commit(session):
+    """Push pending index changes once the rows they came from are committed"""
+    for index in _indexes:
+        if not index._ready or not index.has_pending():
+            continue
+        try:
+            index.sync()
+        except Exception as e:
+            logger.error(f"Error syncing search index {index.table_name}: {e}")
+
+
+# Faculty search: name, department, specialization and bio
+
+def _faculty_source(ids=None):
+    query = select(
+        Faculty.id,
+        (User.first_name + ' ' + User.last_name).label('name'),
+        Faculty.department,
+        Faculty.specialization,
+        Faculty.bio
+    ).select_from(Faculty).outerjoin(User, Faculty.user_id == User.id)\
+     .where(Faculty.is_active == True)
+    if ids is not None:
+        query = query.where(Faculty.id.in_(ids))
+    return query
+
+class FacultySearch(FullTextIndex):
+    """Full-text search over faculty profiles"""
+
+    def __init__(self):
+        super().__init__(
+            'faculty_search',
+            ['name', 'department', 'specialization', 'bio'],
+            _faculty_source,
+            weights=[2.0, 1.0, 4.0, 1.0],
+            related=lambda user_ids: select(Faculty.id).where(Faculty.user_id.in_(user_ids))
+        )
+
+    def on_row_change(self, row):
+        if isinstance(row, Faculty):
+            self.mark_dirty(row.id)
+        elif isinstance(row, User) and row.role == 'faculty':
+            # Names live on the users table
+            self.mark_related_dirty(row.id)
+
+    def find(self, query: str, limit: int = 5) -> List[Faculty]:
+        """Active faculty ranked by relevance to the query"""
+        ranked = self.search(query, limit)
+        if not ranked:
+            return []
+
+        ids = [doc_id for doc_id, _ in ranked]
+        faculty_by_id = {
+            faculty.id: faculty
+            for faculty in Faculty.query.filter(Faculty.id.in_(ids), Faculty.is_active == True).all()
+        }
+        return [faculty_by_id[doc_id] for doc_id in ids if doc_id in faculty_by_id]
+
+
+# Notes search: title, topic, chapter, course and content
+
+def _note_source(ids=None):
+    query = select(
+        Note.id,
+        Note.title,
+        Note.topic,
+        Note.chapter,
+        (Course.course_code + ' ' + Course.course_name).label('course'),
+        Note.content
+    ).select_from(Note).outerjoin(Course, Note.course_id == Course.id)\
+     .where(Note.is_active == True)
+    if ids is not None:
+        query = query.where(Note.id.in_(ids))
+    return query
+
+def _chapter_matches(note_chapter: Optional[str], chapter: str) -> bool:
+    """'3' matches 'Chapter 3' and '3' but not '13'"""
+    return bool(note_chapter) and chapter in re.findall(r'[a-z0-9]+', note_chapter.lower())
+
+class NoteSearch(FullTextIndex):
+    """Full-text search over study notes, filterable by course and chapter"""
+
+    def __init__(self, candidates: int = 50):
+        super().__init__(
+            'note_search',
+            ['title', 'topic', 'chapter', 'course', 'content'],
+            _note_source,
+            weights=[4.0, 3.0, 2.0, 3.0, 1.0],
+            related=lambda course_ids: select(Note.id).where(Note.course_id.in_(course_ids))
+        )
+        self.candidates = candidates  # Ranked hits fetched before course/chapter filtering
+        self.course_refresh_interval = 300  # Picks up course changes made by other workers
+        self._course_phrases: Optional[Dict[str, Set[int]]] = None
+        self._course_max_words = 1
+        self._courses_built_at = 0.0
+
+    def on_row_change(self, row):
+        if isinstance(row, Note):
+            self.mark_dirty(row.id)
+        elif isinstance(row, Course):
+            # Course code and name are indexed with each note
+            self.mark_related_dirty(row.id)
+            self._course_phrases = None
+
+    def _course_lookup(self) -> Dict[str, Set[int]]:
+        """Compact course codes ("cs301") and normalized names -> active course ids"""
+        phrases = self._course_phrases
+        if phrases is None or time.time() - self._courses_built_at > self.course_refresh_interval:
+            phrases, max_words = {}, 1
+            rows = db.session.query(Course.id, Course.course_code, Course.course_name)\
+                             .filter(Course.is_active == True).all()
+            for course_id, code, name in rows:
+                code = ''.join(re.findall(r'[a-z0-9]+', (code or '').lower()))
+                name_words = re.findall(r'[a-z0-9]+', (name or '').lower())
+                if code:
+                    phrases.setdefault(code, set()).add(course_id)
+                if name_words:
+                    phrases.setdefault(' '.join(name_words), set()).add(course_id)
+                    max_words = max(max_words, len(name_words))
+            self._course_phrases, self._course_max_words = phrases, max_words
+            self._courses_built_at = time.time()
+        return phrases
+
+    def resolve_courses(self, message: str) -> List[Course]:
+        """Active courses named in the message by code ("CS301", "cs 301") or full name"""
+        lookup = self._course_lookup()
+        words = re.findall(r'[a-z0-9]+', message.lower())
+        # Codes may be split in two ("cs 301"); names match as whole word runs
+        candidates = {first + second for first, second in zip(words, words[1:])}
+        for size in range(1, self._course_max_words + 1):
+            candidates.update(' '.join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+        course_ids = set()
+        for candidate in candidates:
+            course_ids |= lookup.get(candidate, set())
+        if not course_ids:
+            return []
+        return Course.query.filter(Course.id.in_(course_ids)).order_by(Course.id).all()
+
+    def find(self, query: str, course_ids: List[int] = None, chapter: str = None, limit: int = 5) -> List[Note]:
+        """Active notes ranked by relevance (newest first when the query has no search terms)"""
+        notes_query = Note.query.filter(Note.is_active == True)
+        if course_ids:
+            notes_query = notes_query.filter(Note.course_id.in_(course_ids))
+        if chapter:
+            notes_query = notes_query.filter(Note.chapter.ilike(f'%{chapter}%'))
+
+        if search_terms(query):
+            ids = [doc_id for doc_id, _ in self.search(query, self.candidates)]
+            # Then notes whose uploaded file mentions the query
+            for document, _ in document_search.find(query, source_type='note', limit=self.candidates):
+                if document.source_id not in ids:
+                    ids.append(document.source_id)
+            if not ids:
+                return []
+            notes_by_id = {note.id: note for note in notes_query.filter(Note.id.in_(ids)).all()}
+            notes = [notes_by_id[doc_id] for doc_id in ids if doc_id in notes_by_id]
+        else:
+            notes = notes_query.order_by(Note.created_at.desc()).limit(limit * 4).all()
+
+        if chapter:
+            notes = [note for note in notes if _chapter_matches(note.chapter, chapter)]
+        return notes[:limit]
+
+
+# Document search: text extracted from uploaded files, one row per chunk
+
+def _document_source(ids=None):
+    query = select(
+        DocumentChunk.id,
+        ExtractedDocument.title,
+        DocumentChunk.text
+    ).select_from(DocumentChunk).join(ExtractedDocument, DocumentChunk.document_id == ExtractedDocument.id)\
+     .where(ExtractedDocument.status == 'done')
+    if ids is not None:
+        query = query.where(DocumentChunk.id.in_(ids))
+    return query
+
+class DocumentSearch(FullTextIndex):
+    """Full-text search over chunks of extracted upload text"""
+
+    def __init__(self):
+        super().__init__(
+            'document_search',
+            ['title', 'body'],
+            _document_source,
+            weights=[2.0, 1.0],
+            related=lambda document_ids: select(DocumentChunk.id).where(DocumentChunk.document_id.in_(document_ids))
+        )
+
+    def on_row_change(self, row):
+        if isinstance(row, DocumentChunk):
+            self.mark_dirty(row.id)
+        elif isinstance(row, ExtractedDocument):
+            self.mark_related_dirty(row.id)
+
+    def find(self, query: str, source_type: str = None, limit: int = 5) -> List[Tuple[ExtractedDocument, DocumentChunk]]:
+        """Best matching (document, chunk) pairs, at most one chunk per document"""
+        ranked = self.search(query, limit * 4)
+        if not ranked:
+            return []
+
+        ids = [doc_id for doc_id, _ in ranked]
+        rows = db.session.query(ExtractedDocument, DocumentChunk)\
+                         .join(DocumentChunk, DocumentChunk.document_id == ExtractedDocument.id)\
+                         .filter(DocumentChunk.id.in_(ids))
+        if source_type:
+            rows = rows.filter(ExtractedDocument.source_type == source_type)
+        by_chunk = {chunk.id: (document, chunk) for document, chunk in rows.all()}
+
+        results, seen = [], set()
+        for chunk_id in ids:
+            if chunk_id in by_chunk and by_chunk[chunk_id][0].id not in seen:
+                seen.add(by_chunk[chunk_id][0].id)
+                results.append(by_chunk[chunk_id])
+        return results[:limit]
+
+
+# Global search index instances
+faculty_search = FacultySearch()
+watch_rows(faculty_search.on_row_change, Faculty, User)
+
+document_search = DocumentSearch()
+watch_rows(document_search.on_row_change, DocumentChunk, ExtractedDocument)
+
+note_search = NoteSearch()
+watch_rows(note_search.on_row_change, Note, Course)
@@ -0,0 +1,20 @@
+"""
+Text Terms
+Word tokenizing shared by the search indexes and the chatbot's own indexes
+"""
+
+import re
+from typing import List
+
+STOP_WORDS = {
+    'a', 'an', 'and', 'any', 'are', 'about', 'at', 'by', 'can', 'do', 'does', 'for',
+    'from', 'i', 'in', 'is', 'me', 'my', 'of', 'on', 'or', 'the', 'there', 'to',
+    'what', 'which', 'who', 'with'
+}
+
+def search_terms(query: str) -> List[str]:
+    """Lowercase word tokens with stop words removed"""
+    return [
+        token for token in re.findall(r'[a-z0-9]+', query.lower())
+        if token not in STOP_WORDS and len(token) > 1
+    ]
@@ -0,0 +1,87 @@
+"""
+Usage Counter Service
+Buffers per-row usage increments in memory and writes them back in one
+batched UPDATE, instead of a commit on every hit
+"""
+
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import Dict
+from flask import current_app
+from app import db
+from app.models.quick_action import QuickAction
+
+logger = logging.getLogger(__name__)
+
+class UsageCounter:
+    """Per-worker buffer of ``model.<column> += n`` increments, flushed every ``flush_interval`` seconds"""
+
+    def __init__(self, model, column: str = 'usage_count', flush_interval: int = 30):
+        self.model = model
+        self.column = column
+        self.flush_interval = flush_interval
+        self._pending: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._app = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def add(self, row_id: int, amount: int = 1):
+        """Record a use; it reaches the database on the next flush"""
+        with self._lock:
+            self._pending[row_id] = self._pending.get(row_id, 0) + amount
+        if self._thread is None:
+            self._start(current_app._get_current_object())
+
+    def _start(self, app):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._app = app
+            self.flush_interval = app.config.get('USAGE_FLUSH_INTERVAL', self.flush_interval)
+            self._thread = threading.Thread(target=self._run, name=f'{self.model.__tablename__}-usage', daemon=True)
+            self._thread.start()
+        atexit.register(self.shutdown)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all buffered increments as one UPDATE ... CASE; returns rows touched"""
+        with self._lock:
+            counts, self._pending = self._pending, {}
+        if not counts:
+            return 0
+
+        table = self.model.__table__
+        column = table.c[self.column]
+        values = {self.column: column + db.case(counts, value=table.c.id, else_=0)}
+        if 'updated_at' in table.c:
+            values['updated_at'] = datetime.utcnow()
+        statement = table.update().where(table.c.id.in_(list(counts))).values(values)
+
+        try:
+            with self._app.app_context():
+                with db.engine.begin() as connection:
+                    connection.execute(statement)
+            return len(counts)
+        except Exception as e:
+            # Keep the counts for the next attempt
+            with self._lock:
+                for row_id, amount in counts.items():
+                    self._pending[row_id] = self._pending.get(row_id, 0) + amount
+            logger.error(f"Error flushing {table.name} usage counts: {e}")
+            return 0
+
+    def shutdown(self):
+        """Stop the flusher and write whatever is left"""
+        self._stop.set()
+        if self._app is not None:
+            self.flush()
+
+
+# Global usage counter instances
+quick_action_usage = UsageCounter(QuickAction)
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Rebuild the chat analytics rollups from the chat logs
+
+New chats are added to the rollups as they are logged; run this once after
+upgrading, or to repair a range of days. Rollups for the chosen days are
+replaced, so it is safe to run again. Stop the app first (or pick an --end
+before today): chats that running workers have not flushed yet would
+otherwise be counted twice.
+
+    python backfill_analytics.py
+    python backfill_analytics.py --start 2025-01-01 --end 2025-01-31
+"""
+
+import argparse
+from datetime import datetime, timedelta
+from app import create_app
+from app.services.chat_rollups import chat_rollups
+
+def parse_day(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected a date like 2025-01-31, got {value!r}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild chat analytics rollups from the chat logs')
+    parser.add_argument('--start', type=parse_day, help='First day to rebuild (default: the oldest chat)')
+    parser.add_argument('--end', type=parse_day, help='Last day to rebuild, inclusive (default: today)')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Chat logs read per batch')
+    args = parser.parse_args()
+
+    end = args.end + timedelta(days=1) if args.end else None
+    app = create_app()
+    with app.app_context():
+        counted = chat_rollups.backfill(args.start, end, args.batch_size)
+
+    print(f"✅ Rolled up {counted} chat logs")
+
+if __name__ == '__main__':
+    main()
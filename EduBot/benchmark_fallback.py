@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Load-test the chatbot's AI fallback path without a Gemini key
+
+Runs concurrent "unknown" questions through the chatbot engine with the
+local stand-in LLM provider and reports latency percentiles per outcome.
+
+Usage:
+    python benchmark_fallback.py
+    python benchmark_fallback.py --users 50 --questions 200 --latency-median 2 --error-rate 0.1
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+def percentile(values, fraction):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the chatbot AI fallback with a simulated LLM')
+    parser.add_argument('--users', type=int, default=20, help='Concurrent users')
+    parser.add_argument('--questions', type=int, default=100, help='Total questions to ask')
+    parser.add_argument('--distinct', type=int, default=10, help='How many different questions are asked')
+    parser.add_argument('--latency', choices=['fixed', 'uniform', 'lognormal'], default='lognormal')
+    parser.add_argument('--latency-median', type=float, default=1.0)
+    parser.add_argument('--latency-spread', type=float, default=0.5)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--chunk-size', type=int, default=40)
+    args = parser.parse_args()
+
+    # Must be set before the app (and its config) is loaded
+    os.environ.update({
+        'LLM_PROVIDER': 'local',
+        'LLM_LOCAL_LATENCY': args.latency,
+        'LLM_LOCAL_LATENCY_MEDIAN': str(args.latency_median),
+        'LLM_LOCAL_LATENCY_SPREAD': str(args.latency_spread),
+        'LLM_LOCAL_ERROR_RATE': str(args.error_rate),
+        'LLM_LOCAL_CHUNK_SIZE': str(args.chunk_size)
+    })
+    # Cold cache and a fresh budget; the real files are left untouched
+    scratch = tempfile.mkdtemp()
+    os.environ['LLM_CACHE_PATH'] = os.path.join(scratch, 'llm_cache.db')
+    os.environ['LLM_BUDGET_PATH'] = os.path.join(scratch, 'llm_budget.db')
+
+    from app import create_app
+    from app.chatbot.engine import chatbot_engine
+    from app.services.gemini_service import gemini_service
+
+    app = create_app()
+
+    questions = [f"Can you explain the basics of benchmark topic number {i % args.distinct} in detail"
+                 for i in range(args.questions)]
+
+    def ask(question):
+        with app.app_context():
+            started = time.perf_counter()
+            result = chatbot_engine.process_message(question)
+            return result['intent'], (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        results = list(pool.map(ask, questions))
+    elapsed = time.perf_counter() - started
+
+    print(f"📊 {args.questions} questions from {args.users} users in {elapsed:.1f}s "
+          f"({args.questions / elapsed:.1f}/s)")
+    for intent, count in Counter(intent for intent, _ in results).most_common():
+        timings = [ms for name, ms in results if name == intent]
+        print(f"   {intent:<12} {count:>5}  p50 {percentile(timings, 0.5):7.0f} ms  "
+              f"p95 {percentile(timings, 0.95):7.0f} ms  max {max(timings):7.0f} ms")
+    print(f"   AI service: {gemini_service.get_status()}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Bulk import/export of quick actions, intents and quizzes (CSV or JSONL)
+
+Usage:
+    python bulk_data.py import quick_actions faqs.csv
+    python bulk_data.py import quizzes questions.jsonl --batch-size 1000
+    python bulk_data.py export intents intents.jsonl
+    python bulk_data.py export quizzes -            (write CSV to stdout)
+"""
+
+import argparse
+import sys
+from app import create_app
+from app.services.bulk_io import SPECS, FORMATS, import_records, export_records
+
+def format_for(path, explicit=None):
+    """Pick the format from --format or the file extension"""
+    fmt = explicit or (path.rsplit('.', 1)[-1].lower() if '.' in path else 'csv')
+    if fmt not in FORMATS:
+        sys.exit(f"❌ Unsupported format '{fmt}' (use csv or jsonl)")
+    return fmt
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import/export EduBot chatbot data')
+    parser.add_argument('action', choices=['import', 'export'])
+    parser.add_argument('kind', choices=sorted(SPECS))
+    parser.add_argument('path', help="File to read or write ('-' for stdin/stdout)")
+    parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension')
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.action == 'import':
+            fmt = format_for(args.path, args.format)
+            if args.path == '-':
+                result = import_records(args.kind, sys.stdin, fmt, args.batch_size)
+            else:
+                with open(args.path, 'rb') as f:
+                    result = import_records(args.kind, f, fmt, args.batch_size)
+
+            print(f"✅ {args.kind}: {result['inserted']} added, {result['updated']} updated, {result['failed']} failed")
+            for error in result['errors']:
+                print(f"   line {error['line']}: {error['error']}")
+        else:
+            fmt = args.format or ('csv' if args.path == '-' else format_for(args.path))
+            out = sys.stdout if args.path == '-' else open(args.path, 'w', encoding='utf-8', newline='')
+            try:
+                for chunk in export_records(args.kind, fmt, args.batch_size):
+                    out.write(chunk)
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+            if args.path != '-':
+                print(f"✅ Exported {args.kind} to {args.path}")
+
+if __name__ == '__main__':
+    main()
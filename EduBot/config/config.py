@@ -34,9 +34,60 @@ class Config:
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app', 'static', 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx', 'ppt', 'pptx'}
+
+    # Background text extraction for uploaded notes and syllabus files
+    EXTRACTION_WORKERS = int(os.environ.get('EXTRACTION_WORKERS', 2))
+    EXTRACTION_CHUNK_SIZE = 1200  # Characters per searchable chunk
+    
+    # Quick-action usage counts are buffered per worker and written back this often (seconds)
+    USAGE_FLUSH_INTERVAL = 30
+    
+    # AI fallback provider: 'gemini' (needs GEMINI_API_KEY) or 'local' (simulated, for load testing)
+    LLM_PROVIDER = os.environ.get('LLM_PROVIDER', 'gemini')
+    LLM_LOCAL_LATENCY = os.environ.get('LLM_LOCAL_LATENCY', 'lognormal')  # fixed, uniform or lognormal
+    LLM_LOCAL_LATENCY_MEDIAN = float(os.environ.get('LLM_LOCAL_LATENCY_MEDIAN', 1.0))  # Seconds to first chunk
+    LLM_LOCAL_LATENCY_SPREAD = float(os.environ.get('LLM_LOCAL_LATENCY_SPREAD', 0.5))
+    LLM_LOCAL_ERROR_RATE = float(os.environ.get('LLM_LOCAL_ERROR_RATE', 0.0))
+    LLM_LOCAL_CHUNK_SIZE = int(os.environ.get('LLM_LOCAL_CHUNK_SIZE', 40))  # Characters per streamed chunk
+    LLM_LOCAL_CHUNK_DELAY = 0.02  # Seconds between chunks
+    
+    # Gemini answer cache (SQLite file; defaults to instance/llm_cache.db)
+    LLM_CACHE_PATH = os.environ.get('LLM_CACHE_PATH')
+    LLM_CACHE_TTL = 7 * 24 * 3600  # Seconds
+    LLM_CACHE_MAX_ENTRIES = 5000
+    
+    # Gemini call limits: per-call timeout, overall budget per chat message, circuit breaker
+    GEMINI_CALL_TIMEOUT = 6.0
+    LLM_REQUEST_BUDGET = 8.0
+    GEMINI_BREAKER_THRESHOLD = 3  # Consecutive failures before calls stop
+    GEMINI_BREAKER_RESET = 30.0  # Seconds before a probe call is let through
+    LLM_MAX_CONCURRENT = 4  # AI calls allowed at once per worker process
+    LLM_QUEUE_TIMEOUT = 2.0  # Seconds a call may wait for a free slot before falling back
+    
+    # AI prompt size limits (estimated tokens)
+    LLM_PROMPT_MAX_TOKENS = 1200  # Whole prompt; older conversation turns are dropped to fit
+    LLM_MESSAGE_MAX_TOKENS = 400  # Longer questions are truncated
+    LLM_HISTORY_TURNS = 2  # Recent exchanges given to the model
+    LLM_HISTORY_TURN_TOKENS = 60  # Each remembered message is shortened to this
+    
+    # AI budget: rolling-window limits kept below the provider quota (SQLite file; defaults to instance/llm_budget.db)
+    LLM_BUDGET_PATH = os.environ.get('LLM_BUDGET_PATH')
+    LLM_GLOBAL_CALLS_PER_MINUTE = int(os.environ.get('LLM_GLOBAL_CALLS_PER_MINUTE', 15))
+    LLM_GLOBAL_CALLS_PER_DAY = int(os.environ.get('LLM_GLOBAL_CALLS_PER_DAY', 1500))
+    LLM_GLOBAL_TOKENS_PER_MINUTE = int(os.environ.get('LLM_GLOBAL_TOKENS_PER_MINUTE', 1000000))
+    LLM_GLOBAL_TOKENS_PER_DAY = None  # No daily token cap by default
+    LLM_USER_CALLS_PER_HOUR = 20
+    LLM_USER_CALLS_PER_DAY = 60
+    LLM_BUDGET_SAFETY = 0.9  # Stop at this share of the provider limits
+    LLM_BUDGET_RESERVED = 0.2  # Share of the global budget kept for signed-in students
     
     # Rate limiting
     RATELIMIT_STORAGE_URL = "memory://"
+    SOCKET_CHAT_RATE_LIMIT = 30  # Messages per connection per window, like /chat/send
+    SOCKET_CHAT_RATE_WINDOW = 60  # Seconds
+    
+    # Chat analytics rollups
+    ROLLUP_FLUSH_INTERVAL = 30  # Seconds between writes of buffered analytics rollups
     
     # CSRF protection (temporarily disabled)
     WTF_CSRF_ENABLED = False
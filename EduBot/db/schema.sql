@@ -240,6 +240,69 @@ CREATE TABLE intents (
     FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE SET NULL
 );
 
+-- Department synonyms table (what students type -> department name)
+CREATE TABLE department_synonyms (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    phrase VARCHAR(100) NOT NULL,
+    department VARCHAR(100) NOT NULL,
+    created_by INT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE SET NULL,
+    UNIQUE KEY unique_department_synonym (phrase, department)
+);
+
+-- Extracted documents table (text pulled from uploaded notes and syllabus files)
+CREATE TABLE extracted_documents (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    source_type ENUM('note', 'syllabus') NOT NULL,
+    source_id INT NOT NULL,
+    course_id INT,
+    title VARCHAR(255),
+    file_path VARCHAR(500) NOT NULL,
+    content_hash VARCHAR(64),
+    status ENUM('done', 'failed', 'unsupported') NOT NULL DEFAULT 'done',
+    error VARCHAR(255),
+    char_count INT DEFAULT 0,
+    chunk_count INT DEFAULT 0,
+    extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE SET NULL,
+    UNIQUE KEY unique_document_source (source_type, source_id)
+);
+
+-- Document chunks table (searchable pieces of an extracted document)
+CREATE TABLE document_chunks (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    document_id INT NOT NULL,
+    position INT NOT NULL,
+    text TEXT NOT NULL,
+    FOREIGN KEY (document_id) REFERENCES extracted_documents(id) ON DELETE CASCADE
+);
+
+-- Hourly chat rollups table (totals per hour and intent, kept by the app)
+CREATE TABLE chat_rollups_hourly (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    hour DATETIME NOT NULL, -- Start of the UTC hour
+    intent VARCHAR(100) NOT NULL DEFAULT '', -- '' for messages without an intent
+    messages INT NOT NULL DEFAULT 0,
+    response_time_sum BIGINT NOT NULL DEFAULT 0,
+    response_time_count INT NOT NULL DEFAULT 0,
+    confidence_sum FLOAT NOT NULL DEFAULT 0,
+    confidence_count INT NOT NULL DEFAULT 0,
+    user_sketch BLOB, -- HyperLogLog registers of user ids
+    UNIQUE KEY unique_rollup_hour_intent (hour, intent)
+);
+
+-- Daily per-user chat rollups table (no foreign key: totals outlive deleted users)
+CREATE TABLE chat_rollups_user_daily (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    day DATE NOT NULL,
+    user_id INT NOT NULL,
+    messages INT NOT NULL DEFAULT 0,
+    last_chat DATETIME,
+    UNIQUE KEY unique_rollup_day_user (day, user_id)
+);
+
 -- Insert default admin user (password: admin123)
 INSERT INTO users (username, email, password_hash, role, first_name, last_name) 
 VALUES ('admin', 'admin@edubot.com', 'scrypt:32768:8:1$gKfaQqf3ZIKh3o1y$8f2c8e9a7b6d4c3f2e1a0b9c8d7e6f5a4b3c2d1e0f9a8b7c6d5e4f3a2b1c0d9e8f7a6b5c4d3e2f1a0b9c8d7e6f5a4b3c2d1e0f9a', 'admin', 'Admin', 'User');
@@ -267,11 +330,42 @@ INSERT INTO intents (intent_name, description, patterns, responses, handler_func
 ('motivational', 'Motivational quotes and encouragement', '["quote", "motivation", "inspire", "encourage", "motivational quote", "need motivation", "feeling down"]', '["Here\'s a motivational quote for you!", "Hope this inspires you!"]', 'handle_quotes', 3),
 ('default', 'Default fallback response', '[".*"]', '["I\'m sorry, I didn\'t understand that. Could you please rephrase?", "I\'m not sure how to help with that. Try asking about faculty, attendance, events, or motivational quotes.", "Could you please be more specific? I can help with faculty info, attendance, events, and more!"]', 'handle_default', 1);
 
+-- Insert default department synonyms
+INSERT INTO department_synonyms (phrase, department) VALUES 
+('computer science', 'computer science'),
+('computer', 'computer science'),
+('cs', 'computer science'),
+('cse', 'computer science'),
+('information technology', 'information technology'),
+('it', 'information technology'),
+('mathematics', 'mathematics'),
+('math', 'mathematics'),
+('maths', 'mathematics'),
+('physics', 'physics'),
+('chemistry', 'chemistry'),
+('biology', 'biology'),
+('english', 'english'),
+('english', 'literature'),
+('literature', 'english'),
+('literature', 'literature'),
+('history', 'history'),
+('economics', 'economics'),
+('business', 'business'),
+('business', 'management'),
+('management', 'management'),
+('management', 'business'),
+('engineering', 'engineering');
+
 -- Create indexes for better performance
 CREATE INDEX idx_users_role ON users(role);
 CREATE INDEX idx_users_student_id ON users(student_id);
 CREATE INDEX idx_attendance_student_date ON attendance(student_id, date);
 CREATE INDEX idx_events_date ON events(start_date);
 CREATE INDEX idx_chat_logs_user_date ON chat_logs(user_id, created_at);
+CREATE INDEX idx_chat_logs_user_created ON chat_logs(user_id, created_at, id);
+CREATE INDEX idx_chat_logs_created ON chat_logs(created_at);
 CREATE INDEX idx_group_messages_group_date ON group_messages(group_id, created_at);
 CREATE INDEX idx_intents_active ON intents(is_active);
+CREATE INDEX idx_courses_catalogue ON courses(is_active, department, semester, course_code);
+CREATE INDEX idx_courses_year_semester ON courses(year, semester);
+CREATE INDEX ix_document_chunks_document_id ON document_chunks(document_id);
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Turn frequently asked unknown questions into quick-action candidates
+
+Clusters questions from the chat logs that fell back to the AI or to the
+default answer, generates one answer per cluster, and saves it as an
+inactive quick action in the "AI Suggested" category. Admins review and
+activate them on the Quick Actions page. Run it off-peak, e.g. nightly:
+
+    python precompute_answers.py
+    python precompute_answers.py --days 14 --min-count 5 --max-calls 10
+    python precompute_answers.py --reuse-logged --dry-run
+"""
+
+import argparse
+from app import create_app
+from app.services.answer_precompute import precompute_answers
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute answers for frequent unknown questions')
+    parser.add_argument('--days', type=int, default=30, help='How far back to read the chat logs')
+    parser.add_argument('--min-count', type=int, default=3, help='Times a question must be asked')
+    parser.add_argument('--min-users', type=int, default=2, help='Different users who must ask it')
+    parser.add_argument('--max-calls', type=int, default=20, help='Most AI calls to make in one run')
+    parser.add_argument('--reuse-logged', action='store_true',
+                        help='Use the latest logged AI answer when there is one instead of calling the AI')
+    parser.add_argument('--dry-run', action='store_true', help="Show the candidates without saving them")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        result = precompute_answers(args.days, args.min_count, args.min_users, args.max_calls,
+                                    args.reuse_logged, args.dry_run)
+
+    action = 'Would create' if args.dry_run else 'Created'
+    print(f"✅ {result['clusters']} frequent questions: {action.lower()} {result['created']} candidates, "
+          f"{result['already_answered']} already answered, {result['pending_review']} awaiting review, "
+          f"{result['failed']} without a usable answer")
+    for candidate in result['candidates']:
+        print(f"   [{candidate['asked']}x by {candidate['users']} users] {candidate['question']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test the SQLite answer cache: keys, TTL expiry and LRU eviction
+"""
+
+import sys
+import os
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.answer_cache import AnswerCache
+
+MODEL = 'gemini-1.5-flash'
+
+def _cache(**kwargs) -> AnswerCache:
+    return AnswerCache(os.path.join(tempfile.mkdtemp(), 'llm_cache.db'), **kwargs)
+
+def test_cacheable_questions():
+    """Only standalone questions of a few words are shared"""
+    assert AnswerCache.cacheable("What is the Pythagorean theorem?")
+    assert not AnswerCache.cacheable("thanks")
+    assert not AnswerCache.cacheable("explain it again please")
+    assert not AnswerCache.cacheable("what about the second one")
+
+def test_keys_normalize_and_separate_versions():
+    """Punctuation and case don't matter; model and prompt version do"""
+    cache = _cache()
+    cache.set("What is photosynthesis?", "Plants making food from light.", MODEL, '3')
+
+    assert cache.get("what is   PHOTOSYNTHESIS", MODEL, '3') == "Plants making food from light."
+    assert cache.get("What is photosynthesis?", MODEL, '2') is None
+    assert cache.get("What is photosynthesis?", 'other-model', '3') is None
+
+def test_expired_answers_are_dropped():
+    """An answer older than the TTL is a miss and is deleted"""
+    cache = _cache(ttl=60)
+    cache.set("what is an atom", "The smallest unit of an element.", MODEL, '3')
+    assert cache.get("what is an atom", MODEL, '3')
+
+    # Age the entry past the TTL
+    with cache._lock:
+        connection = cache._connect()
+        connection.execute('UPDATE answer_cache SET created_at = created_at - 120')
+        connection.commit()
+
+    assert cache.get("what is an atom", MODEL, '3') is None
+    assert cache.stats()['entries'] == 0
+
+def test_least_recently_used_answers_are_evicted():
+    """Over max_entries, the answers hit longest ago go first"""
+    cache = _cache(max_entries=3)
+    questions = ["what is gravity", "what is friction", "what is inertia"]
+    for question in questions:
+        cache.set(question, f"Answer about {question}", MODEL, '3')
+        time.sleep(0.01)
+
+    # Touch the oldest so the second becomes least recently used
+    assert cache.get(questions[0], MODEL, '3')
+    time.sleep(0.01)
+    cache.set("what is momentum", "Answer about momentum", MODEL, '3')
+
+    assert cache.stats()['entries'] == 3
+    assert cache.get(questions[1], MODEL, '3') is None
+    assert cache.get(questions[0], MODEL, '3')
+    assert cache.get("what is momentum", MODEL, '3')
+
+if __name__ == '__main__':
+    test_cacheable_questions()
+    test_keys_normalize_and_separate_versions()
+    test_expired_answers_are_dropped()
+    test_least_recently_used_answers_are_evicted()
+    print("✅ Answer cache tests passed")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test keyset chat history pages and their cursors
+"""
+
+import sys
+import os
+import uuid
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app, db
+from app.models.chat_log import ChatLog
+from app.models.user import User
+from app.services.chat_history import chat_history, encode_cursor, decode_cursor
+
+def _user_with_chats(count, same_time=0):
+    """A new student with ``count`` chats, one minute apart; the newest ``same_time`` share a timestamp"""
+    name = f"history_{uuid.uuid4().hex[:10]}"
+    user = User(name, f"{name}@example.com", 'History', 'Test')
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.flush()
+
+    start = datetime(2025, 1, 1, 9, 0)
+    for number in range(count):
+        created_at = start + timedelta(minutes=min(number, count - same_time))
+        db.session.add(ChatLog(user_id=user.id, user_message=f"message {number}",
+                               bot_response=f"reply {number}", created_at=created_at))
+    db.session.commit()
+    return user
+
+def _all_pages(user_id, limit):
+    pages, cursor = [], None
+    while True:
+        chats, cursor = chat_history.page(user_id, limit, cursor)
+        pages.append([chat.id for chat in chats])
+        if cursor is None:
+            return pages
+
+def test_cursor_round_trip():
+    """A cursor decodes to the row's position; anything else is a ValueError"""
+    chat = ChatLog(id=42, user_id=1, user_message='hi', bot_response='hello',
+                   created_at=datetime(2025, 3, 4, 5, 6, 7, 890000))
+    cursor = encode_cursor(chat)
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == (chat.created_at, 42)
+
+    for bad in ['', 'not-a-cursor', encode_cursor(chat)[:-3], 'W10']:
+        try:
+            decode_cursor(bad)
+            assert False, f"accepted {bad!r}"
+        except ValueError:
+            pass
+
+def test_pages_cover_every_chat_once():
+    """Pages run newest first with no gaps or repeats, including timestamp ties"""
+    app = create_app()
+
+    with app.app_context():
+        user = _user_with_chats(7, same_time=3)
+        expected = [row.id for row in ChatLog.query.filter_by(user_id=user.id)
+                    .order_by(ChatLog.created_at.desc(), ChatLog.id.desc())]
+
+        pages = _all_pages(user.id, 3)
+        assert [len(page) for page in pages] == [3, 3, 1]
+        assert [chat_id for page in pages for chat_id in page] == expected
+
+def test_last_page_boundaries():
+    """A full last page ends the listing without an extra empty page"""
+    app = create_app()
+
+    with app.app_context():
+        user = _user_with_chats(6)
+        assert [len(page) for page in _all_pages(user.id, 3)] == [3, 3]
+        assert [len(page) for page in _all_pages(user.id, 6)] == [6]
+
+        empty = _user_with_chats(0)
+        assert chat_history.page(empty.id, 20) == ([], None)
+
+if __name__ == '__main__':
+    test_cursor_round_trip()
+    test_pages_cover_every_chat_once()
+    test_last_page_boundaries()
+    print("✅ Chat history tests passed")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test the chat analytics rollups: user sketches, incremental flushes and backfill
+"""
+
+import sys
+import os
+import uuid
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app, db
+from app.models.chat_log import ChatLog
+from app.models.user import User
+from app.services.chat_rollups import UserSketch, chat_rollups
+
+def _sketch(ids) -> UserSketch:
+    sketch = UserSketch()
+    for user_id in ids:
+        sketch.add(user_id)
+    return sketch
+
+def _users(count):
+    users = []
+    for _ in range(count):
+        name = f"rollup_{uuid.uuid4().hex[:10]}"
+        user = User(name, f"{name}@example.com", 'Rollup', 'Test')
+        user.set_password('password123')
+        db.session.add(user)
+        users.append(user)
+    db.session.flush()
+    return users
+
+def _log(user, created_at, intent, response_time_ms):
+    db.session.add(ChatLog(user_id=user.id, user_message='hi', bot_response='hello', intent=intent,
+                           response_time_ms=response_time_ms, confidence_score=0.5, created_at=created_at))
+
+def test_sketch_counts_distinct_users():
+    """Repeats don't count; small and large counts stay close to the truth"""
+    assert _sketch([1, 2, 3, 1, 2, 3, 3]).count() == 3
+    assert abs(_sketch(range(10)).count() - 10) <= 1
+
+    estimate = _sketch(range(5000)).count()
+    assert abs(estimate - 5000) < 5000 * 0.15, estimate
+
+def test_sketch_merge_is_a_union():
+    """Merged sketches count the union, and union() of stored bytes matches merge()"""
+    first, second = _sketch(range(0, 600)), _sketch(range(400, 1000))
+    merged = UserSketch(first.to_bytes()).merge(second)
+    assert abs(merged.count() - 1000) < 150, merged.count()
+    assert merged.to_bytes() == _sketch(range(1000)).to_bytes()
+
+    assert UserSketch.union([first.to_bytes(), second.to_bytes()], batch=1).to_bytes() == merged.to_bytes()
+    assert UserSketch(first.to_bytes()).merge(first).to_bytes() == first.to_bytes()
+    assert UserSketch.union([]).count() == 0
+
+def test_flush_and_backfill_agree():
+    """Rollups built from live flushes match a backfill of the same logs, and backfill can be rerun"""
+    app = create_app()
+
+    with app.app_context():
+        start = datetime(2031, 2, 1)
+        end = start + timedelta(days=2)
+        alice, bob = _users(2)
+        _log(alice, start + timedelta(hours=9, minutes=5), 'faculty_info', 100)
+        _log(alice, start + timedelta(hours=9, minutes=40), 'faculty_info', 300)
+        _log(bob, start + timedelta(hours=15), 'events', None)
+        _log(bob, start + timedelta(days=1, hours=8), None, 200)
+        db.session.commit()
+
+        try:
+            chat_rollups.flush()
+            live = chat_rollups.summary(start, end)
+            assert live['total_messages'] == 4
+            assert live['active_users'] == 2
+            assert live['avg_response_time_ms'] == 200
+            assert live['by_day'] == [(start.date(), 3), ((start + timedelta(days=1)).date(), 1)]
+            assert live['top_intents'] == [('faculty_info', 2), ('events', 1)]
+            assert sorted((user_id, count) for user_id, count, _ in live['top_users']) == [(alice.id, 2), (bob.id, 2)]
+
+            assert chat_rollups.backfill(start, end) == 4
+            assert chat_rollups.summary(start, end) == live
+
+            # Replaces the range instead of adding to it
+            assert chat_rollups.backfill(start, end) == 4
+            assert chat_rollups.summary(start, end) == live
+        finally:
+            # Leave the range empty for the next run
+            ChatLog.query.filter(ChatLog.user_id.in_([alice.id, bob.id])).delete(synchronize_session=False)
+            db.session.commit()
+            chat_rollups.backfill(start, end)
+
+if __name__ == '__main__':
+    test_sketch_counts_distinct_users()
+    test_sketch_merge_is_a_union()
+    test_flush_and_backfill_agree()
+    print("✅ Chat rollup tests passed")
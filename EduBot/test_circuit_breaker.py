@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test the circuit breaker state machine
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.circuit_breaker import CircuitBreaker
+
+def test_opens_after_consecutive_failures():
+    """Failures below the threshold keep it closed; success resets the count"""
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.available() and not breaker.allow()
+    assert breaker.get_status()['retry_in_seconds'] > 0
+
+def test_half_open_lets_one_probe_through():
+    """After the cool-down a single probe goes out; its result closes or reopens"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.available()
+    assert breaker.allow()
+    assert not breaker.available() and not breaker.allow()  # Probe already out
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+def test_lost_probe_expires():
+    """A probe never reported back frees the slot after probe_timeout"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01, probe_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+
+def test_open_for_known_outage():
+    """open_for() trips at once for the given time, whatever the failure count"""
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=0.01)
+    breaker.open_for(60)
+    assert breaker.state == CircuitBreaker.OPEN
+    time.sleep(0.02)
+    assert not breaker.allow()
+    assert breaker.get_status()['retry_in_seconds'] > 50
+
+if __name__ == '__main__':
+    test_opens_after_consecutive_failures()
+    test_half_open_lets_one_probe_through()
+    test_lost_probe_expires()
+    test_open_for_known_outage()
+    print("✅ Circuit breaker tests passed")
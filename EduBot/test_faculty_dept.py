@@ -37,7 +37,7 @@ def test_faculty_department_logic():
             
             try:
                 # Test the department query method directly
-                result = response_handler._check_department_query(test_input.lower(), faculty_members)
+                result = response_handler._check_department_query(test_input.lower())
                 
                 if result:
                     print(f"✅ Found department match:")
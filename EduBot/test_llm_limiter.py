@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test the LLM concurrency cap and coalescing of identical questions
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.llm_limiter import LLMLimiter
+
+def _wait_for(condition, timeout=2.0):
+    end = time.time() + timeout
+    while not condition():
+        assert time.time() < end, "timed out"
+        time.sleep(0.005)
+
+def test_identical_questions_share_one_call():
+    """Callers with the same key while a call runs get its result without calling"""
+    limiter = LLMLimiter(max_concurrent=4, queue_timeout=1.0)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def call():
+        calls.append(1)
+        started.set()
+        release.wait(2)
+        return "shared answer"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(limiter.run('same question', call, time.time() + 5)))]
+    threads[0].start()
+    started.wait(2)
+    for _ in range(4):
+        thread = threading.Thread(target=lambda: results.append(limiter.run('same question', call, time.time() + 5)))
+        thread.start()
+        threads.append(thread)
+
+    _wait_for(lambda: limiter.coalesced == 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["shared answer"] * 5
+    assert limiter.get_status()['in_flight_questions'] == 0
+
+def test_full_limiter_rejects_after_queue_timeout():
+    """With every slot busy, a new call falls back to None after queue_timeout"""
+    limiter = LLMLimiter(max_concurrent=1, queue_timeout=0.05)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(2)
+        return "slow answer"
+
+    results = []
+    thread = threading.Thread(target=lambda: results.append(limiter.run(None, slow)))
+    thread.start()
+    started.wait(2)
+
+    assert limiter.run(None, lambda: "never runs") is None
+    assert limiter.rejected == 1
+
+    release.set()
+    thread.join()
+    assert results == ["slow answer"]
+    assert limiter.run(None, lambda: "runs now") == "runs now"
+
+def test_failed_call_clears_its_key():
+    """An exception reaches the caller and the next identical question calls again"""
+    limiter = LLMLimiter()
+
+    def broken():
+        raise RuntimeError("upstream down")
+
+    try:
+        limiter.run('question', broken)
+        assert False, "expected the call's exception"
+    except RuntimeError:
+        pass
+
+    assert limiter.run('question', lambda: "recovered") == "recovered"
+    assert limiter.get_status()['active'] == 0
+
+if __name__ == '__main__':
+    test_identical_questions_share_one_call()
+    test_full_limiter_rejects_after_queue_timeout()
+    test_failed_call_clears_its_key()
+    print("✅ LLM limiter tests passed")
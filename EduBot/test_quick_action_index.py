@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test the BM25 quick action index against the sample quick actions
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app, db
+from app.chatbot.quick_action_index import quick_action_index, QuickActionIndex, tokenize
+from app.models.quick_action import QuickAction
+from add_sample_quick_actions import add_sample_quick_actions
+
+def _app_with_samples():
+    app = create_app()
+    with app.app_context():
+        add_sample_quick_actions()
+        quick_action_index.invalidate()
+    return app
+
+def test_tokenize():
+    """Stop words and question filler are dropped, plurals are folded"""
+    assert tokenize("Where are the library hours?") == ['library', 'hour']
+    assert tokenize("How do I check my fees") == ['check', 'fee']
+    assert tokenize("class address") == ['class', 'address']
+
+def test_seeded_phrasings():
+    """Natural rewordings of the seeded questions find their quick action"""
+    app = _app_with_samples()
+
+    phrasings = {
+        "where is the cafeteria located": 'Where is the cafeteria?',
+        "when is lunch served": 'Where is the cafeteria?',
+        "library timings": 'What are the library hours?',
+        "what time does the library open": 'What are the library hours?',
+        "how can I pay my tuition fees": 'How do I check my fees?',
+        "I forgot my password": 'How do I reset my password?',
+        "admission process documents": 'What is the admission process?',
+        "hostel rules": 'What are the hostel rules?',
+        "how do I get a transfer certificate": 'How do I apply for a transfer certificate?',
+    }
+
+    with app.app_context():
+        for phrasing, question in phrasings.items():
+            match = quick_action_index.best(phrasing)
+            print(f"🔍 '{phrasing}' -> {match.question if match else None}")
+            assert match is not None, phrasing
+            assert match.question == question, phrasing
+
+def test_unrelated_messages():
+    """Messages about something no quick action covers fall through"""
+    app = _app_with_samples()
+
+    with app.app_context():
+        for message in ["tell me about quantum physics research", "hello", "who teaches data structures"]:
+            assert quick_action_index.best(message) is None, message
+
+def test_search_for_answer_loads_ranked_rows():
+    """search_for_answer returns the index's matches as rows, best first"""
+    app = _app_with_samples()
+
+    with app.app_context():
+        results = QuickAction.search_for_answer("library hours", limit=3)
+        assert results and isinstance(results[0], QuickAction)
+        assert results[0].question == 'What are the library hours?'
+        assert [qa.id for qa in results] == [entry.id for entry in quick_action_index.search("library hours", 3)]
+        assert results[0].matches_query("library hours")
+        assert not results[0].matches_query("hostel rules")
+
+def test_deactivated_quick_action_drops_out():
+    """An inactive quick action leaves the index once it is invalidated"""
+    app = _app_with_samples()
+
+    with app.app_context():
+        qa = QuickAction.query.filter_by(question='What are the hostel rules?').first()
+        try:
+            qa.is_active = False
+            db.session.commit()
+            quick_action_index.invalidate()
+            assert quick_action_index.best("hostel rules") is None
+        finally:
+            qa.is_active = True
+            db.session.commit()
+            quick_action_index.invalidate()
+        assert quick_action_index.best("hostel rules").id == qa.id
+
+def test_ties_follow_load_order():
+    """Equal scores keep the priority order the entries were loaded in"""
+    app = _app_with_samples()
+
+    with app.app_context():
+        index = QuickActionIndex()
+        index.rebuild()
+        scores = [score for _, score in index.score("rules timings hours")]
+        assert scores == sorted(scores, reverse=True)
+
+if __name__ == '__main__':
+    test_tokenize()
+    test_seeded_phrasings()
+    test_unrelated_messages()
+    test_search_for_answer_loads_ranked_rows()
+    test_deactivated_quick_action_drops_out()
+    test_ties_follow_load_order()
+    print("✅ Quick action index tests passed")
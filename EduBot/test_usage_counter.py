@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test buffered quick action usage counts
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app, db
+from app.models.quick_action import QuickAction
+from app.services.usage_counter import UsageCounter, quick_action_usage
+from add_sample_quick_actions import add_sample_quick_actions
+
+def _usage(qa_id):
+    db.session.expire_all()
+    return db.session.get(QuickAction, qa_id).usage_count or 0
+
+def test_flush_writes_buffered_counts():
+    """Increments stay in memory until flush() writes them in one go"""
+    app = create_app()
+
+    with app.app_context():
+        add_sample_quick_actions()
+        first, second = [qa.id for qa in QuickAction.query.order_by(QuickAction.id).limit(2)]
+        before = _usage(first), _usage(second)
+
+        counter = UsageCounter(QuickAction, flush_interval=3600)
+        try:
+            counter.add(first)
+            counter.add(first)
+            counter.add(second, 3)
+            assert (_usage(first), _usage(second)) == before
+
+            assert counter.flush() == 2
+            assert _usage(first) == before[0] + 2
+            assert _usage(second) == before[1] + 3
+
+            # Nothing left to write
+            assert counter.flush() == 0
+            assert _usage(first) == before[0] + 2
+        finally:
+            counter.shutdown()
+
+def test_increment_usage_goes_through_the_buffer():
+    """QuickAction.increment_usage() counts through the shared buffer"""
+    app = create_app()
+
+    with app.app_context():
+        add_sample_quick_actions()
+        qa = QuickAction.query.order_by(QuickAction.id).first()
+        quick_action_usage.flush()
+        before = _usage(qa.id)
+
+        qa.increment_usage()
+        QuickAction.increment_usage_by_id(qa.id)
+        assert _usage(qa.id) == before
+
+        quick_action_usage.flush()
+        assert _usage(qa.id) == before + 2
+
+if __name__ == '__main__':
+    test_flush_writes_buffered_counts()
+    test_increment_usage_goes_through_the_buffer()
+    print("✅ Usage counter tests passed")